@@ -5,8 +5,11 @@ import json
 import os
 import threading
 import time
+import zlib
 from collections import OrderedDict
-from typing import Any
+from typing import Any, Callable
+
+from .shared_cache import SharedCacheStore, get_shared_store
 
 
 def _env_int(name: str, default: int) -> int:
@@ -16,39 +19,248 @@ def _env_int(name: str, default: int) -> int:
         return default
 
 
+def _estimate_bytes(value: Any) -> int:
+    """Approximate footprint of a cached response: the size of its JSON form."""
+    try:
+        return len(json.dumps(value, ensure_ascii=False, default=str).encode("utf-8"))
+    except (TypeError, ValueError):
+        return len(repr(value))
+
+
+def _new_stats() -> dict[str, int]:
+    return {"hits": 0, "misses": 0, "stale": 0, "evictions": 0, "expirations": 0, "oversize": 0}
+
+
 class TTLCache:
-    def __init__(self, max_entries: int = 512) -> None:
+    """
+    LRU cache with per-entry TTLs, bounded by entry count and (optionally) bytes.
+
+    An entry set with `soft_ttl_seconds` is still returned after the soft TTL,
+    until the (hard) TTL, but lookup() reports it as no longer fresh.
+    """
+
+    def __init__(self, max_entries: int = 512, max_bytes: int = 0) -> None:
         self.max_entries = max_entries
+        self.max_bytes = max_bytes  # 0: no byte bound
+        self.bytes = 0
         self._lock = threading.Lock()
-        self._store: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self._store: OrderedDict[str, tuple[float, float, int, Any]] = OrderedDict()
+        self._stats = _new_stats()
 
     def get(self, key: str) -> Any | None:
+        entry = self.lookup(key)
+        return entry[0] if entry is not None else None
+
+    def lookup(self, key: str) -> tuple[Any, float, float] | None:
+        """(value, expires_at, fresh_until) for an unexpired entry, else None."""
         now = time.time()
         with self._lock:
             entry = self._store.get(key)
             if entry is None:
+                self._stats["misses"] += 1
                 return None
-            expires_at, value = entry
+            expires_at, fresh_until, size, value = entry
             if expires_at <= now:
-                self._store.pop(key, None)
+                self._drop(key, size)
+                self._stats["expirations"] += 1
+                self._stats["misses"] += 1
                 return None
             self._store.move_to_end(key)
-            return value
+            self._stats["hits"] += 1
+            if fresh_until <= now:
+                self._stats["stale"] += 1
+            return value, expires_at, fresh_until
 
-    def set(self, key: str, value: Any, ttl_seconds: int) -> None:
-        expires_at = time.time() + max(ttl_seconds, 1)
+    def set(self, key: str, value: Any, ttl_seconds: float, soft_ttl_seconds: float | None = None) -> None:
+        now = time.time()
+        expires_at = now + max(ttl_seconds, 1)
+        fresh_until = expires_at if soft_ttl_seconds is None else min(now + soft_ttl_seconds, expires_at)
+        size = _estimate_bytes(value) if self.max_bytes else 0
         with self._lock:
-            self._store[key] = (expires_at, value)
-            self._store.move_to_end(key)
-            while len(self._store) > self.max_entries:
-                self._store.popitem(last=False)
+            previous = self._store.pop(key, None)
+            if previous is not None:
+                self.bytes -= previous[2]
+            if self.max_bytes and size > self.max_bytes:
+                self._stats["oversize"] += 1
+                return
+            self._store[key] = (expires_at, fresh_until, size, value)
+            self.bytes += size
+            while len(self._store) > self.max_entries or (self.max_bytes and self.bytes > self.max_bytes):
+                _, (_, _, evicted_size, _) = self._store.popitem(last=False)
+                self.bytes -= evicted_size
+                self._stats["evictions"] += 1
+
+    def purge(self, predicate: Callable[[str], bool]) -> int:
+        """Drop every key matching `predicate`; returns the number removed."""
+        with self._lock:
+            stale = [key for key in self._store if predicate(key)]
+            for key in stale:
+                self._drop(key, self._store[key][2])
+        return len(stale)
+
+    def sweep(self) -> int:
+        """Drop expired entries without waiting for them to be read; returns the number removed."""
+        now = time.time()
+        with self._lock:
+            expired = [key for key, (expires_at, _, _, _) in self._store.items() if expires_at <= now]
+            for key in expired:
+                self._drop(key, self._store[key][2])
+            self._stats["expirations"] += len(expired)
+        return len(expired)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._store.clear()
+            self.bytes = 0
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {**self._stats, "entries": len(self._store), "bytes": self.bytes}
+
+    def _drop(self, key: str, size: int) -> None:
+        del self._store[key]
+        self.bytes -= size
+
+
+class ResponseCache:
+    """
+    The AI response cache: one byte budget per key namespace (the `cache_key`
+    prefix - rewrite, retrieve, synthesize, enrich), each split into `shards`
+    TTLCaches with their own lock so concurrent requests rarely contend.
+    Namespaces without a budget share the "default" one.
+
+    With an `l2` store (see shared_cache.py) misses are read through to it and
+    sets are written to both tiers.
+    """
+
+    def __init__(
+        self,
+        budgets: dict[str, int],
+        max_entries: int = 2048,
+        shards: int = 8,
+        l2: SharedCacheStore | None = None,
+    ) -> None:
+        self.l2 = l2
+        self.shards = max(shards, 1)
+        self.budgets = dict(budgets)
+        self.budgets.setdefault("default", 4 * 1024 * 1024)
+        self._namespaces = {
+            name: [
+                TTLCache(max_entries=max(max_entries // self.shards, 1), max_bytes=max(budget // self.shards, 1))
+                for _ in range(self.shards)
+            ]
+            for name, budget in self.budgets.items()
+        }
+        self._sweeper: threading.Thread | None = None
+
+    def _shard(self, key: str) -> TTLCache:
+        namespace = key.split("::", 1)[0]
+        shards = self._namespaces.get(namespace) or self._namespaces["default"]
+        return shards[zlib.crc32(key.encode("utf-8")) % self.shards]
+
+    def get(self, key: str) -> Any | None:
+        entry = self.lookup(key)
+        return entry[0] if entry is not None else None
+
+    def lookup(self, key: str) -> tuple[Any, bool] | None:
+        """(value, fresh) for a cached entry; fresh is False past its soft TTL."""
+        shard = self._shard(key)
+        entry = shard.lookup(key)
+        if entry is None and self.l2 is not None:
+            entry = self.l2.get(key)
+            if entry is not None:
+                value, expires_at, fresh_until = entry
+                now = time.time()
+                shard.set(key, value, expires_at - now, fresh_until - now)
+        if entry is None:
+            return None
+        value, _, fresh_until = entry
+        return value, fresh_until > time.time()
 
+    def set(self, key: str, value: Any, ttl_seconds: float, soft_ttl_seconds: float | None = None) -> None:
+        """Cache `value` until `ttl_seconds`; with `soft_ttl_seconds` it counts as stale after that."""
+        self._shard(key).set(key, value, ttl_seconds, soft_ttl_seconds)
+        if self.l2 is not None:
+            now = time.time()
+            expires_at = now + max(ttl_seconds, 1)
+            fresh_until = expires_at if soft_ttl_seconds is None else min(now + soft_ttl_seconds, expires_at)
+            self.l2.set(key, value, expires_at, fresh_until)
 
-CACHE_TTL_RETRIEVE = _env_int("AI_CACHE_TTL_RETRIEVE_SECONDS", 600)
+    def purge(self, predicate: Callable[[str], bool]) -> int:
+        """Drop every key matching `predicate`; returns the number removed."""
+        return sum(shard.purge(predicate) for shards in self._namespaces.values() for shard in shards)
+
+    def sweep(self) -> int:
+        """Drop expired entries in every shard (and the L2 store); returns the number removed."""
+        removed = sum(shard.sweep() for shards in self._namespaces.values() for shard in shards)
+        if self.l2 is not None:
+            removed += self.l2.sweep()
+        return removed
+
+    def clear(self) -> None:
+        for shards in self._namespaces.values():
+            for shard in shards:
+                shard.clear()
+
+    def stats(self) -> dict[str, dict[str, int]]:
+        """Per-namespace hits, misses, evictions, expirations, oversize rejects, entries, bytes and budget."""
+        result = {}
+        for name, shards in self._namespaces.items():
+            totals = {"entries": 0, "bytes": 0, **_new_stats()}
+            for shard in shards:
+                for field, value in shard.stats().items():
+                    totals[field] += value
+            result[name] = {**totals, "budgetBytes": self.budgets[name]}
+        return result
+
+    def l2_stats(self) -> dict[str, Any] | None:
+        return self.l2.stats() if self.l2 is not None else None
+
+    def start_sweeper(self, interval_seconds: float) -> None:
+        """Sweep expired entries every `interval_seconds` in a daemon thread (idempotent)."""
+        if interval_seconds <= 0 or (self._sweeper is not None and self._sweeper.is_alive()):
+            return
+        self._sweeper = threading.Thread(
+            target=self._sweep_loop, args=(interval_seconds,), name="ai-cache-sweep", daemon=True
+        )
+        self._sweeper.start()
+
+    def _sweep_loop(self, interval_seconds: float) -> None:
+        while True:
+            time.sleep(interval_seconds)
+            try:
+                self.sweep()
+            except Exception as exc:  # keep sweeping; a bad entry must not stop the thread
+                print(f"[cache] sweep failed: {exc}")
+
+
+# Retrieve keys carry the corpus version (see corpus_version.py) and synthesize
+# keys the evidence fingerprint, so both are invalidated by data changes; the
+# TTLs only bound how long unused entries hold memory.
+CACHE_TTL_RETRIEVE = _env_int("AI_CACHE_TTL_RETRIEVE_SECONDS", 21600)
 CACHE_TTL_REWRITE = _env_int("AI_CACHE_TTL_REWRITE_SECONDS", 86400)
-CACHE_TTL_SYNTHESIZE = _env_int("AI_CACHE_TTL_SYNTHESIZE_SECONDS", 1800)
+CACHE_TTL_SYNTHESIZE = _env_int("AI_CACHE_TTL_SYNTHESIZE_SECONDS", 21600)
+# Past the soft TTL a cached answer is still served, but refreshed in the
+# background; only after CACHE_TTL_SYNTHESIZE does a request wait for the LLM.
+CACHE_SOFT_TTL_SYNTHESIZE = _env_int("AI_CACHE_SOFT_TTL_SYNTHESIZE_SECONDS", 3600)
+# Responses fused without a leg that missed its deadline are kept only briefly.
+CACHE_TTL_DEGRADED = _env_int("AI_CACHE_TTL_DEGRADED_SECONDS", 30)
 CACHE_TTL_ENRICH = _env_int("AI_CACHE_TTL_ENRICH_SECONDS", 3600)
-ai_cache = TTLCache(max_entries=_env_int("AI_CACHE_MAX_ENTRIES", 512))
+CACHE_SWEEP_SECONDS = _env_int("AI_CACHE_SWEEP_SECONDS", 60)
+_MB = 1024 * 1024
+ai_cache = ResponseCache(
+    budgets={
+        "rewrite": _env_int("AI_CACHE_BYTES_REWRITE", 2 * _MB),
+        "retrieve": _env_int("AI_CACHE_BYTES_RETRIEVE", 32 * _MB),
+        "synthesize": _env_int("AI_CACHE_BYTES_SYNTHESIZE", 64 * _MB),
+        # query -> evidence fingerprint pointers checked before retrieval
+        "synthesize_query": _env_int("AI_CACHE_BYTES_SYNTHESIZE_QUERY", 4 * _MB),
+        "enrich": _env_int("AI_CACHE_BYTES_ENRICH", 8 * _MB),
+    },
+    max_entries=_env_int("AI_CACHE_MAX_ENTRIES", 2048),
+    shards=_env_int("AI_CACHE_SHARDS", 8),
+    l2=get_shared_store(),
+)
 
 
 def normalize_query(query: str) -> str:
@@ -62,17 +274,14 @@ def cache_key(prefix: str, *parts: str) -> str:
 def fingerprint_evidence(evidence: list[Any]) -> str:
     compact = []
     for item in evidence:
-        if hasattr(item, "model_dump"):
-            entry = item.model_dump()
+        if hasattr(item, "content_hash"):
+            # Evidence hashes its encoded content once and keeps the digest.
+            source, confidence, content_hash = item.source, item.confidence, item.content_hash
         else:
-            entry = dict(item)
-        compact.append(
-            {
-                "source": entry.get("source"),
-                "confidence": entry.get("confidence"),
-                "content_hash": hashlib.sha256(str(entry.get("content", "")).encode("utf-8")).hexdigest(),
-            }
-        )
+            entry = item.model_dump() if hasattr(item, "model_dump") else dict(item)
+            source, confidence = entry.get("source"), entry.get("confidence")
+            content_hash = hashlib.sha256(str(entry.get("content", "")).encode("utf-8")).hexdigest()
+        compact.append({"source": source, "confidence": confidence, "content_hash": content_hash})
     payload = json.dumps(compact, sort_keys=True, ensure_ascii=True)
     return hashlib.sha256(payload.encode("utf-8")).hexdigest()
 
@@ -0,0 +1,183 @@
+"""
+Circuit breaker for optional backends (the Qdrant/Ollama vector leg).
+
+  closed     calls pass; outcomes of the last `window` calls are kept and the
+             breaker opens once at least `min_calls` were seen and the
+             failure rate reaches `failure_rate`.
+  open       calls are refused immediately (callers fall back). A daemon
+             thread runs `probe()` every `reset_seconds`; the first passing
+             probe moves the breaker to half-open. Without a probe, the
+             breaker turns half-open once `reset_seconds` have passed.
+  half-open  a single trial call is let through; success closes the
+             breaker, failure opens it again.
+
+A call admitted with acquire() carries a BreakerCall, and only the first
+outcome recorded for it counts. A caller that gave up on a call (missed
+deadline) records the failure itself; the late outcome of the abandoned
+call is then ignored, as is any outcome of a call admitted before the
+breaker last changed state.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from typing import Callable
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class BreakerCall:
+    """One call through a breaker; see CircuitBreaker.acquire."""
+
+    __slots__ = ("generation", "trial", "settled")
+
+    def __init__(self) -> None:
+        self.generation: int | None = None
+        self.trial = False
+        self.settled = False
+
+
+class CircuitBreaker:
+    def __init__(
+        self,
+        name: str,
+        window: int = 20,
+        min_calls: int = 5,
+        failure_rate: float = 0.5,
+        reset_seconds: float = 30.0,
+        probe: Callable[[], bool] | None = None,
+    ) -> None:
+        self.name = name
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.reset_seconds = reset_seconds
+        self.probe = probe
+        self.state = CLOSED
+        self._outcomes: deque[bool] = deque(maxlen=window)
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._generation = 0
+        self._last_error: str | None = None
+        self._lock = threading.Lock()
+        self._prober: threading.Thread | None = None
+
+    def allow(self) -> bool:
+        """True if a call may go to the backend now."""
+        return self.acquire() is not None
+
+    def acquire(self, call: BreakerCall | None = None) -> BreakerCall | None:
+        """
+        Admit `call` (a new one when None) if a call may go to the backend
+        now; None when refused or when `call` was already settled.
+        """
+        with self._lock:
+            if call is not None and call.settled:
+                return None
+            if self.state == OPEN and self.probe is None:
+                if time.monotonic() - self._opened_at >= self.reset_seconds:
+                    self._set_state(HALF_OPEN)
+            if self.state == HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                trial = True
+            elif self.state == CLOSED:
+                trial = False
+            else:
+                return None
+            call = call or BreakerCall()
+            call.generation = self._generation
+            call.trial = trial
+            return call
+
+    def record_success(self, call: BreakerCall | None = None) -> None:
+        with self._lock:
+            if not self._settle(call):
+                return
+            if self.state == HALF_OPEN:
+                if call is not None and not call.trial:
+                    return
+                print(f"[circuit_breaker] {self.name} closed after successful trial")
+                self._set_state(CLOSED)
+            elif self.state == OPEN:
+                return
+            self._trial_in_flight = False
+            self._outcomes.append(True)
+
+    def record_failure(self, error: Exception | str | None = None, call: BreakerCall | None = None) -> None:
+        with self._lock:
+            if not self._settle(call):
+                return
+            self._last_error = str(error) if error is not None else self._last_error
+            if self.state == HALF_OPEN:
+                if call is None or call.trial:
+                    self._open()
+                return
+            if self.state == OPEN:
+                return
+            self._trial_in_flight = False
+            self._outcomes.append(False)
+            if len(self._outcomes) >= self.min_calls:
+                failures = self._outcomes.count(False)
+                if failures / len(self._outcomes) >= self.failure_rate:
+                    self._open()
+
+    def _settle(self, call: BreakerCall | None) -> bool:
+        # Caller holds the lock. Whether an outcome for `call` still counts.
+        if call is None:
+            return True
+        if call.settled:
+            return False
+        call.settled = True
+        # A call given up on before it was admitted counts against the
+        # current state; an admitted one only within its own generation.
+        return call.generation is None or call.generation == self._generation
+
+    def _set_state(self, state: str) -> None:
+        # Caller holds the lock.
+        self.state = state
+        self._generation += 1
+        self._trial_in_flight = False
+        self._outcomes.clear()
+
+    def _open(self) -> None:
+        # Caller holds the lock.
+        print(f"[circuit_breaker] {self.name} open: {self._last_error}")
+        self._set_state(OPEN)
+        self._opened_at = time.monotonic()
+        if self.probe is not None and (self._prober is None or not self._prober.is_alive()):
+            self._prober = threading.Thread(target=self._probe_loop, name=f"{self.name}-probe", daemon=True)
+            self._prober.start()
+
+    def _probe_loop(self) -> None:
+        while True:
+            time.sleep(self.reset_seconds)
+            with self._lock:
+                if self.state != OPEN:
+                    return
+            try:
+                healthy = bool(self.probe())
+            except Exception as exc:
+                healthy = False
+                with self._lock:
+                    self._last_error = str(exc)
+            if healthy:
+                with self._lock:
+                    if self.state == OPEN:
+                        print(f"[circuit_breaker] {self.name} probe passed, half-open")
+                        self._set_state(HALF_OPEN)
+                return
+
+    def status(self) -> dict:
+        with self._lock:
+            calls = len(self._outcomes)
+            failures = self._outcomes.count(False)
+            return {
+                "state": self.state,
+                "recentCalls": calls,
+                "recentFailureRate": round(failures / calls, 3) if calls else 0.0,
+                "openForSeconds": round(time.monotonic() - self._opened_at, 1) if self.state == OPEN else 0.0,
+                "lastError": self._last_error,
+            }
@@ -0,0 +1,155 @@
+"""
+Corpus version for cache invalidation.
+
+Cached retrieval results are keyed by a short token derived from the entries
+table version (max(updated_at), row count). The token is refreshed off the
+request path:
+  - polled every `poll_seconds` in a daemon thread,
+  - immediately when Postgres sends NOTIFY on the `entries_changed` channel
+    (20261019_notify_entries_changed.sql fires it on every insert, update or
+    delete, i.e. after imports and moderation decisions).
+
+When the token moves, subscribers are called with (old, new) so they can drop
+entries cached under the old version; cache TTLs then only bound memory, not
+staleness.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import select
+import threading
+import time
+from typing import Any, Callable
+
+NOTIFY_CHANNEL = "entries_changed"
+UNVERSIONED = "unversioned"
+
+
+def version_token(version: Any) -> str:
+    """Stable short token for a table version tuple."""
+    return hashlib.sha256(repr(version).encode("utf-8")).hexdigest()[:12]
+
+
+class CorpusVersion:
+    def __init__(self, load_version: Callable[[], Any], poll_seconds: float) -> None:
+        self._load_version = load_version
+        self.poll_seconds = poll_seconds
+        self.token = UNVERSIONED
+        self._subscribers: list[Callable[[str, str], None]] = []
+        self._last_check = 0.0
+        self._refreshing = threading.Lock()
+        self._listener: threading.Thread | None = None
+        self.listening = False
+        self.listen_skipped: str | None = None
+
+    def subscribe(self, callback: Callable[[str, str], None]) -> None:
+        self._subscribers.append(callback)
+
+    def current(self) -> str:
+        """Return the last known token and schedule a version check when due."""
+        if time.monotonic() - self._last_check >= self.poll_seconds:
+            self.refresh_async()
+        return self.token
+
+    def refresh_async(self) -> None:
+        if not self._refreshing.acquire(blocking=False):
+            return
+        self._last_check = time.monotonic()
+        threading.Thread(target=self._refresh_locked, name="corpus-version", daemon=True).start()
+
+    def refresh(self) -> bool:
+        """Synchronously reload the version; True when the token moved."""
+        with self._refreshing:
+            self._last_check = time.monotonic()
+            return self._refresh()
+
+    def _refresh_locked(self) -> None:
+        try:
+            self._refresh()
+        finally:
+            self._refreshing.release()
+
+    def _refresh(self) -> bool:
+        try:
+            token = version_token(self._load_version())
+        except Exception as exc:
+            print(f"[corpus_version] version check failed, keeping {self.token}: {exc}")
+            return False
+        if token == self.token:
+            return False
+        previous, self.token = self.token, token
+        for callback in self._subscribers:
+            try:
+                callback(previous, token)
+            except Exception as exc:
+                print(f"[corpus_version] subscriber failed: {exc}")
+        return True
+
+    def status(self) -> dict:
+        return {"token": self.token, "listening": self.listening, "listenSkipped": self.listen_skipped}
+
+    def skip_listen(self, reason: str) -> None:
+        """Record why NOTIFY-driven refresh is not running; polling still is."""
+        self.listen_skipped = reason
+        print(f"[corpus_version] not listening for {NOTIFY_CHANNEL}, polling every {self.poll_seconds:g}s: {reason}")
+
+    def listen(self, connect: Callable[[], Any], channel: str = NOTIFY_CHANNEL) -> None:
+        """
+        LISTEN on `channel` in a daemon thread and refresh on every NOTIFY.
+        `connect()` must return a dedicated psycopg2 or psycopg (3)
+        connection; it is reopened with backoff if it drops. Polling keeps
+        running either way.
+        """
+        if self._listener is not None:
+            return
+        self._listener = threading.Thread(
+            target=self._listen_loop, args=(connect, channel), name="corpus-listen", daemon=True
+        )
+        self._listener.start()
+
+    def _listen_loop(self, connect: Callable[[], Any], channel: str) -> None:
+        backoff = 1.0
+        while True:
+            conn = None
+            try:
+                conn = connect()
+                # autocommit cannot be switched inside the transaction a pool
+                # checkout may have opened.
+                conn.rollback()
+                conn.autocommit = True
+                with conn.cursor() as cursor:
+                    cursor.execute(f"LISTEN {channel}")
+                self.listening = True
+                backoff = 1.0
+                # Catch up on changes made while not listening.
+                self.refresh()
+                while True:
+                    if self._wait_for_notify(conn):
+                        self.refresh()
+            except Exception as exc:
+                self.listening = False
+                print(f"[corpus_version] LISTEN {channel} failed, retrying in {backoff:.0f}s: {exc}")
+            finally:
+                if conn is not None:
+                    try:
+                        conn.close()
+                    except Exception:
+                        pass
+            time.sleep(backoff)
+            backoff = min(backoff * 2, 60.0)
+
+    def _wait_for_notify(self, conn: Any) -> bool:
+        """True when a NOTIFY arrived within poll_seconds."""
+        if callable(getattr(conn, "notifies", None)):
+            # psycopg 3: notifies() is a generator that waits up to `timeout`.
+            return any(True for _ in conn.notifies(timeout=self.poll_seconds, stop_after=1))
+        # psycopg2: wait for the socket, then read the queued notifications.
+        readable, _, _ = select.select([conn], [], [], self.poll_seconds)
+        if not readable:
+            return False
+        conn.poll()
+        if not conn.notifies:
+            return False
+        conn.notifies.clear()
+        return True
@@ -4,6 +4,7 @@ REST endpoints for query rewrite, answer synthesis, and enrichment suggestion.
 
 from __future__ import annotations
 
+import asyncio
 import json
 import os
 import re
@@ -11,8 +12,11 @@ import time
 from pathlib import Path
 
 from fastapi import APIRouter
+from fastapi.responses import StreamingResponse
 
 from .cache import (
+    CACHE_SOFT_TTL_SYNTHESIZE,
+    CACHE_TTL_DEGRADED,
     CACHE_TTL_ENRICH,
     CACHE_TTL_RETRIEVE,
     CACHE_TTL_REWRITE,
@@ -23,11 +27,25 @@ from .cache import (
     fingerprint_payload,
     normalize_query,
 )
+from .evidence_packing import estimate_tokens, pack_evidence
 from .provider import AIProviderError, get_provider
-from .retrieval import retrieve_evidence
+from .retrieval import (
+    CORPUS_VERSION,
+    _get_query_analyzer,
+    _load_topic_registry,
+    analyze_query,
+    corpus_version,
+    retrieve_evidence_batch,
+    retrieve_evidence_with_status,
+)
 from .routing import ModelRouter
+from .semantic_cache import SemanticAnswerIndex
+from .singleflight import SingleFlight
+from .vector_retrieval import cached_query_embedding
 from .schemas import (
     AnswerResponse,
+    BatchQueryRequest,
+    BatchRetrieveResponse,
     ChatRequest,
     ChatResponse,
     EnrichmentFacet,
@@ -39,10 +57,16 @@ from .schemas import (
     RetrieveResponse,
     RewriteResponse,
 )
+from . import telemetry
 from .telemetry import log_telemetry
+from .topic_matcher import fold_keyword as _normalize_keyword
 
 router = APIRouter()
 model_router = ModelRouter()
+# Concurrent identical requests share one computation (keyed like ai_cache).
+inflight = SingleFlight()
+# Near-duplicate questions with identical evidence share a synthesized answer.
+semantic_answers = SemanticAnswerIndex.from_env()
 provider = get_provider()
 MAX_REWRITE_TOKENS = 24
 MAX_SYNTHESIS_TOKENS = 400
@@ -102,19 +126,11 @@ def _load_taxonomy_ids(filename, key):
     return result
 
 
-def _load_topic_profiles():
-    path = REPO_ROOT / "data" / "_topics" / "trusted_topic_sources.json"
-    try:
-        payload = json.loads(path.read_text(encoding="utf-8"))
-    except Exception:
-        return []
-    return payload.get("topics", []) if isinstance(payload, dict) else []
-
-
 KNOWN_TOPICS = _load_taxonomy_ids("topics.json", "topics")
 KNOWN_TAGS = _load_taxonomy_ids("tags.json", "tags")
 KNOWN_TARGET_GROUPS = _load_taxonomy_ids("target_groups.json", "targetGroups")
-TOPIC_PROFILES = _load_topic_profiles()
+# Same object as the retrieval registry, so both share one compiled QueryAnalyzer.
+TOPIC_PROFILES = _load_topic_registry()
 STOPWORDS = {
     "aber",
     "alle",
@@ -217,14 +233,6 @@ def _cacheable_response(model):
     return model
 
 
-def _parse_evidence_payload(content):
-    try:
-        payload = json.loads(content)
-    except Exception:
-        return None
-    return payload if isinstance(payload, dict) else None
-
-
 def _best_text(payload, field_name):
     field = payload.get(field_name) if isinstance(payload, dict) else None
     if not isinstance(field, dict):
@@ -257,7 +265,7 @@ def _evidence_cards(evidence):
     cards = []
     sources = []
     for ev in [item for item in evidence if item.confidence >= 0.7][:3]:
-        payload = _parse_evidence_payload(ev.content)
+        payload = ev.payload
         if not payload:
             continue
         title = payload.get("title") or "Unbekannter Eintrag"
@@ -360,7 +368,7 @@ def _extractive_answer(evidence):
 def _deterministic_local_rewrite(query):
     normalized = " ".join((query or "").strip().split())
     lowered = normalized.lower()
-    matched_topics = _match_topic_profiles(normalized)
+    matched_topics = _query_topic_profiles(normalized)
 
     if matched_topics:
         top_topic = matched_topics[0]
@@ -387,54 +395,6 @@ def _deterministic_local_rewrite(query):
     return normalized.lower()
 
 
-def _compact_evidence_block(evidence):
-    """
-    Render up to 5 evidence items as numbered context blocks for the LLM.
-
-    Items sourced from the RAG corpus (source == "rag") include knowledge_layer
-    and source_trust_level from provenance so the model can weigh authority.
-    Items with confidence < 0.5 are excluded.
-    """
-    MAX_ITEMS = 5
-    CONTENT_EXCERPT_LEN = 320
-
-    eligible = [item for item in evidence if item.confidence >= 0.5][:MAX_ITEMS]
-    compact_rows = []
-
-    for index, ev in enumerate(eligible, start=1):
-        try:
-            payload = json.loads(ev.content)
-        except Exception:
-            payload = {}
-        if not isinstance(payload, dict):
-            payload = {}
-
-        summary = payload.get("summary", {}) if isinstance(payload.get("summary"), dict) else {}
-        content = payload.get("content", {}) if isinstance(payload.get("content"), dict) else {}
-        provenance = payload.get("provenance", {}) if isinstance(payload.get("provenance"), dict) else {}
-
-        excerpt = (content.get("de") or content.get("en") or summary.get("de") or "")[:CONTENT_EXCERPT_LEN]
-
-        lines = [
-            f"[{index}] {payload.get('title') or 'Unbekannt'}",
-            f"URL: {payload.get('url') or provenance.get('source') or 'unbekannt'}",
-        ]
-
-        # Trust metadata only available for RAG chunks
-        trust = provenance.get("source_trust_level") or ""
-        layer = provenance.get("knowledge_layer") or ""
-        section = provenance.get("section_title") or ""
-        if trust or layer:
-            lines.append(f"Quelle: {trust} / {layer}" + (f" – {section}" if section else ""))
-
-        if excerpt:
-            lines.append(f"Text: {excerpt}")
-
-        compact_rows.append("\n".join(lines))
-
-    return "\n\n".join(compact_rows)
-
-
 def _clean_chat_messages(messages):
     cleaned = []
     for message in messages or []:
@@ -459,13 +419,13 @@ def _compact_chat_history(messages):
     )
 
 
-def _standalone_chat_query(messages, model, explicit_escalation=False):
+async def _standalone_chat_query(messages, model, explicit_escalation=False):
     latest = _latest_user_message(messages)
     if not latest or len(messages) <= 1 or not provider.is_configured():
         return latest
 
     try:
-        completion = provider.generate_text(
+        completion = await provider.agenerate_text(
             model=model,
             system_prompt=CHAT_QUERY_SYSTEM_PROMPT,
             user_prompt=(
@@ -497,39 +457,13 @@ def _clean_list(values):
     return cleaned
 
 
-def _normalize_keyword(value):
-    return (
-        value.lower()
-        .replace("ä", "ae")
-        .replace("ö", "oe")
-        .replace("ü", "ue")
-        .replace("ß", "ss")
-        .replace("Ã¤", "ae")
-        .replace("Ã¶", "oe")
-        .replace("Ã¼", "ue")
-        .replace("ÃŸ", "ss")
-    )
-
-
 def _match_topic_profiles(text):
-    normalized = _normalize_keyword(text or "")
-    tokens = set(re.findall(r"[a-z0-9_-]{3,}", normalized))
-    matches = []
+    return _get_query_analyzer(TOPIC_PROFILES).matcher.rank_profiles(text)
 
-    for topic in TOPIC_PROFILES:
-        if not isinstance(topic, dict):
-            continue
-        keywords = [
-            _normalize_keyword(keyword)
-            for keyword in topic.get("keywords", [])
-            if isinstance(keyword, str)
-        ]
-        hits = sum(1 for keyword in keywords if keyword in normalized or keyword in tokens)
-        if hits > 0:
-            matches.append((hits, topic))
 
-    matches.sort(key=lambda item: (-item[0], str(item[1].get("id") or "")))
-    return [topic for _, topic in matches]
+def _query_topic_profiles(query):
+    """Topic profiles for a user query, from the shared memoized analysis."""
+    return list(analyze_query(query, TOPIC_PROFILES).topic_profiles)
 
 
 def _topic_refs(topics, limit=3):
@@ -732,25 +666,81 @@ def _derive_metadata_suggestions(entry):
     return metadata, summary, quality_flags, matched_topic_refs
 
 
+def _purge_stale_retrievals(previous: str, current: str):
+    # Both namespaces put the corpus version right after the prefix.
+    for namespace in ("retrieve", "synthesize_query"):
+        fresh_prefix = cache_key(namespace, current, "")
+        dropped = ai_cache.purge(
+            lambda key: key.startswith(f"{namespace}::") and not key.startswith(fresh_prefix)
+        )
+        telemetry.increment(f"cache.{namespace}_purged", dropped)
+
+
+CORPUS_VERSION.subscribe(_purge_stale_retrievals)
+
+
 @router.post("/retrieve", response_model=RetrieveResponse)
 async def retrieve_only(body: QueryRequest):
     start = time.time()
     normalized_query = normalize_query(body.query)
-    retrieve_cache_key = cache_key("retrieve", normalized_query)
+    retrieve_cache_key = cache_key("retrieve", corpus_version(), normalized_query)
     cached = ai_cache.get(retrieve_cache_key)
     if cached is not None:
         return RetrieveResponse(**cached)
+    return await inflight.run(retrieve_cache_key, lambda: _retrieve(body.query, retrieve_cache_key, start))
 
-    evidence = retrieve_evidence(body.query)
-    sufficient = any(ev.confidence >= 0.7 for ev in evidence)
+
+async def _retrieve(query, retrieve_cache_key, start):
+    evidence, degraded_legs = await retrieve_evidence_with_status(query)
     latency = int((time.time() - start) * 1000)
-    response = RetrieveResponse(
+    response = _retrieve_response(evidence, degraded_legs, latency)
+    ai_cache.set(retrieve_cache_key, _cacheable_response(response), _retrieve_ttl(response))
+    return response
+
+
+def _retrieve_response(evidence, degraded_legs, latency):
+    sufficient = any(ev.confidence >= 0.7 for ev in evidence)
+    return RetrieveResponse(
         evidence=evidence,
         weak_evidence=not sufficient,
         latency_ms=latency,
+        degraded=bool(degraded_legs),
+        degraded_legs=degraded_legs,
     )
-    ai_cache.set(retrieve_cache_key, _cacheable_response(response), CACHE_TTL_RETRIEVE)
-    return response
+
+
+def _retrieve_ttl(response):
+    return CACHE_TTL_DEGRADED if response.degraded else CACHE_TTL_RETRIEVE
+
+
+@router.post("/retrieve/batch", response_model=BatchRetrieveResponse)
+async def retrieve_batch(body: BatchQueryRequest):
+    """
+    /retrieve for several queries. Cached queries are answered from the
+    /retrieve cache; the rest share one keyword statement, one embedding call
+    and one Qdrant batch query.
+    """
+    start = time.time()
+    version = corpus_version()
+    keys = [cache_key("retrieve", version, normalize_query(query)) for query in body.queries]
+    results: list[RetrieveResponse | None] = []
+    pending: dict[str, str] = {}
+    for query, key in zip(body.queries, keys):
+        cached = ai_cache.get(key)
+        results.append(RetrieveResponse(**cached) if cached is not None else None)
+        if cached is None:
+            pending.setdefault(key, query)
+
+    if pending:
+        evidence_lists, degraded_legs = await retrieve_evidence_batch(list(pending.values()))
+        latency = int((time.time() - start) * 1000)
+        fresh = {}
+        for key, evidence in zip(pending, evidence_lists):
+            fresh[key] = _retrieve_response(evidence, degraded_legs, latency)
+            ai_cache.set(key, _cacheable_response(fresh[key]), _retrieve_ttl(fresh[key]))
+        results = [result if result is not None else fresh[key] for result, key in zip(results, keys)]
+
+    return BatchRetrieveResponse(results=results, latency_ms=int((time.time() - start) * 1000))
 
 
 @router.post("/rewrite", response_model=RewriteResponse)
@@ -762,7 +752,10 @@ async def rewrite_query(body: QueryRequest):
     cached = ai_cache.get(rewrite_cache_key)
     if cached is not None:
         return RewriteResponse(**cached)
+    return await inflight.run(rewrite_cache_key, lambda: _rewrite(body, model, rewrite_cache_key, start))
 
+
+async def _rewrite(body, model, rewrite_cache_key, start):
     if not provider.is_configured():
         latency = int((time.time() - start) * 1000)
         log_telemetry("rewrite", model, latency, False, 0, 0.0)
@@ -773,14 +766,14 @@ async def rewrite_query(body: QueryRequest):
             latency_ms=latency,
             fallback=True,
             explanation="No AI provider configured; returning the original query.",
-            matched_topics=[item["name"] for item in _topic_refs(_match_topic_profiles(body.query))],
+            matched_topics=[item["name"] for item in _topic_refs(_query_topic_profiles(body.query))],
         )
         ai_cache.set(rewrite_cache_key, _cacheable_response(response), CACHE_TTL_REWRITE)
         return response
 
     use_deterministic_local = provider.name == "ollama" and LOCAL_REWRITE_STRATEGY == "deterministic"
     if use_deterministic_local:
-        matched_topics = [item["name"] for item in _topic_refs(_match_topic_profiles(body.query))]
+        matched_topics = [item["name"] for item in _topic_refs(_query_topic_profiles(body.query))]
         rewritten_query = _deterministic_local_rewrite(body.query)
         latency = int((time.time() - start) * 1000)
         response = RewriteResponse(
@@ -800,7 +793,7 @@ async def rewrite_query(body: QueryRequest):
         return response
 
     try:
-        completion = provider.generate_text(
+        completion = await provider.agenerate_text(
             model=model,
             system_prompt=REWRITE_SYSTEM_PROMPT,
             user_prompt=(
@@ -821,7 +814,7 @@ async def rewrite_query(body: QueryRequest):
             provider=provider.name,
             latency_ms=latency,
             fallback=False,
-            matched_topics=[item["name"] for item in _topic_refs(_match_topic_profiles(body.query))],
+            matched_topics=[item["name"] for item in _topic_refs(_query_topic_profiles(body.query))],
         )
         ai_cache.set(rewrite_cache_key, _cacheable_response(response), CACHE_TTL_REWRITE)
         return response
@@ -835,7 +828,7 @@ async def rewrite_query(body: QueryRequest):
             latency_ms=latency,
             fallback=True,
             explanation=str(exc),
-            matched_topics=[item["name"] for item in _topic_refs(_match_topic_profiles(body.query))],
+            matched_topics=[item["name"] for item in _topic_refs(_query_topic_profiles(body.query))],
         )
         ai_cache.set(rewrite_cache_key, _cacheable_response(response), CACHE_TTL_REWRITE)
         return response
@@ -845,18 +838,325 @@ async def rewrite_query(body: QueryRequest):
 async def synthesize_answer(body: QueryRequest):
     start = time.time()
     model = model_router.route("synthesize", explicit_escalation=body.explicit_escalation)
-    evidence = retrieve_evidence(body.query)
-    sufficient = any(ev.confidence >= 0.7 for ev in evidence)
-    plain_language_variants = PlainLanguageAnswerVariants()
-    if sufficient:
-        _, _, plain_language_variants = _extractive_answer(evidence)
-    normalized_query = normalize_query(body.query)
-    evidence_hash = fingerprint_evidence(evidence)
-    synth_cache_key = cache_key("synthesize", model, normalized_query, evidence_hash)
-    cached = ai_cache.get(synth_cache_key)
+    cached = _query_level_synthesis(body.query, model)
     if cached is not None:
-        return AnswerResponse(**cached)
+        return cached
+    evidence, degraded_legs = await _coalesced_evidence(body.query)
+    degraded = bool(degraded_legs)
+    sufficient, extractive, evidence_hash, synth_cache_key = _prepare_synthesis(
+        body.query, model, evidence, degraded
+    )
+    cached = _cached_synthesis(
+        body.query,
+        model,
+        evidence_hash,
+        synth_cache_key,
+        lambda: _synthesize(
+            body, model, evidence, sufficient, extractive, synth_cache_key, start, False, degraded
+        ),
+    )
+    if cached is not None:
+        return cached
+    return await inflight.run(
+        synth_cache_key,
+        lambda: _synthesize(
+            body, model, evidence, sufficient, extractive, synth_cache_key, start, degraded=degraded
+        ),
+    )
+
+
+@router.post("/synthesize/stream")
+async def synthesize_answer_stream(body: QueryRequest):
+    """
+    /synthesize as server-sent events: "evidence" as soon as retrieval is
+    done, "token" events while the provider generates, and "done" with the
+    full AnswerResponse, which is cached like a /synthesize answer.
+    """
+    return _event_stream(_synthesize_events(body))
+
+
+async def _synthesize_events(body):
+    start = time.time()
+    model = model_router.route("synthesize", explicit_escalation=body.explicit_escalation)
+    cached = _query_level_synthesis(body.query, model)
+    if cached is not None:
+        yield _sse("evidence", {"evidence": [item.model_dump() for item in cached.evidence]})
+        telemetry.observe("ttfb_ms.synthesize/stream", (time.time() - start) * 1000)
+        if cached.answer:
+            yield _sse("token", {"text": cached.answer})
+        yield _sse("done", cached.model_dump())
+        return
+    evidence, degraded_legs = await _coalesced_evidence(body.query)
+    yield _sse("evidence", {"evidence": [item.model_dump() for item in evidence]})
+    telemetry.observe("ttfb_ms.synthesize/stream", (time.time() - start) * 1000)
+
+    degraded = bool(degraded_legs)
+    sufficient, extractive, evidence_hash, synth_cache_key = _prepare_synthesis(
+        body.query, model, evidence, degraded
+    )
+    response = _cached_synthesis(
+        body.query,
+        model,
+        evidence_hash,
+        synth_cache_key,
+        lambda: _synthesize(
+            body, model, evidence, sufficient, extractive, synth_cache_key, start, False, degraded
+        ),
+    )
+    if response is None and sufficient and _uses_completion():
+        result = {}
+        prompt = _synthesis_prompt(body.query, evidence)
+        async for event in _token_events(model, prompt[0], start, "synthesize/stream", result):
+            yield event
+        if "error" in result:
+            response = _failed_synthesis(model, evidence, extractive[2], start, result["error"])
+        else:
+            response = _completed_synthesis(model, evidence, extractive[2], start, result, prompt)
+        _cache_synthesis(synth_cache_key, response, degraded=degraded)
+    else:
+        if response is None:
+            response = await inflight.run(
+                synth_cache_key,
+                lambda: _synthesize(
+                    body, model, evidence, sufficient, extractive, synth_cache_key, start, degraded=degraded
+                ),
+            )
+        if response.answer:
+            yield _sse("token", {"text": response.answer})
+    yield _sse("done", response.model_dump())
+
+
+def _query_synthesis_key(query, model):
+    return cache_key("synthesize_query", corpus_version(), model, normalize_query(query))
+
+
+def _query_level_synthesis(query, model):
+    """
+    A fresh cached answer found without retrieval, else None. The
+    query-level key (corpus version, model, normalized query) remembers the
+    evidence fingerprint the query last retrieved, which completes the
+    synthesize key. Stale answers and misses take the full path, where the
+    fingerprint of freshly retrieved evidence is the correctness check.
+    """
+    pointer = ai_cache.get(_query_synthesis_key(query, model))
+    if pointer is None:
+        return None
+    cached = ai_cache.lookup(cache_key("synthesize", model, normalize_query(query), pointer["evidence_hash"]))
+    if cached is None or not cached[1]:
+        return None
+    telemetry.increment("cache.synthesize_query_hits")
+    return AnswerResponse(**cached[0])
+
+
+def _prepare_synthesis(query, model, evidence, degraded=False):
+    """
+    (sufficient, extractive answer, evidence fingerprint, synthesize cache
+    key) for retrieved evidence; points the query-level key at it. The
+    extractive (answer, sources, plain-language variants) is built once and
+    reused by every branch of _synthesize. Evidence fused with a failed
+    leg is pointed at only for CACHE_TTL_DEGRADED.
+    """
+    sufficient, extractive = _evidence_state(evidence)
+    evidence_hash = fingerprint_evidence(evidence)
+    synth_cache_key = cache_key("synthesize", model, normalize_query(query), evidence_hash)
+    # Retrieved evidence for a query is reused as long as /retrieve reuses it.
+    ttl = CACHE_TTL_DEGRADED if degraded else CACHE_TTL_RETRIEVE
+    ai_cache.set(_query_synthesis_key(query, model), {"evidence_hash": evidence_hash}, ttl)
+    return sufficient, extractive, evidence_hash, synth_cache_key
+
+
+def _cached_synthesis(query, model, evidence_hash, synth_cache_key, refresh):
+    """
+    The cached answer for synth_cache_key or a near-duplicate question, else
+    None. A stale answer is still returned and recomputed in the background
+    with refresh().
+    """
+    cached = ai_cache.lookup(synth_cache_key)
+    if cached is None:
+        cached = _semantic_synthesis_hit(query, model, evidence_hash, synth_cache_key)
+    if cached is None:
+        return None
+    value, fresh = cached
+    if not fresh:
+        telemetry.increment("cache.synthesize_stale_served")
+        _refresh_in_background(synth_cache_key, refresh)
+    return AnswerResponse(**value)
+
+
+def _semantic_synthesis_hit(query, model, evidence_hash, synth_cache_key):
+    """
+    A fresh cached answer to a similar question that retrieved the same
+    evidence, as (value, fresh); None on a miss. A miss registers this query
+    under synth_cache_key, which the answer about to be computed will fill.
+    """
+    if semantic_answers is None:
+        return None
+    vector = cached_query_embedding(query)
+    if vector is None:
+        return None
+    match = semantic_answers.match(model, evidence_hash, vector)
+    if match is not None:
+        cached = ai_cache.lookup(match[0])
+        if cached is not None and cached[1]:
+            telemetry.increment("cache.synthesize_semantic_hits")
+            return cached
+    telemetry.increment("cache.synthesize_semantic_misses")
+    semantic_answers.remember(model, evidence_hash, vector, synth_cache_key)
+    return None
+
+
+_background_refreshes: set = set()
+
+
+def _refresh_in_background(key, compute):
+    """Recompute a stale entry without making the current request wait; one refresh per key at a time."""
+    task = asyncio.ensure_future(inflight.run(key, compute))
+    _background_refreshes.add(task)
+    task.add_done_callback(_finish_refresh)
+    telemetry.increment("cache.background_refreshes")
+
+
+def _finish_refresh(task):
+    _background_refreshes.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        telemetry.increment("cache.background_refresh_errors")
+        print(f"[endpoints] background refresh failed: {task.exception()}")
+
+
+def _cache_synthesis(synth_cache_key, response, cache_fallbacks=True, degraded=False):
+    """
+    Store an answer with the soft/hard synthesize TTLs. A background refresh
+    passes cache_fallbacks=False so a provider error does not replace the
+    stale answer that is still being served. An answer over degraded
+    evidence is kept only for CACHE_TTL_DEGRADED.
+    """
+    if response.fallback and not cache_fallbacks:
+        return
+    if degraded:
+        ai_cache.set(synth_cache_key, _cacheable_response(response), CACHE_TTL_DEGRADED)
+        return
+    ai_cache.set(
+        synth_cache_key, _cacheable_response(response), CACHE_TTL_SYNTHESIZE, CACHE_SOFT_TTL_SYNTHESIZE
+    )
+
+
+async def _coalesced_evidence(query):
+    """
+    retrieve_evidence_with_status as (evidence, degraded_legs), shared by
+    identical queries in flight at the same time.
+    """
+    key = cache_key("evidence", corpus_version(), normalize_query(query))
+    return await inflight.run(key, lambda: retrieve_evidence_with_status(query))
+
+
+def _uses_completion():
+    """Whether sufficient evidence is answered by the provider rather than extractively."""
+    use_extractive_local = provider.name == "ollama" and LOCAL_SYNTHESIS_STRATEGY == "extractive"
+    return not use_extractive_local and provider.is_configured()
+
+
+def _sse(event, data):
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+def _event_stream(events):
+    # X-Accel-Buffering keeps nginx-style proxies from holding back the events.
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+async def _token_events(model, user_prompt, start, feature, result):
+    """
+    Stream a completion as "token" events. The assembled text and usage end
+    up in `result` ({"text", "usage"}), or the AIProviderError as "error".
+    """
+    parts = []
+    try:
+        async for chunk in provider.astream_text(
+            model=model,
+            system_prompt=SYNTHESIZE_SYSTEM_PROMPT,
+            user_prompt=user_prompt,
+            temperature=0.2,
+            max_tokens=MAX_SYNTHESIS_TOKENS,
+        ):
+            if "delta" in chunk:
+                if not parts:
+                    telemetry.observe(f"first_token_ms.{feature}", (time.time() - start) * 1000)
+                parts.append(chunk["delta"])
+                yield _sse("token", {"text": chunk["delta"]})
+            else:
+                result["usage"] = chunk["usage"]
+    except AIProviderError as exc:
+        result["error"] = exc
+        return
+    result["text"] = "".join(parts).strip()
+
+
+def _synthesis_prompt(query, evidence):
+    """(user prompt, PackedEvidence) for a synthesis completion."""
+    packed = pack_evidence(evidence)
+    prompt = (
+        f"User question:\n{query}\n\n"
+        f"Retrieved evidence:\n{packed.text}\n\n"
+        "Provide a short German answer grounded only in the evidence. "
+        "Prefer the most directly relevant unemployment/help entries first. "
+        "Use at most 3 bullet points or 3 short sentences."
+    )
+    return prompt, packed
+
+
+def _prompt_usage(completion, user_prompt, packed):
+    """Provider usage plus the estimated prompt size and how the evidence was packed."""
+    usage, total_tokens = _usage_totals(completion)
+    usage = {
+        **usage,
+        **packed.usage(),
+        "prompt_tokens_estimated": estimate_tokens(SYNTHESIZE_SYSTEM_PROMPT) + estimate_tokens(user_prompt),
+    }
+    return usage, total_tokens
+
 
+def _completed_synthesis(model, evidence, plain_language_variants, start, completion, prompt):
+    usage, total_tokens = _prompt_usage(completion, *prompt)
+    latency = int((time.time() - start) * 1000)
+    log_telemetry("synthesize", model, latency, True, total_tokens, 0.0)
+    return AnswerResponse(
+        answer=completion["text"],
+        explanation="Antwort basiert auf abgerufenen Einträgen.",
+        sources=[ev.source for ev in evidence if ev.confidence >= 0.7],
+        provider=provider.name,
+        model=model,
+        latency_ms=latency,
+        fallback=False,
+        evidence=evidence,
+        usage=usage,
+        plain_language=plain_language_variants,
+    )
+
+
+def _failed_synthesis(model, evidence, plain_language_variants, start, exc):
+    latency = int((time.time() - start) * 1000)
+    log_telemetry("synthesize", model, latency, False, 0, 0.0)
+    return AnswerResponse(
+        answer=None,
+        explanation=str(exc),
+        sources=[ev.source for ev in evidence if ev.confidence >= 0.7],
+        provider=provider.name,
+        model=model,
+        latency_ms=latency,
+        fallback=True,
+        evidence=evidence,
+        plain_language=plain_language_variants,
+    )
+
+
+async def _synthesize(
+    body, model, evidence, sufficient, extractive, synth_cache_key, start, cache_fallbacks=True, degraded=False
+):
+    plain_language_variants = extractive[2]
     if not sufficient:
         latency = int((time.time() - start) * 1000)
         log_telemetry("synthesize", model, latency, False, 0, 0.0)
@@ -872,12 +1172,12 @@ async def synthesize_answer(body: QueryRequest):
             weak_evidence=True,
             plain_language=plain_language_variants,
         )
-        ai_cache.set(synth_cache_key, _cacheable_response(response), CACHE_TTL_SYNTHESIZE)
+        _cache_synthesis(synth_cache_key, response, cache_fallbacks, degraded)
         return response
 
     use_extractive_local = provider.name == "ollama" and LOCAL_SYNTHESIS_STRATEGY == "extractive"
     if use_extractive_local:
-        answer, sources, plain_language_variants = _extractive_answer(evidence)
+        answer, sources, plain_language_variants = extractive
         latency = int((time.time() - start) * 1000)
         response = AnswerResponse(
             answer=answer,
@@ -891,7 +1191,7 @@ async def synthesize_answer(body: QueryRequest):
             weak_evidence=False,
             plain_language=plain_language_variants,
         )
-        ai_cache.set(synth_cache_key, _cacheable_response(response), CACHE_TTL_SYNTHESIZE)
+        _cache_synthesis(synth_cache_key, response, cache_fallbacks, degraded)
         log_telemetry("synthesize", model, latency, True, 0, 0.0)
         return response
 
@@ -910,58 +1210,23 @@ async def synthesize_answer(body: QueryRequest):
             weak_evidence=False,
             plain_language=plain_language_variants,
         )
-        ai_cache.set(synth_cache_key, _cacheable_response(response), CACHE_TTL_SYNTHESIZE)
+        _cache_synthesis(synth_cache_key, response, cache_fallbacks, degraded)
         return response
 
-    evidence_block = _compact_evidence_block(evidence)
-
+    prompt = _synthesis_prompt(body.query, evidence)
     try:
-        completion = provider.generate_text(
+        completion = await provider.agenerate_text(
             model=model,
             system_prompt=SYNTHESIZE_SYSTEM_PROMPT,
-            user_prompt=(
-                f"User question:\n{body.query}\n\n"
-                f"Retrieved evidence:\n{evidence_block}\n\n"
-                "Provide a short German answer grounded only in the evidence. "
-                "Prefer the most directly relevant unemployment/help entries first. "
-                "Use at most 3 bullet points or 3 short sentences."
-            ),
+            user_prompt=prompt[0],
             temperature=0.2,
             max_tokens=MAX_SYNTHESIS_TOKENS,
         )
-        usage, total_tokens = _usage_totals(completion)
-        latency = int((time.time() - start) * 1000)
-        log_telemetry("synthesize", model, latency, True, total_tokens, 0.0)
-        response = AnswerResponse(
-            answer=completion["text"],
-            explanation="Antwort basiert auf abgerufenen Einträgen.",
-            sources=[ev.source for ev in evidence if ev.confidence >= 0.7],
-            provider=provider.name,
-            model=model,
-            latency_ms=latency,
-            fallback=False,
-            evidence=evidence,
-            usage=usage,
-            plain_language=plain_language_variants,
-        )
-        ai_cache.set(synth_cache_key, _cacheable_response(response), CACHE_TTL_SYNTHESIZE)
-        return response
+        response = _completed_synthesis(model, evidence, plain_language_variants, start, completion, prompt)
     except AIProviderError as exc:
-        latency = int((time.time() - start) * 1000)
-        log_telemetry("synthesize", model, latency, False, 0, 0.0)
-        response = AnswerResponse(
-            answer=None,
-            explanation=str(exc),
-            sources=[ev.source for ev in evidence if ev.confidence >= 0.7],
-            provider=provider.name,
-            model=model,
-            latency_ms=latency,
-            fallback=True,
-            evidence=evidence,
-            plain_language=plain_language_variants,
-        )
-        ai_cache.set(synth_cache_key, _cacheable_response(response), CACHE_TTL_SYNTHESIZE)
-        return response
+        response = _failed_synthesis(model, evidence, plain_language_variants, start, exc)
+    _cache_synthesis(synth_cache_key, response, cache_fallbacks, degraded)
+    return response
 
 
 @router.post("/chat", response_model=ChatResponse)
@@ -969,8 +1234,76 @@ async def chat_answer(body: ChatRequest):
     start = time.time()
     model = model_router.route("synthesize", explicit_escalation=body.explicit_escalation)
     messages = _clean_chat_messages(body.messages)
-    standalone_query = _standalone_chat_query(messages, model, body.explicit_escalation)
+    standalone_query = await _standalone_chat_query(messages, model, body.explicit_escalation)
+    evidence, degraded_legs = (
+        await retrieve_evidence_with_status(standalone_query) if standalone_query else ([], [])
+    )
+    sufficient, extractive = _evidence_state(evidence)
+
+    response = _chat_without_completion(standalone_query, model, evidence, sufficient, extractive, start)
+    if response is not None:
+        return response
+    prompt = _chat_prompt(standalone_query, messages, evidence)
+    try:
+        completion = await provider.agenerate_text(
+            model=model,
+            system_prompt=SYNTHESIZE_SYSTEM_PROMPT,
+            user_prompt=prompt[0],
+            temperature=0.2,
+            max_tokens=MAX_SYNTHESIS_TOKENS,
+        )
+        return _completed_chat(standalone_query, model, evidence, extractive[2], start, completion, prompt)
+    except AIProviderError as exc:
+        return _failed_chat(standalone_query, model, evidence, extractive, start, exc)
 
+
+@router.post("/chat/stream")
+async def chat_answer_stream(body: ChatRequest):
+    """/chat as server-sent events, in the same event order as /synthesize/stream."""
+    return _event_stream(_chat_events(body))
+
+
+async def _chat_events(body):
+    start = time.time()
+    model = model_router.route("synthesize", explicit_escalation=body.explicit_escalation)
+    messages = _clean_chat_messages(body.messages)
+    standalone_query = await _standalone_chat_query(messages, model, body.explicit_escalation)
+    evidence, degraded_legs = (
+        await retrieve_evidence_with_status(standalone_query) if standalone_query else ([], [])
+    )
+    yield _sse(
+        "evidence",
+        {"standalone_query": standalone_query or "", "evidence": [item.model_dump() for item in evidence]},
+    )
+    telemetry.observe("ttfb_ms.chat/stream", (time.time() - start) * 1000)
+
+    sufficient, extractive = _evidence_state(evidence)
+    response = _chat_without_completion(standalone_query, model, evidence, sufficient, extractive, start)
+    if response is None:
+        result = {}
+        prompt = _chat_prompt(standalone_query, messages, evidence)
+        async for event in _token_events(model, prompt[0], start, "chat/stream", result):
+            yield event
+        if "error" in result:
+            response = _failed_chat(standalone_query, model, evidence, extractive, start, result["error"])
+        else:
+            response = _completed_chat(standalone_query, model, evidence, extractive[2], start, result, prompt)
+    elif response.answer:
+        yield _sse("token", {"text": response.answer})
+    yield _sse("done", response.model_dump())
+
+
+def _evidence_state(evidence):
+    """(sufficient, extractive answer); the extractive answer is only built for sufficient evidence."""
+    sufficient = any(ev.confidence >= 0.7 for ev in evidence)
+    if not sufficient:
+        return False, (None, [], PlainLanguageAnswerVariants())
+    return True, _extractive_answer(evidence)
+
+
+def _chat_without_completion(standalone_query, model, evidence, sufficient, extractive, start):
+    """The chat response when no provider completion is needed, else None."""
+    plain_language_variants = extractive[2]
     if not standalone_query:
         latency = int((time.time() - start) * 1000)
         return ChatResponse(
@@ -986,12 +1319,6 @@ async def chat_answer(body: ChatRequest):
             weak_evidence=True,
         )
 
-    evidence = retrieve_evidence(standalone_query)
-    sufficient = any(ev.confidence >= 0.7 for ev in evidence)
-    plain_language_variants = PlainLanguageAnswerVariants()
-    if sufficient:
-        _, _, plain_language_variants = _extractive_answer(evidence)
-
     if not sufficient:
         latency = int((time.time() - start) * 1000)
         log_telemetry("chat", model, latency, False, 0, 0.0)
@@ -1011,7 +1338,7 @@ async def chat_answer(body: ChatRequest):
 
     use_extractive_local = provider.name == "ollama" and LOCAL_SYNTHESIS_STRATEGY == "extractive"
     if use_extractive_local or not provider.is_configured():
-        answer, sources, plain_language_variants = _extractive_answer(evidence)
+        answer, sources, plain_language_variants = extractive
         latency = int((time.time() - start) * 1000)
         log_telemetry("chat", model, latency, True, 0, 0.0)
         return ChatResponse(
@@ -1027,54 +1354,57 @@ async def chat_answer(body: ChatRequest):
             weak_evidence=False,
             plain_language=plain_language_variants,
         )
+    return None
 
-    evidence_block = _compact_evidence_block(evidence)
-    try:
-        completion = provider.generate_text(
-            model=model,
-            system_prompt=SYNTHESIZE_SYSTEM_PROMPT,
-            user_prompt=(
-                f"Standalone user question:\n{standalone_query}\n\n"
-                f"Recent chat history:\n{_compact_chat_history(messages)}\n\n"
-                f"Retrieved evidence:\n{evidence_block}\n\n"
-                "Answer the latest user question in German, grounded only in the evidence. "
-                "If the chat history asks for follow-up context, use it only to understand references, not as a source of facts."
-            ),
-            temperature=0.2,
-            max_tokens=MAX_SYNTHESIS_TOKENS,
-        )
-        usage, total_tokens = _usage_totals(completion)
-        latency = int((time.time() - start) * 1000)
-        log_telemetry("chat", model, latency, True, total_tokens, 0.0)
-        return ChatResponse(
-            standalone_query=standalone_query,
-            answer=completion["text"],
-            explanation="Antwort basiert auf abgerufenen Eintraegen.",
-            sources=[ev.source for ev in evidence if ev.confidence >= 0.7],
-            provider=provider.name,
-            model=model,
-            latency_ms=latency,
-            fallback=False,
-            evidence=evidence,
-            usage=usage,
-            plain_language=plain_language_variants,
-        )
-    except AIProviderError as exc:
-        answer, sources, plain_language_variants = _extractive_answer(evidence)
-        latency = int((time.time() - start) * 1000)
-        log_telemetry("chat", model, latency, False, 0, 0.0)
-        return ChatResponse(
-            standalone_query=standalone_query,
-            answer=answer,
-            explanation=str(exc),
-            sources=sources,
-            provider=provider.name,
-            model=model,
-            latency_ms=latency,
-            fallback=True,
-            evidence=evidence,
-            plain_language=plain_language_variants,
-        )
+
+def _chat_prompt(standalone_query, messages, evidence):
+    """(user prompt, PackedEvidence) for a chat completion."""
+    packed = pack_evidence(evidence)
+    prompt = (
+        f"Standalone user question:\n{standalone_query}\n\n"
+        f"Recent chat history:\n{_compact_chat_history(messages)}\n\n"
+        f"Retrieved evidence:\n{packed.text}\n\n"
+        "Answer the latest user question in German, grounded only in the evidence. "
+        "If the chat history asks for follow-up context, use it only to understand references, not as a source of facts."
+    )
+    return prompt, packed
+
+
+def _completed_chat(standalone_query, model, evidence, plain_language_variants, start, completion, prompt):
+    usage, total_tokens = _prompt_usage(completion, *prompt)
+    latency = int((time.time() - start) * 1000)
+    log_telemetry("chat", model, latency, True, total_tokens, 0.0)
+    return ChatResponse(
+        standalone_query=standalone_query,
+        answer=completion["text"],
+        explanation="Antwort basiert auf abgerufenen Eintraegen.",
+        sources=[ev.source for ev in evidence if ev.confidence >= 0.7],
+        provider=provider.name,
+        model=model,
+        latency_ms=latency,
+        fallback=False,
+        evidence=evidence,
+        usage=usage,
+        plain_language=plain_language_variants,
+    )
+
+
+def _failed_chat(standalone_query, model, evidence, extractive, start, exc):
+    answer, sources, plain_language_variants = extractive
+    latency = int((time.time() - start) * 1000)
+    log_telemetry("chat", model, latency, False, 0, 0.0)
+    return ChatResponse(
+        standalone_query=standalone_query,
+        answer=answer,
+        explanation=str(exc),
+        sources=sources,
+        provider=provider.name,
+        model=model,
+        latency_ms=latency,
+        fallback=True,
+        evidence=evidence,
+        plain_language=plain_language_variants,
+    )
 
 
 @router.post("/enrich", response_model=EnrichmentSuggestion)
@@ -1092,7 +1422,10 @@ async def suggest_enrichment(body: EnrichmentRequest):
     cached = ai_cache.get(enrich_cache_key)
     if cached is not None:
         return EnrichmentSuggestion(**cached)
+    return await inflight.run(enrich_cache_key, lambda: _enrich(body, model, entry_payload, enrich_cache_key, start))
+
 
+async def _enrich(body, model, entry_payload, enrich_cache_key, start):
     metadata, summary, quality_flags, matched_topics = _derive_metadata_suggestions(entry_payload)
     deterministic_response = EnrichmentSuggestion(
         entry_id=body.entry_id,
@@ -1141,7 +1474,7 @@ async def suggest_enrichment(body: EnrichmentRequest):
         return response
 
     try:
-        completion = provider.generate_text(
+        completion = await provider.agenerate_text(
             model=model,
             system_prompt=ENRICH_SYSTEM_PROMPT,
             user_prompt=(
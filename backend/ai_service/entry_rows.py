@@ -0,0 +1,77 @@
+"""
+Rows of the entries table and the entry documents built from them.
+
+retrieval.py reads entries rows and serves them as entry documents
+(normalize_entry_row). crawlers/cli.py import_to_db writes the rows; it
+validates the document normalize_entry_row builds from the row it is about
+to write, not the raw crawler entry, so the stored schema_valid flag is the
+verdict the online check would reach.
+"""
+
+from __future__ import annotations
+
+import datetime
+
+# Columns read for an entry document.
+ENTRY_COLUMNS = (
+    "id", "domain", "title_de", "title_en", "title_easy_de",
+    "summary_de", "summary_en", "summary_easy_de",
+    "content_de", "content_en", "content_easy_de",
+    "url", "topics", "tags", "target_groups",
+    "valid_from", "valid_until", "deadline", "status",
+    "first_seen", "last_seen", "source_unavailable",
+    "provenance", "translations", "quality_scores",
+)
+
+DATE_FIELDS = ("validFrom", "validUntil", "deadline", "firstSeen", "lastSeen")
+
+
+def pick_text(*values):
+    for value in values:
+        if isinstance(value, str) and value.strip():
+            return value.strip()
+    return None
+
+
+def normalize_entry_row(row: dict) -> dict:
+    """The entry document for an entries row (ENTRY_COLUMNS; extra keys are ignored)."""
+    title_de = pick_text(row.get("title_de"))
+    title_en = pick_text(row.get("title_en"))
+    title_easy_de = pick_text(row.get("title_easy_de"))
+
+    normalized = {
+        "id": row.get("id"),
+        "title": pick_text(row.get("title"), title_de, title_en, title_easy_de, row.get("url")),
+        "summary": {
+            "de": pick_text(row.get("summary_de")),
+            "en": pick_text(row.get("summary_en")),
+            "easy_de": pick_text(row.get("summary_easy_de")),
+        },
+        "content": {
+            "de": pick_text(row.get("content_de")),
+            "en": pick_text(row.get("content_en")),
+            "easy_de": pick_text(row.get("content_easy_de")),
+        },
+        "url": row.get("url"),
+        "topics": row.get("topics") or [],
+        "tags": row.get("tags") or [],
+        "targetGroups": row.get("target_groups") or [],
+        "validFrom": row.get("valid_from"),
+        "validUntil": row.get("valid_until"),
+        "deadline": row.get("deadline"),
+        "status": row.get("status"),
+        "firstSeen": row.get("first_seen"),
+        "lastSeen": row.get("last_seen"),
+        "sourceUnavailable": row.get("source_unavailable") or False,
+        "provenance": row.get("provenance"),
+        "qualityScores": row.get("quality_scores"),
+        "translations": row.get("translations"),
+        "domain": row.get("domain"),
+    }
+
+    # Only the DATE/TIMESTAMP columns can carry datetime objects; JSONB comes back as plain JSON.
+    for field in DATE_FIELDS:
+        value = normalized.get(field)
+        if isinstance(value, datetime.date):
+            normalized[field] = value.isoformat()
+    return normalized
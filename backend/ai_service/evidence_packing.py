@@ -0,0 +1,157 @@
+"""
+Token-budgeted evidence packing for synthesis and chat prompts.
+
+Prompt size decides Ollama prefill time and OpenAI cost, so the evidence
+block is filled against a token budget instead of a fixed item count.
+Eligible items (confidence >= 0.5) are taken in relevance order, each
+excerpt is cut at a sentence boundary to the per-block cap or to what is
+left of the budget, and an item whose text is a near-duplicate of one
+already packed (same fact from two crawls, two chunks of one page) is
+skipped so it does not cost a second slot.
+
+Token counts are estimates (characters / CHARS_PER_TOKEN); no tokenizer is
+loaded. The estimate is reported next to the provider's own prompt_tokens
+in the response usage.
+
+Env vars:
+  AI_EVIDENCE_TOKEN_BUDGET  tokens for the whole evidence block, default 480
+  AI_EVIDENCE_BLOCK_TOKENS  cap for one excerpt, default 120
+"""
+
+from __future__ import annotations
+
+import math
+import os
+import re
+from dataclasses import dataclass
+
+from .rerank_features import OVERLAP_STOP_WORDS
+
+# German text runs at roughly 3.5-4 characters per token with the
+# qwen2.5 and GPT tokenizers; erring low keeps the budget conservative.
+CHARS_PER_TOKEN = 3.5
+MIN_CONFIDENCE = 0.5
+MAX_BLOCKS = 8
+# Token-set Jaccard similarity at which an excerpt counts as a duplicate.
+DUPLICATE_SIMILARITY = 0.8
+# Blocks are not started when less than this is left for their excerpt.
+MIN_EXCERPT_TOKENS = 16
+
+TOKEN_BUDGET = int(os.getenv("AI_EVIDENCE_TOKEN_BUDGET", "480"))
+BLOCK_TOKENS = int(os.getenv("AI_EVIDENCE_BLOCK_TOKENS", "120"))
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+_WORD = re.compile(r"\w{3,}")
+
+
+def estimate_tokens(text: str) -> int:
+    return math.ceil(len(text) / CHARS_PER_TOKEN) if text else 0
+
+
+def truncate_sentences(text: str, max_tokens: int) -> str:
+    """Leading whole sentences of `text` within `max_tokens`; a first sentence
+    longer than that is cut at a word boundary instead."""
+    text = " ".join(str(text or "").split())
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    kept: list[str] = []
+    for sentence in _SENTENCE_END.split(text):
+        if estimate_tokens(" ".join([*kept, sentence])) > max_tokens:
+            break
+        kept.append(sentence)
+    if kept:
+        return " ".join(kept)
+    cut = text[: int(max_tokens * CHARS_PER_TOKEN) - 1].rsplit(" ", 1)[0]
+    return f"{cut}…" if cut else ""
+
+
+def _word_set(text: str) -> set[str]:
+    # Like rerank_features.overlap_tokens, but punctuation does not make two
+    # crawls of the same sentence look different.
+    return {word for word in _WORD.findall(text.lower()) if word not in OVERLAP_STOP_WORDS}
+
+
+def _similar(tokens: set[str], seen: list[set[str]]) -> bool:
+    for other in seen:
+        union = tokens | other
+        if union and len(tokens & other) / len(union) >= DUPLICATE_SIMILARITY:
+            return True
+    return False
+
+
+def _parts(payload: dict) -> tuple[list[str], str]:
+    """Header lines and full excerpt text of one evidence payload."""
+    summary = payload.get("summary", {}) if isinstance(payload.get("summary"), dict) else {}
+    content = payload.get("content", {}) if isinstance(payload.get("content"), dict) else {}
+    provenance = payload.get("provenance", {}) if isinstance(payload.get("provenance"), dict) else {}
+
+    header = [
+        str(payload.get("title") or "Unbekannt"),
+        f"URL: {payload.get('url') or provenance.get('source') or 'unbekannt'}",
+    ]
+    # Trust metadata only available for RAG chunks
+    trust = provenance.get("source_trust_level") or ""
+    layer = provenance.get("knowledge_layer") or ""
+    section = provenance.get("section_title") or ""
+    if trust or layer:
+        header.append(f"Quelle: {trust} / {layer}" + (f" – {section}" if section else ""))
+    return header, content.get("de") or content.get("en") or summary.get("de") or ""
+
+
+@dataclass(frozen=True)
+class PackedEvidence:
+    text: str
+    tokens: int
+    blocks: int
+    duplicates: int
+    over_budget: int
+
+    def usage(self) -> dict:
+        return {
+            "evidence_tokens": self.tokens,
+            "evidence_blocks": self.blocks,
+            "evidence_dropped_duplicates": self.duplicates,
+            "evidence_dropped_budget": self.over_budget,
+        }
+
+
+def pack_evidence(evidence, token_budget: int | None = None, block_tokens: int | None = None) -> PackedEvidence:
+    """
+    Render eligible evidence as numbered "[n] Title" blocks within
+    `token_budget`. Items keep retrieval order among equal confidence.
+    """
+    budget = TOKEN_BUDGET if token_budget is None else token_budget
+    cap = BLOCK_TOKENS if block_tokens is None else block_tokens
+    eligible = sorted(
+        (item for item in evidence if item.confidence >= MIN_CONFIDENCE),
+        key=lambda item: -item.confidence,
+    )
+
+    rows: list[str] = []
+    seen: list[set[str]] = []
+    used = duplicates = over_budget = 0
+    for position, ev in enumerate(eligible):
+        header, text = _parts(ev.payload or {})
+        tokens = _word_set(f"{header[0]} {text}")
+        if tokens and _similar(tokens, seen):
+            duplicates += 1
+            continue
+        lines = [f"[{len(rows) + 1}] {header[0]}", *header[1:]]
+        # The blank line between blocks and the "\nText: " label cost a few
+        # tokens each; they are charged before the excerpt is sized.
+        cost = estimate_tokens("\n".join(lines)) + (1 if rows else 0) + 2
+        room = min(cap, budget - used - cost)
+        if len(rows) >= MAX_BLOCKS or room < MIN_EXCERPT_TOKENS:
+            over_budget = len(eligible) - position
+            break
+        excerpt = truncate_sentences(text, room) if text else ""
+        if excerpt:
+            lines.append(f"Text: {excerpt}")
+        block = "\n".join(lines)
+        rows.append(block)
+        seen.append(tokens)
+        used += estimate_tokens(block) + (1 if len(rows) > 1 else 0)
+
+    return PackedEvidence(
+        text="\n\n".join(rows), tokens=used, blocks=len(rows), duplicates=duplicates, over_budget=over_budget
+    )
@@ -7,21 +7,30 @@ Run with:
 
 Endpoints:
     /rewrite (POST)
+    /retrieve (POST)
+    /retrieve/batch (POST)
     /synthesize (POST)
     /enrich (POST)
     /health (GET)
+    /metrics (GET)
 """
 from fastapi import FastAPI, Request
 from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from dotenv import load_dotenv
 
+import json
 import time
 import os
 from pathlib import Path
 from collections import defaultdict, deque
-from .endpoints import router
+from . import telemetry
+from .cache import CACHE_SWEEP_SECONDS, ai_cache
+from .db import pool_status
+from .endpoints import provider as completion_provider, router, semantic_answers
 from .provider import get_provider
+from .retrieval import corpus_version, corpus_version_status, warm_snapshot, watch_corpus_version
+from .vector_retrieval import embedding_cache_stats, vector_leg_status
 from .turnstile import is_turnstile_configured, verify_turnstile_token
 
 PROJECT_ROOT = Path(__file__).resolve().parents[2]
@@ -49,10 +58,44 @@ app.add_middleware(
 
 app.include_router(router)
 
+
+@app.on_event("startup")
+def load_retrieval_snapshot():
+    warm_snapshot()
+    watch_corpus_version()
+    ai_cache.start_sweeper(CACHE_SWEEP_SECONDS)
+
+
+@app.on_event("shutdown")
+async def close_provider_pool():
+    await completion_provider.aclose()
+
+
+async def _rate_limit_cost(request: Request) -> int:
+    """
+    Rate-limit slots a request takes. /retrieve/batch is charged per query,
+    capped at the limit so a full batch still fits an empty bucket.
+    """
+    if request.url.path != "/retrieve/batch":
+        return 1
+    try:
+        payload = json.loads(await request.body())
+    except ValueError:
+        return 1
+    queries = payload.get("queries") if isinstance(payload, dict) else None
+    if not isinstance(queries, list):
+        return 1
+    return min(max(len(queries), 1), RATE_LIMIT_MAX_REQUESTS)
+
+
 @app.middleware("http")
 async def log_requests(request: Request, call_next):
-    if request.method == "POST" and request.url.path in {"/rewrite", "/retrieve", "/synthesize", "/enrich"}:
-        if request.url.path in {"/rewrite", "/retrieve", "/synthesize"} and is_turnstile_configured():
+    if request.method == "POST" and request.url.path in {
+        "/rewrite", "/retrieve", "/retrieve/batch", "/synthesize", "/synthesize/stream", "/enrich"
+    }:
+        if request.url.path in {
+            "/rewrite", "/retrieve", "/retrieve/batch", "/synthesize", "/synthesize/stream"
+        } and is_turnstile_configured():
             token = request.headers.get("x-turnstile-token")
             verification = verify_turnstile_token(
                 token,
@@ -70,10 +113,11 @@ async def log_requests(request: Request, call_next):
 
         client_ip = request.client.host if request.client else "unknown"
         bucket = RATE_LIMIT_BUCKETS[(client_ip, request.url.path)]
+        cost = await _rate_limit_cost(request)
         now = time.time()
         while bucket and (now - bucket[0]) > RATE_LIMIT_WINDOW_SECONDS:
             bucket.popleft()
-        if len(bucket) >= RATE_LIMIT_MAX_REQUESTS:
+        if len(bucket) + cost > RATE_LIMIT_MAX_REQUESTS:
             return JSONResponse(
                 status_code=429,
                 content={
@@ -81,12 +125,15 @@ async def log_requests(request: Request, call_next):
                     "message": "Too many AI requests. Please wait and try again.",
                 },
             )
-        bucket.append(now)
+        bucket.extend([now] * cost)
 
     start = time.time()
     response = await call_next(request)
     latency = int((time.time() - start) * 1000)
     # TODO: log feature, model, latency, success, token/cost estimates
+    if request.method == "POST" and not response.headers.get("content-type", "").startswith("text/event-stream"):
+        # Streaming endpoints record their own TTFB when the first event is sent.
+        telemetry.observe(f"ttfb_ms.{request.url.path.strip('/')}", latency)
     return response
 
 # Allow running directly: python backend/ai_service/gateway.py
@@ -106,6 +153,8 @@ def health():
     return {
         "status": "ok",
         "provider": provider.healthcheck(),
+        "vectorLeg": vector_leg_status(),
+        "corpusVersion": corpus_version_status(),
         "turnstile": {
             "configured": is_turnstile_configured(),
             "siteKey": turnstile_site_key,
@@ -115,6 +164,31 @@ def health():
     }
 
 
+def _time_to_first_byte(observations):
+    """Average ms until the first response byte per endpoint, the headline latency."""
+    return {
+        name[len("ttfb_ms."):]: round(stats["sum"] / stats["count"], 1)
+        for name, stats in observations.items()
+        if name.startswith("ttfb_ms.") and stats["count"]
+    }
+
+
+@app.get("/metrics")
+def metrics():
+    snapshot = telemetry.snapshot()
+    return {
+        "timeToFirstByteMs": _time_to_first_byte(snapshot["observations"]),
+        **snapshot,
+        "dbPool": pool_status(),
+        "corpusVersion": corpus_version(),
+        "embeddingCache": embedding_cache_stats(),
+        "responseCache": ai_cache.stats(),
+        "sharedCache": ai_cache.l2_stats(),
+        "semanticCache": semantic_answers.stats() if semantic_answers is not None else None,
+        "providerPool": completion_provider.pool_stats(),
+    }
+
+
 @app.get("/version")
 def version():
     turnstile_site_key = (
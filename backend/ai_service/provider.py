@@ -3,16 +3,32 @@ Provider adapters for the Systemfehler AI sidecar.
 
 The gateway stays runnable without an LLM backend, but useful AI features only
 become available when a provider is configured.
+
+The endpoints call agenerate_text, or astream_text for the streaming
+endpoints. Ollama and OpenAI send both through one keep-alive
+httpx.AsyncClient per provider, so completions reuse TCP/TLS connections and
+a slow model no longer blocks the event loop. The sync generate_text stays
+for scripts and uses urllib (see PooledHTTPProvider). Without httpx
+installed, agenerate_text runs generate_text in a worker thread and
+astream_text yields the whole answer as one chunk.
+
+Env vars:
+  AI_PROVIDER_CONNECT_TIMEOUT_SECONDS  default 5
+  AI_PROVIDER_READ_TIMEOUT_SECONDS     default 60; also the wait for a free connection
+  AI_PROVIDER_MAX_CONNECTIONS          connections per provider, default 10
 """
 
 from __future__ import annotations
 
+import asyncio
 import json
 import os
 import socket
+import time
 import urllib.error
 import urllib.request
-from typing import Any, Dict, Optional
+from abc import ABC, abstractmethod
+from typing import Any, AsyncIterator, Dict, Optional
 
 
 class AIProviderError(RuntimeError):
@@ -39,6 +55,326 @@ class BaseProvider:
     ) -> Dict[str, Any]:
         raise AIProviderError("No AI provider configured")
 
+    async def agenerate_text(
+        self,
+        *,
+        model: str,
+        system_prompt: str,
+        user_prompt: str,
+        temperature: float = 0.1,
+        max_tokens: int | None = None,
+    ) -> Dict[str, Any]:
+        return await asyncio.to_thread(
+            self.generate_text,
+            model=model,
+            system_prompt=system_prompt,
+            user_prompt=user_prompt,
+            temperature=temperature,
+            max_tokens=max_tokens,
+        )
+
+    async def astream_text(
+        self,
+        *,
+        model: str,
+        system_prompt: str,
+        user_prompt: str,
+        temperature: float = 0.1,
+        max_tokens: int | None = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Yield {"delta": text} chunks as they arrive, then one {"usage": {...}}."""
+        completion = await self.agenerate_text(
+            model=model,
+            system_prompt=system_prompt,
+            user_prompt=user_prompt,
+            temperature=temperature,
+            max_tokens=max_tokens,
+        )
+        yield {"delta": completion["text"]}
+        yield {"usage": completion["usage"]}
+
+    def pool_stats(self) -> Dict[str, Any] | None:
+        return None
+
+    async def aclose(self) -> None:
+        return None
+
+
+class PooledHTTPProvider(BaseProvider, ABC):
+    """
+    HTTP transport shared by the Ollama and OpenAI adapters.
+
+    Async calls go through one keep-alive httpx.AsyncClient. Sync calls
+    (generate_text, healthcheck) use urllib on purpose: httpx is optional,
+    and urllib is what agenerate_text falls back to without it. A sync
+    wrapper over the async client would also need an event loop of its own
+    and could not reuse the pooled connections, which belong to the
+    server's loop. Both transports build requests from _headers and map
+    failures through _http_error / _timeout_error / _unreachable_error, so
+    they raise the same AIProviderError messages. urllib has no separate
+    connect timeout; read_timeout bounds the whole sync call.
+    """
+
+    label = "Provider"
+
+    def __init__(self, base_url: str) -> None:
+        self.base_url = base_url
+        self.connect_timeout = float(os.getenv("AI_PROVIDER_CONNECT_TIMEOUT_SECONDS", "5"))
+        self.read_timeout = float(os.getenv("AI_PROVIDER_READ_TIMEOUT_SECONDS", "60"))
+        self.max_connections = int(os.getenv("AI_PROVIDER_MAX_CONNECTIONS", "10"))
+        self.requests = 0
+        self.connections_opened = 0
+        self.connect_seconds = 0.0
+        self._client = None
+        self._client_loop = None
+        self._retiring: set[asyncio.Future] = set()
+
+    def _headers(self) -> Dict[str, str]:
+        return {"Content-Type": "application/json"}
+
+    def _http_error(self, status: int, detail: str) -> AIProviderError:
+        return AIProviderError(f"{self.label} HTTP {status}: {detail}")
+
+    def _timeout_error(self) -> AIProviderError:
+        return AIProviderError(f"{self.label} request timed out")
+
+    def _unreachable_error(self) -> AIProviderError:
+        return AIProviderError(f"{self.label} unreachable at {self.base_url}")
+
+    def _request(
+        self, path: str, payload: Optional[Dict[str, Any]] = None, *, timeout: float | None = None
+    ) -> Dict[str, Any]:
+        """Sync JSON request: POST with a payload, GET without."""
+        request = urllib.request.Request(
+            f"{self.base_url}{path}",
+            data=None if payload is None else json.dumps(payload).encode("utf-8"),
+            headers=self._headers(),
+            method="GET" if payload is None else "POST",
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=timeout or self.read_timeout) as response:
+                return json.loads(response.read().decode("utf-8"))
+        except urllib.error.HTTPError as exc:
+            raise self._http_error(exc.code, exc.read().decode("utf-8", errors="replace")) from exc
+        except urllib.error.URLError as exc:
+            # urlopen wraps a connect timeout in URLError.
+            if isinstance(exc.reason, (TimeoutError, socket.timeout)):
+                raise self._timeout_error() from exc
+            raise self._unreachable_error() from exc
+        except (TimeoutError, socket.timeout) as exc:
+            raise self._timeout_error() from exc
+
+    def _post(self, path: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        return self._request(path, payload)
+
+    def generate_text(
+        self,
+        *,
+        model: str,
+        system_prompt: str,
+        user_prompt: str,
+        temperature: float = 0.1,
+        max_tokens: int | None = None,
+    ) -> Dict[str, Any]:
+        return self._parse_chat(
+            self._post(self.chat_path, self._chat_payload(model, system_prompt, user_prompt, temperature, max_tokens))
+        )
+
+    async def agenerate_text(
+        self,
+        *,
+        model: str,
+        system_prompt: str,
+        user_prompt: str,
+        temperature: float = 0.1,
+        max_tokens: int | None = None,
+    ) -> Dict[str, Any]:
+        return self._parse_chat(
+            await self._apost(self.chat_path, self._chat_payload(model, system_prompt, user_prompt, temperature, max_tokens))
+        )
+
+    def _async_client(self):
+        """The pooled client of the running event loop; None when httpx is not installed."""
+        try:
+            import httpx
+        except ImportError:
+            return None
+        loop = asyncio.get_running_loop()
+        # Connections belong to one event loop; scripts and tests that call
+        # asyncio.run repeatedly get a fresh pool per loop.
+        if self._client is None or self._client_loop is not loop:
+            if self._client is not None:
+                self._retire_client(self._client, self._client_loop)
+            self._client = httpx.AsyncClient(
+                headers=self._headers(),
+                timeout=httpx.Timeout(self.read_timeout, connect=self.connect_timeout),
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                ),
+            )
+            self._client_loop = loop
+        return self._client
+
+    def _retire_client(self, client, loop) -> asyncio.Future:
+        """Close a client left behind by another event loop."""
+        if loop.is_running() and not loop.is_closed():
+            # Still serving another thread; close it there.
+            future = asyncio.wrap_future(asyncio.run_coroutine_threadsafe(client.aclose(), loop))
+        else:
+            # The loop is gone and its transports cannot be shut down cleanly;
+            # closing still marks the client unusable and drops its pool.
+            future = asyncio.ensure_future(self._aclose_quietly(client))
+        self._retiring.add(future)
+        future.add_done_callback(self._retiring.discard)
+        return future
+
+    @staticmethod
+    async def _aclose_quietly(client) -> None:
+        try:
+            await client.aclose()
+        except RuntimeError:
+            pass
+
+    async def _trace(self, event: str, info: Dict[str, Any], started: Dict[str, float]) -> None:
+        # httpcore reports TCP connect and TLS handshake only for new connections.
+        step, _, phase = event.rpartition(".")
+        if step not in ("connection.connect_tcp", "connection.start_tls"):
+            return
+        if phase == "started":
+            started[step] = time.perf_counter()
+        elif phase == "complete" and step in started:
+            self.connect_seconds += time.perf_counter() - started.pop(step)
+            if step == "connection.connect_tcp":
+                self.connections_opened += 1
+
+    async def _apost(self, path: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        client = self._async_client()
+        if client is None:
+            return await asyncio.to_thread(self._post, path, payload)
+        import httpx
+
+        started: Dict[str, float] = {}
+        self.requests += 1
+        try:
+            response = await client.post(
+                f"{self.base_url}{path}",
+                json=payload,
+                extensions={"trace": lambda event, info: self._trace(event, info, started)},
+            )
+        except httpx.TimeoutException as exc:
+            raise self._timeout_error() from exc
+        except httpx.HTTPError as exc:
+            raise self._unreachable_error() from exc
+        if response.status_code >= 400:
+            raise self._http_error(response.status_code, response.text)
+        return response.json()
+
+    async def _astream_lines(self, path: str, payload: Dict[str, Any]) -> AsyncIterator[str]:
+        import httpx
+
+        client = self._async_client()
+        started: Dict[str, float] = {}
+        self.requests += 1
+        try:
+            async with client.stream(
+                "POST",
+                f"{self.base_url}{path}",
+                json=payload,
+                extensions={"trace": lambda event, info: self._trace(event, info, started)},
+            ) as response:
+                if response.status_code >= 400:
+                    detail = (await response.aread()).decode("utf-8", errors="replace")
+                    raise self._http_error(response.status_code, detail)
+                async for line in response.aiter_lines():
+                    if line.strip():
+                        yield line
+        except httpx.TimeoutException as exc:
+            raise self._timeout_error() from exc
+        except httpx.HTTPError as exc:
+            raise self._unreachable_error() from exc
+
+    async def astream_text(
+        self,
+        *,
+        model: str,
+        system_prompt: str,
+        user_prompt: str,
+        temperature: float = 0.1,
+        max_tokens: int | None = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        if self._async_client() is None:
+            async for chunk in super().astream_text(
+                model=model,
+                system_prompt=system_prompt,
+                user_prompt=user_prompt,
+                temperature=temperature,
+                max_tokens=max_tokens,
+            ):
+                yield chunk
+            return
+        payload = self._stream_payload(self._chat_payload(model, system_prompt, user_prompt, temperature, max_tokens))
+        usage = None
+        streamed = False
+        async for line in self._astream_lines(self.chat_path, payload):
+            try:
+                delta, line_usage = self._parse_stream_line(line)
+            except ValueError as exc:
+                raise AIProviderError(f"{self.label} sent an unreadable stream chunk") from exc
+            if delta:
+                streamed = True
+                yield {"delta": delta}
+            if line_usage is not None:
+                usage = line_usage
+        if not streamed:
+            raise AIProviderError(f"{self.label} returned no message content")
+        yield {"usage": usage or {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}}
+
+    @abstractmethod
+    def _chat_payload(
+        self, model: str, system_prompt: str, user_prompt: str, temperature: float, max_tokens: int | None
+    ) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def _parse_chat(self, response: Dict[str, Any]) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def _stream_payload(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def _parse_stream_line(self, line: str) -> tuple[str | None, Dict[str, Any] | None]:
+        """(text delta, usage) carried by one line of the streamed response."""
+        raise NotImplementedError
+
+    def pool_stats(self) -> Dict[str, Any]:
+        reused = max(self.requests - self.connections_opened, 0)
+        connect_ms = self.connect_seconds * 1000 / self.connections_opened if self.connections_opened else 0.0
+        return {
+            "provider": self.name,
+            "maxConnections": self.max_connections,
+            "connectTimeoutSeconds": self.connect_timeout,
+            "readTimeoutSeconds": self.read_timeout,
+            "requests": self.requests,
+            "connectionsOpened": self.connections_opened,
+            "connectionsReused": reused,
+            "avgConnectMs": round(connect_ms, 2),
+            # Setup time a fresh connection per call would have added.
+            "setupSavedMs": round(reused * connect_ms, 1),
+        }
+
+    async def aclose(self) -> None:
+        client, loop = self._client, self._client_loop
+        self._client, self._client_loop = None, None
+        if client is None:
+            return
+        if loop is asyncio.get_running_loop():
+            await client.aclose()
+        else:
+            await self._retire_client(client, loop)
+
 
 class NullProvider(BaseProvider):
     name = "none"
@@ -54,43 +390,24 @@ class NullProvider(BaseProvider):
         }
 
 
-class OllamaProvider(BaseProvider):
+class OllamaProvider(PooledHTTPProvider):
     name = "ollama"
+    label = "Ollama"
+    chat_path = "/api/chat"
 
     def __init__(self) -> None:
-        self.base_url = os.getenv("OLLAMA_BASE_URL", "http://127.0.0.1:11434").rstrip("/")
-
-    def _post(self, path: str, payload: Dict[str, Any]) -> Dict[str, Any]:
-        body = json.dumps(payload).encode("utf-8")
-        request = urllib.request.Request(
-            f"{self.base_url}{path}",
-            data=body,
-            headers={"Content-Type": "application/json"},
-            method="POST",
-        )
-        try:
-            with urllib.request.urlopen(request, timeout=60) as response:
-                return json.loads(response.read().decode("utf-8"))
-        except urllib.error.HTTPError as exc:
-            detail = exc.read().decode("utf-8", errors="replace")
-            raise AIProviderError(f"Ollama HTTP {exc.code}: {detail}") from exc
-        except urllib.error.URLError as exc:
-            raise AIProviderError(f"Ollama unreachable at {self.base_url}") from exc
-        except (TimeoutError, socket.timeout) as exc:
-            raise AIProviderError("Ollama request timed out") from exc
+        super().__init__(os.getenv("OLLAMA_BASE_URL", "http://127.0.0.1:11434").rstrip("/"))
 
     def healthcheck(self) -> Dict[str, Any]:
-        request = urllib.request.Request(f"{self.base_url}/api/tags", method="GET")
         try:
-            with urllib.request.urlopen(request, timeout=5) as response:
-                payload = json.loads(response.read().decode("utf-8"))
-                models = payload.get("models", []) if isinstance(payload, dict) else []
-                return {
-                    "provider": self.name,
-                    "configured": True,
-                    "status": "ok",
-                    "models": [model.get("name") for model in models if isinstance(model, dict)],
-                }
+            payload = self._request("/api/tags", timeout=5)
+            models = payload.get("models", []) if isinstance(payload, dict) else []
+            return {
+                "provider": self.name,
+                "configured": True,
+                "status": "ok",
+                "models": [model.get("name") for model in models if isinstance(model, dict)],
+            }
         except Exception as exc:
             return {
                 "provider": self.name,
@@ -99,19 +416,13 @@ class OllamaProvider(BaseProvider):
                 "error": str(exc),
             }
 
-    def generate_text(
-        self,
-        *,
-        model: str,
-        system_prompt: str,
-        user_prompt: str,
-        temperature: float = 0.1,
-        max_tokens: int | None = None,
+    def _chat_payload(
+        self, model: str, system_prompt: str, user_prompt: str, temperature: float, max_tokens: int | None
     ) -> Dict[str, Any]:
         options: Dict[str, Any] = {"temperature": temperature}
         if max_tokens is not None:
             options["num_predict"] = max_tokens
-        payload = {
+        return {
             "model": model,
             "messages": [
                 {"role": "system", "content": system_prompt},
@@ -120,56 +431,71 @@ class OllamaProvider(BaseProvider):
             "stream": False,
             "options": options,
         }
-        response = self._post("/api/chat", payload)
+
+    def _parse_chat(self, response: Dict[str, Any]) -> Dict[str, Any]:
         message = response.get("message", {}) if isinstance(response, dict) else {}
         content = message.get("content") if isinstance(message, dict) else None
         if not isinstance(content, str) or not content.strip():
             raise AIProviderError("Ollama returned no message content")
+        return {"text": content.strip(), "usage": self._usage(response)}
+
+    def _usage(self, response: Dict[str, Any]) -> Dict[str, int]:
         prompt_tokens = response.get("prompt_eval_count")
         completion_tokens = response.get("eval_count")
         return {
-            "text": content.strip(),
-            "usage": {
-                "prompt_tokens": int(prompt_tokens or 0),
-                "completion_tokens": int(completion_tokens or 0),
-                "total_tokens": int(prompt_tokens or 0) + int(completion_tokens or 0),
-            },
+            "prompt_tokens": int(prompt_tokens or 0),
+            "completion_tokens": int(completion_tokens or 0),
+            "total_tokens": int(prompt_tokens or 0) + int(completion_tokens or 0),
         }
 
+    def _stream_payload(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        return {**payload, "stream": True}
+
+    def _parse_stream_line(self, line: str) -> tuple[str | None, Dict[str, Any] | None]:
+        # NDJSON: {"message": {"content": "..."}, "done": false}, ..., {"done": true, "eval_count": ...}
+        chunk = json.loads(line)
+        if chunk.get("error"):
+            raise AIProviderError(f"Ollama error: {chunk['error']}")
+        message = chunk.get("message") or {}
+        delta = message.get("content") if isinstance(message, dict) else None
+        return delta, self._usage(chunk) if chunk.get("done") else None
+
 
-class OpenAIProvider(BaseProvider):
+class OpenAIProvider(PooledHTTPProvider):
     name = "openai"
+    label = "OpenAI"
+    chat_path = "/chat/completions"
 
     def __init__(self) -> None:
-        self.base_url = os.getenv("OPENAI_BASE_URL", "https://api.openai.com/v1").rstrip("/")
+        super().__init__(os.getenv("OPENAI_BASE_URL", "https://api.openai.com/v1").rstrip("/"))
         self.api_key = os.getenv("OPENAI_API_KEY", "")
 
     def is_configured(self) -> bool:
         return bool(self.api_key)
 
-    def _request(self, path: str, payload: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    def _headers(self) -> Dict[str, str]:
+        return {
+            "Content-Type": "application/json",
+            "Authorization": f"Bearer {self.api_key}",
+        }
+
+    async def _apost(self, path: str, payload: Dict[str, Any]) -> Dict[str, Any]:
         if not self.api_key:
             raise AIProviderError("OPENAI_API_KEY is not configured")
-        body = None if payload is None else json.dumps(payload).encode("utf-8")
-        request = urllib.request.Request(
-            f"{self.base_url}{path}",
-            data=body,
-            headers={
-                "Content-Type": "application/json",
-                "Authorization": f"Bearer {self.api_key}",
-            },
-            method="GET" if payload is None else "POST",
-        )
-        try:
-            with urllib.request.urlopen(request, timeout=60) as response:
-                return json.loads(response.read().decode("utf-8"))
-        except urllib.error.HTTPError as exc:
-            detail = exc.read().decode("utf-8", errors="replace")
-            raise AIProviderError(f"OpenAI HTTP {exc.code}: {detail}") from exc
-        except urllib.error.URLError as exc:
-            raise AIProviderError("OpenAI API is unreachable") from exc
-        except (TimeoutError, socket.timeout) as exc:
-            raise AIProviderError("OpenAI request timed out") from exc
+        return await super()._apost(path, payload)
+
+    async def _astream_lines(self, path: str, payload: Dict[str, Any]) -> AsyncIterator[str]:
+        if not self.api_key:
+            raise AIProviderError("OPENAI_API_KEY is not configured")
+        async for line in super()._astream_lines(path, payload):
+            yield line
+
+    def _request(
+        self, path: str, payload: Optional[Dict[str, Any]] = None, *, timeout: float | None = None
+    ) -> Dict[str, Any]:
+        if not self.api_key:
+            raise AIProviderError("OPENAI_API_KEY is not configured")
+        return super()._request(path, payload, timeout=timeout)
 
     def healthcheck(self) -> Dict[str, Any]:
         if not self.api_key:
@@ -193,14 +519,8 @@ class OpenAIProvider(BaseProvider):
                 "error": str(exc),
             }
 
-    def generate_text(
-        self,
-        *,
-        model: str,
-        system_prompt: str,
-        user_prompt: str,
-        temperature: float = 0.1,
-        max_tokens: int | None = None,
+    def _chat_payload(
+        self, model: str, system_prompt: str, user_prompt: str, temperature: float, max_tokens: int | None
     ) -> Dict[str, Any]:
         payload = {
             "model": model,
@@ -212,7 +532,9 @@ class OpenAIProvider(BaseProvider):
         }
         if max_tokens is not None:
             payload["max_tokens"] = max_tokens
-        response = self._request("/chat/completions", payload)
+        return payload
+
+    def _parse_chat(self, response: Dict[str, Any]) -> Dict[str, Any]:
         choices = response.get("choices", []) if isinstance(response, dict) else []
         if not choices:
             raise AIProviderError("OpenAI returned no choices")
@@ -221,15 +543,31 @@ class OpenAIProvider(BaseProvider):
         if not isinstance(content, str) or not content.strip():
             raise AIProviderError("OpenAI returned no message content")
         usage = response.get("usage", {}) if isinstance(response, dict) else {}
+        return {"text": content.strip(), "usage": self._usage(usage)}
+
+    def _usage(self, usage: Dict[str, Any]) -> Dict[str, int]:
         return {
-            "text": content.strip(),
-            "usage": {
-                "prompt_tokens": int(usage.get("prompt_tokens", 0) or 0),
-                "completion_tokens": int(usage.get("completion_tokens", 0) or 0),
-                "total_tokens": int(usage.get("total_tokens", 0) or 0),
-            },
+            "prompt_tokens": int(usage.get("prompt_tokens", 0) or 0),
+            "completion_tokens": int(usage.get("completion_tokens", 0) or 0),
+            "total_tokens": int(usage.get("total_tokens", 0) or 0),
         }
 
+    def _stream_payload(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        return {**payload, "stream": True, "stream_options": {"include_usage": True}}
+
+    def _parse_stream_line(self, line: str) -> tuple[str | None, Dict[str, Any] | None]:
+        # SSE: "data: {chunk}" lines ending with "data: [DONE]"; usage arrives in the last chunk.
+        if not line.startswith("data:"):
+            return None, None
+        data = line[len("data:"):].strip()
+        if data == "[DONE]":
+            return None, None
+        chunk = json.loads(data)
+        choices = chunk.get("choices") or []
+        delta = choices[0].get("delta", {}).get("content") if choices and isinstance(choices[0], dict) else None
+        usage = chunk.get("usage")
+        return delta, self._usage(usage) if isinstance(usage, dict) else None
+
 
 def get_provider() -> BaseProvider:
     provider_name = os.getenv("AI_PROVIDER", "none").strip().lower()
@@ -0,0 +1,145 @@
+"""
+Per-query analysis shared by /rewrite, /retrieve and /synthesize.
+
+One user interaction usually sends the same query to all three endpoints.
+QueryAnalyzer computes the term extraction, synonym expansion, intents,
+folded tokens and topic matches once per normalized query and keeps the
+result in a bounded LRU, so the reranker and the endpoints reuse it.
+"""
+
+from __future__ import annotations
+
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from . import telemetry
+from .cache import normalize_query
+from .snapshot_index import fold
+from .topic_matcher import TopicMatcher, TopicQueryContext
+
+STOPWORDS = {
+    "ich", "habe", "hab", "mein", "meinen", "meine", "meiner", "was", "nun",
+    "und", "oder", "der", "die", "das", "ein", "eine", "einer", "einem",
+    "für", "fuer", "mit", "von", "auf", "zu", "zum", "zur", "den", "dem",
+    "im", "in", "am", "an", "wie", "kann", "kannst", "können", "koennen",
+    "tun", "jetzt", "kurz", "hilfe", "bekomme", "bekommt", "bekommen",
+}
+
+SYNONYM_EXPANSIONS = {
+    "job": ["arbeitslosigkeit", "arbeitslos", "arbeitsagentur"],
+    "arbeitsplatz": ["arbeitslosigkeit", "arbeitslos", "arbeitsagentur"],
+    "verloren": ["arbeitslosigkeit", "arbeitslosengeld", "buergergeld"],
+    "bürgergeld": ["buergergeld", "jobcenter", "grundsicherung"],
+    "buergergeld": ["bürgergeld", "jobcenter", "grundsicherung"],
+    "arbeitslos": ["arbeitslosigkeit", "arbeitslosengeld", "buergergeld"],
+    "arbeitslosigkeit": ["arbeitslosengeld", "buergergeld", "jobcenter"],
+}
+
+INTENT_KEYWORDS = {
+    "unemployment": {
+        "arbeitslos", "arbeitslosigkeit", "job", "arbeitsplatz", "jobcenter",
+        "buergergeld", "bürgergeld", "arbeitsagentur", "arbeitslosengeld",
+        "kuendigung", "kündigung",
+    },
+    "family": {
+        "familie", "familien", "kind", "kinder", "eltern", "elterngeld",
+        "schwanger", "schwangerschaft",
+    },
+    "contact": {
+        "kontakt", "telefon", "anrufen", "sprechstunde", "erreichen",
+        "beratung", "hotline",
+    },
+    "application": {
+        "antrag", "beantragen", "anmelden", "formular", "online", "weiterbewilligung",
+    },
+}
+
+_TERM_RE = re.compile(r"[a-zA-ZäöüÄÖÜß0-9-]{3,}")
+_TOKEN_RE = re.compile(r"[^\W_]+")
+
+
+def extract_terms(query: str):
+    normalized = (query or "").lower()
+    tokens = _TERM_RE.findall(normalized)
+    seen = set()
+    terms = []
+
+    for token in tokens:
+        if token in STOPWORDS or token in seen:
+            continue
+        seen.add(token)
+        terms.append(token)
+        for synonym in SYNONYM_EXPANSIONS.get(token, []):
+            if synonym not in seen:
+                seen.add(synonym)
+                terms.append(synonym)
+
+    return terms[:8]
+
+
+def detect_intents(query: str, terms: list[str]):
+    normalized = (query or "").lower()
+    tokens = set(terms)
+    intents = set()
+    for name, keywords in INTENT_KEYWORDS.items():
+        if any(keyword in normalized for keyword in keywords) or tokens.intersection(keywords):
+            intents.add(name)
+    return intents
+
+
+@dataclass(frozen=True)
+class QueryAnalysis:
+    query: str
+    terms: tuple[str, ...]
+    synonyms: tuple[str, ...]
+    intents: frozenset[str]
+    tokens: frozenset[str]
+    topic_context: TopicQueryContext
+    topic_profiles: tuple[dict, ...]
+
+    @property
+    def search_terms(self) -> list[str]:
+        """Terms for the keyword leg; the whole query when nothing was extracted."""
+        return list(self.terms) or [self.query]
+
+
+class QueryAnalyzer:
+    def __init__(self, matcher: TopicMatcher, max_entries: int = 1024) -> None:
+        self.matcher = matcher
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._store: OrderedDict[str, QueryAnalysis] = OrderedDict()
+
+    def analyze(self, query: str) -> QueryAnalysis:
+        normalized = normalize_query(query)
+        with self._lock:
+            cached = self._store.get(normalized)
+            if cached is not None:
+                self._store.move_to_end(normalized)
+        if cached is not None:
+            telemetry.increment("query_analysis.hits")
+            return cached
+
+        telemetry.increment("query_analysis.misses")
+        analysis = self._build(normalized)
+        with self._lock:
+            self._store[normalized] = analysis
+            while len(self._store) > self.max_entries:
+                self._store.popitem(last=False)
+        return analysis
+
+    def _build(self, normalized: str) -> QueryAnalysis:
+        terms = extract_terms(normalized)
+        words = set(_TERM_RE.findall(normalized))
+        intents = detect_intents(normalized, terms)
+        return QueryAnalysis(
+            query=normalized,
+            terms=tuple(terms),
+            synonyms=tuple(term for term in terms if term not in words),
+            intents=frozenset(intents),
+            tokens=frozenset(_TOKEN_RE.findall(fold(normalized))),
+            topic_context=self.matcher.query_context(normalized, terms, intents),
+            topic_profiles=tuple(self.matcher.rank_profiles(normalized)),
+        )
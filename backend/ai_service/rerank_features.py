@@ -0,0 +1,145 @@
+"""
+Per-entry rerank features.
+
+Everything _rerank_entries needs to know about an entry, reduced to a small
+JSON record: keyword-presence flags over the full text, the lowercased title,
+facet lists, the source host and the quality tuple. The record is computed
+once - by crawlers/cli.py import_to_db (stored in entries.rerank_features) or
+when the retrieval snapshot is built - so online rerank cost does not depend
+on content length.
+
+The same idea for RAG chunks: chunk_token_features holds the token sets
+vector_retrieval.rerank_vector_results overlaps with the query. It is stored
+in the vector payload by crawlers/rag/index_docs.chunk_payload.
+
+Stdlib only: the crawler CLI imports this module directly.
+"""
+
+from __future__ import annotations
+
+from urllib.parse import urlparse
+
+# Bump when the record layout or the keyword lists change; stored records
+# with another version are recomputed online until the next import.
+FEATURES_VERSION = 1
+
+# Flag name -> substrings searched in the lowercased text blob.
+BLOB_KEYWORDS = {
+    "buergergeld": ("buergergeld", "bürgergeld"),
+    "arbeitslosengeld": ("arbeitslosengeld",),
+    "jobcenter": ("jobcenter", "arbeitsagentur"),
+}
+
+NEGATIVE_HINTS = {
+    "unemployment": {
+        "kurzarbeitergeld": 4.5,
+        "kurzarbeit": 4.5,
+    },
+}
+
+
+def _display_text(value) -> str:
+    if isinstance(value, dict):
+        value = value.get("de") or value.get("en") or value.get("easy_de")
+    return str(value or "")
+
+
+def _host(value) -> str:
+    if not isinstance(value, str) or not value.strip():
+        return ""
+    host = (urlparse(value).netloc or "").lower()
+    return host[4:] if host.startswith("www.") else host
+
+
+def _score(scores: dict, key: str) -> float:
+    try:
+        return float(scores.get(key) or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def compute_rerank_features(entry: dict) -> dict:
+    """Build the feature record from a canonical (camelCase) entry."""
+    summary = entry.get("summary") or {}
+    content = entry.get("content") or {}
+    if not isinstance(summary, dict):
+        summary = {"de": summary}
+    if not isinstance(content, dict):
+        content = {"de": content}
+    title = _display_text(entry.get("title"))
+    topics = [str(value) for value in entry.get("topics") or []]
+    tags = [str(value) for value in entry.get("tags") or []]
+    target_groups = [str(value) for value in entry.get("targetGroups") or []]
+    domain = entry.get("domain")
+
+    blob = " ".join(
+        [
+            title,
+            str(summary.get("de") or summary.get("en") or ""),
+            str(content.get("de") or content.get("en") or ""),
+            " ".join(topics),
+            " ".join(tags),
+            " ".join(target_groups),
+            str(domain or ""),
+        ]
+    ).lower()
+
+    url = str(entry.get("url") or "")
+    provenance = entry.get("provenance") or {}
+    source_url = provenance.get("source") if isinstance(provenance, dict) else ""
+    source_url = source_url if isinstance(source_url, str) else ""
+    quality = entry.get("qualityScores") or {}
+    quality = quality if isinstance(quality, dict) else {}
+
+    return {
+        "version": FEATURES_VERSION,
+        "title": title.lower(),
+        "keywords": sorted(name for name, needles in BLOB_KEYWORDS.items() if any(needle in blob for needle in needles)),
+        "hints": sorted({phrase for hints in NEGATIVE_HINTS.values() for phrase in hints if phrase in blob}),
+        "topics": sorted(set(topics)),
+        "tags": sorted(set(tags)),
+        "targetGroups": sorted(set(target_groups)),
+        "domain": domain,
+        "host": _host(url) or _host(source_url),
+        "urlText": f"{url} {source_url}".lower(),
+        "quality": [_score(quality, "ais"), _score(quality, "iqs")],
+    }
+
+
+def usable_features(record) -> dict | None:
+    """Return a stored record if it matches the current layout, else None."""
+    if isinstance(record, dict) and record.get("version") == FEATURES_VERSION:
+        return record
+    return None
+
+
+# Bump when overlap_tokens or the chunk record layout changes; older vector
+# payloads are tokenized online until the chunks are re-indexed.
+CHUNK_TOKENS_VERSION = 1
+
+OVERLAP_STOP_WORDS = frozenset({
+    "der", "die", "das", "ein", "eine", "und", "oder", "mit", "von",
+    "im", "in", "an", "auf", "zu", "ist", "es", "ich", "sie", "wir",
+})
+
+
+def overlap_tokens(text: str) -> set[str]:
+    """Lowercased whitespace tokens of 3+ characters, stop words removed."""
+    return {t for t in str(text or "").lower().split() if len(t) >= 3 and t not in OVERLAP_STOP_WORDS}
+
+
+def chunk_token_features(title: str, text: str) -> dict:
+    """Token record for one RAG chunk: title/text token sets and stripped text length."""
+    return {
+        "version": CHUNK_TOKENS_VERSION,
+        "title": sorted(overlap_tokens(title)),
+        "text": sorted(overlap_tokens(text)),
+        "chars": len(str(text or "").strip()),
+    }
+
+
+def usable_chunk_tokens(record) -> dict | None:
+    """Return a stored chunk token record if it matches the current layout, else None."""
+    if isinstance(record, dict) and record.get("version") == CHUNK_TOKENS_VERSION:
+        return record
+    return None
@@ -4,63 +4,38 @@ Retrieval-first answer pipeline
 - LLM only for synthesis
 """
 
+from .circuit_breaker import BreakerCall
+from .corpus_version import CorpusVersion
+from .entry_rows import ENTRY_COLUMNS, normalize_entry_row
+from .query_analysis import (  # noqa: F401 - term helpers re-exported for existing callers
+    INTENT_KEYWORDS,
+    STOPWORDS,
+    SYNONYM_EXPANSIONS,
+    QueryAnalysis,
+    QueryAnalyzer,
+    detect_intents as _detect_intents,
+    extract_terms as _extract_terms,
+)
 from .schemas import Evidence
+from .rerank_features import FEATURES_VERSION, NEGATIVE_HINTS, compute_rerank_features, usable_features
+from .snapshot_index import SnapshotIndex, SnapshotStore
+from .topic_matcher import TopicMatcher
+from . import telemetry
+from functools import lru_cache
+import asyncio
 import json
 import os
-import jsonschema
+from jsonschema import Draft7Validator
 import re
+import time
 from urllib.parse import urlparse
 
 
 # ORM database access layer
-from .db import SessionLocal, Entry
+from .db import SessionLocal, engine, get_async_engine, pool_status
 from sqlalchemy import text
+from sqlalchemy.exc import ProgrammingError, SQLAlchemyError
 
-import datetime
-
-STOPWORDS = {
-    "ich", "habe", "hab", "mein", "meinen", "meine", "meiner", "was", "nun",
-    "und", "oder", "der", "die", "das", "ein", "eine", "einer", "einem",
-    "für", "fuer", "mit", "von", "auf", "zu", "zum", "zur", "den", "dem",
-    "im", "in", "am", "an", "wie", "kann", "kannst", "können", "koennen",
-    "tun", "jetzt", "kurz", "hilfe", "bekomme", "bekommt", "bekommen",
-}
-
-SYNONYM_EXPANSIONS = {
-    "job": ["arbeitslosigkeit", "arbeitslos", "arbeitsagentur"],
-    "arbeitsplatz": ["arbeitslosigkeit", "arbeitslos", "arbeitsagentur"],
-    "verloren": ["arbeitslosigkeit", "arbeitslosengeld", "buergergeld"],
-    "bürgergeld": ["buergergeld", "jobcenter", "grundsicherung"],
-    "buergergeld": ["bürgergeld", "jobcenter", "grundsicherung"],
-    "arbeitslos": ["arbeitslosigkeit", "arbeitslosengeld", "buergergeld"],
-    "arbeitslosigkeit": ["arbeitslosengeld", "buergergeld", "jobcenter"],
-}
-
-INTENT_KEYWORDS = {
-    "unemployment": {
-        "arbeitslos", "arbeitslosigkeit", "job", "arbeitsplatz", "jobcenter",
-        "buergergeld", "bürgergeld", "arbeitsagentur", "arbeitslosengeld",
-        "kuendigung", "kündigung",
-    },
-    "family": {
-        "familie", "familien", "kind", "kinder", "eltern", "elterngeld",
-        "schwanger", "schwangerschaft",
-    },
-    "contact": {
-        "kontakt", "telefon", "anrufen", "sprechstunde", "erreichen",
-        "beratung", "hotline",
-    },
-    "application": {
-        "antrag", "beantragen", "anmelden", "formular", "online", "weiterbewilligung",
-    },
-}
-
-NEGATIVE_HINTS = {
-    "unemployment": {
-        "kurzarbeitergeld": 4.5,
-        "kurzarbeit": 4.5,
-    },
-}
 
 _TOPIC_REGISTRY_CACHE = None
 _REGISTERED_SOURCE_HOSTS_CACHE = None
@@ -116,207 +91,80 @@ def _load_topic_registry():
     return topics
 
 
-def _extract_host(value: str | None):
-    if not isinstance(value, str) or not value.strip():
-        return ""
-    host = (urlparse(value).netloc or "").lower()
-    host = host[4:] if host.startswith("www.") else host
-    return host
+QUERY_ANALYSIS_CACHE_SIZE = int(os.getenv("AI_QUERY_ANALYSIS_CACHE_SIZE", "1024"))
+_QUERY_ANALYZER_CACHE = None
 
 
-def _detect_topic_profiles(query: str, terms: list[str]):
-    normalized = (query or "").lower()
-    token_set = set(terms)
-    matched = []
-    for topic in _load_topic_registry():
-        if not isinstance(topic, dict):
-            continue
-        keywords = {
-            str(keyword).lower()
-            for keyword in topic.get("keywords", [])
-            if isinstance(keyword, str)
-        }
-        if not keywords:
-            continue
-        if any(keyword in normalized for keyword in keywords) or token_set.intersection(keywords):
-            matched.append(topic)
-    return matched
+def _get_query_analyzer(registry=None):
+    """
+    Compile the topic registry once into a QueryAnalyzer; rebuilt only if the
+    loaders (or an explicitly passed registry) return new data.
+    """
+    global _QUERY_ANALYZER_CACHE
+    if registry is None:
+        registry = _load_topic_registry()
+    source_hosts = _load_registered_source_hosts()
+    cached = _QUERY_ANALYZER_CACHE
+    if cached is not None and cached[0] is registry and cached[1] is source_hosts:
+        return cached[2]
+    analyzer = QueryAnalyzer(TopicMatcher(registry, source_hosts), QUERY_ANALYSIS_CACHE_SIZE)
+    _QUERY_ANALYZER_CACHE = (registry, source_hosts, analyzer)
+    return analyzer
 
 
-def _topic_role_boost(entry: dict, query: str, terms: list[str], intents: set[str]):
-    profiles = _detect_topic_profiles(query, terms)
-    if not profiles:
-        return 0.0
+def _get_topic_matcher():
+    return _get_query_analyzer().matcher
 
-    url = str(entry.get("url") or "")
-    provenance = entry.get("provenance") or {}
-    source_url = provenance.get("source") if isinstance(provenance, dict) else ""
-    host = _extract_host(url) or _extract_host(source_url)
-    lowered_url = f"{url} {source_url}".lower()
-    source_hosts = _load_registered_source_hosts()
-    boost = 0.0
-
-    role_weights = {
-        "official_rule_source": 4.0,
-        "official_glossary_source": 3.5,
-        "official_contact_source": 3.0,
-        "official_light_language_source": 2.5,
-        "official_background_source": 1.5,
-        "ngo_context_source": 1.5,
-        "journalism_source": 1.0,
-    }
-
-    for topic in profiles:
-        for source in topic.get("sources", []):
-            if not isinstance(source, dict):
-                continue
-            source_id = str(source.get("sourceId") or "").strip()
-            expected_host = source_hosts.get(source_id)
-            if not expected_host or not host:
-                continue
-            if host != expected_host and not host.endswith(f".{expected_host}"):
-                continue
 
-            role = str(source.get("role") or "discovered")
-            boost += role_weights.get(role, 0.5)
+def analyze_query(query: str, registry=None) -> QueryAnalysis:
+    """Memoized terms, intents and topic matches for a query."""
+    return _get_query_analyzer(registry).analyze(query)
+
 
-            for pattern in source.get("preferredPathPatterns", []):
-                if isinstance(pattern, str) and pattern.lower() in lowered_url:
-                    boost += 1.2
+def _detect_topic_profiles(query: str, terms: list[str]):
+    return _get_topic_matcher().detect(query, terms)
 
-            if role == "official_contact_source" and "contact" in intents:
-                boost += 2.0
-            if role == "official_rule_source" and "application" in intents:
-                boost += 1.8
-            if role == "official_glossary_source" and any(
-                token in terms for token in {"bedarfsgemeinschaft", "aufstocker", "regelbedarf", "mehrbedarf"}
-            ):
-                boost += 1.5
-            if role == "official_light_language_source" and any(
-                token in query.lower() for token in {"leicht", "leichte sprache", "einfach"}
-            ):
-                boost += 2.0
 
-    return boost
+def _topic_query_context(query: str, terms: list[str], intents: set[str]):
+    return _get_topic_matcher().query_context(query, terms, intents)
 
 
-def _pick_text(*values):
-    for value in values:
-        if isinstance(value, str) and value.strip():
-            return value.strip()
-    return None
+def _topic_role_boost(entry: dict, query: str, terms: list[str], intents: set[str], context=None):
+    matcher = _get_topic_matcher()
+    if context is None:
+        context = matcher.query_context(query, terms, intents)
+    if not context.topic_indices:
+        return 0.0
+
+    features = _entry_features(entry)
+    return matcher.boost(features["host"], features["urlText"], context)
 
 
 def _normalize_db_entry(entry):
-    title_de = _pick_text(entry.get("title_de"))
-    title_en = _pick_text(entry.get("title_en"))
-    title_easy_de = _pick_text(entry.get("title_easy_de"))
-    summary_de = _pick_text(entry.get("summary_de"))
-    summary_en = _pick_text(entry.get("summary_en"))
-    summary_easy_de = _pick_text(entry.get("summary_easy_de"))
-    content_de = _pick_text(entry.get("content_de"))
-    content_en = _pick_text(entry.get("content_en"))
-    content_easy_de = _pick_text(entry.get("content_easy_de"))
-
-    normalized = {
-        "id": entry.get("id"),
-        "title": _pick_text(entry.get("title"), title_de, title_en, title_easy_de, entry.get("url")),
-        "summary": {
-            "de": summary_de,
-            "en": summary_en,
-            "easy_de": summary_easy_de,
-        },
-        "content": {
-            "de": content_de,
-            "en": content_en,
-            "easy_de": content_easy_de,
-        },
-        "url": entry.get("url"),
-        "topics": entry.get("topics") or [],
-        "tags": entry.get("tags") or [],
-        "targetGroups": entry.get("target_groups") or [],
-        "validFrom": entry.get("valid_from"),
-        "validUntil": entry.get("valid_until"),
-        "deadline": entry.get("deadline"),
-        "status": entry.get("status"),
-        "firstSeen": entry.get("first_seen"),
-        "lastSeen": entry.get("last_seen"),
-        "sourceUnavailable": entry.get("source_unavailable") or False,
-        "provenance": entry.get("provenance"),
-        "qualityScores": entry.get("quality_scores"),
-        "translations": entry.get("translations"),
-        "domain": entry.get("domain"),
-    }
-
-    return _serialize_datetimes(normalized)
-
-def _serialize_datetimes(obj):
-    # Recursively convert datetime/date objects to ISO strings, leave None untouched
-    if isinstance(obj, dict):
-        return {k: _serialize_datetimes(v) for k, v in obj.items()}
-    elif isinstance(obj, list):
-        return [_serialize_datetimes(v) for v in obj]
-    elif isinstance(obj, (datetime.datetime, datetime.date)):
-        return obj.isoformat()
-    else:
-        return obj
+    normalized = normalize_entry_row(entry)
+    normalized["_features"] = usable_features(entry.get("rerank_features")) or compute_rerank_features(normalized)
+    return normalized
 
 
-def _extract_terms(query: str):
-    normalized = (query or "").lower()
-    tokens = re.findall(r"[a-zA-ZäöüÄÖÜß0-9-]{3,}", normalized)
-    seen = set()
-    terms = []
+def _entry_features(entry: dict):
+    return entry.get("_features") or compute_rerank_features(entry)
 
-    for token in tokens:
-        if token in STOPWORDS or token in seen:
-            continue
-        seen.add(token)
-        terms.append(token)
-        for synonym in SYNONYM_EXPANSIONS.get(token, []):
-            if synonym not in seen:
-                seen.add(synonym)
-                terms.append(synonym)
-
-    return terms[:8]
-
-
-def _detect_intents(query: str, terms: list[str]):
-    normalized = (query or "").lower()
-    tokens = set(terms)
-    intents = set()
-    for name, keywords in INTENT_KEYWORDS.items():
-        if any(keyword in normalized for keyword in keywords) or tokens.intersection(keywords):
-            intents.add(name)
-    return intents
-
-
-def _text_blob(entry):
-    summary = entry.get("summary", {}) or {}
-    content = entry.get("content", {}) or {}
-    return " ".join(
-        [
-            str(entry.get("title") or ""),
-            str(summary.get("de") or summary.get("en") or ""),
-            str(content.get("de") or content.get("en") or ""),
-            " ".join(entry.get("topics") or []),
-            " ".join(entry.get("tags") or []),
-            " ".join(entry.get("targetGroups") or []),
-            str(entry.get("domain") or ""),
-        ]
-    ).lower()
-
-
-def _rerank_entries(entries: list[dict], query: str, terms: list[str]):
-    intents = _detect_intents(query, terms)
+
+def _rerank_entries(entries: list[dict], query: str, terms: list[str], analysis: QueryAnalysis = None):
+    if analysis is not None:
+        intents, topic_context = analysis.intents, analysis.topic_context
+    else:
+        intents = _detect_intents(query, terms)
+        topic_context = _topic_query_context(query, terms, intents)
     reranked = []
 
     for entry in entries:
-        title = str(entry.get("title") or "").lower()
-        blob = _text_blob(entry)
-        topics = set(entry.get("topics") or [])
-        target_groups = set(entry.get("targetGroups") or [])
-        domain = entry.get("domain")
+        features = _entry_features(entry)
+        title = features["title"]
+        keywords = features["keywords"]
+        topics = features["topics"]
+        target_groups = set(features["targetGroups"])
+        domain = features["domain"]
         score = float(entry.get("_term_score") or 0)
 
         if "unemployment" in intents:
@@ -324,11 +172,11 @@ def _rerank_entries(entries: list[dict], query: str, terms: list[str]):
                 score += 3.0
             if "unemployed" in target_groups:
                 score += 3.0
-            if "buergergeld" in blob or "bürgergeld" in blob:
+            if "buergergeld" in keywords:
                 score += 4.0
-            if "arbeitslosengeld" in blob:
+            if "arbeitslosengeld" in keywords:
                 score += 3.5
-            if "jobcenter" in blob or "arbeitsagentur" in blob:
+            if "jobcenter" in keywords:
                 score += 2.5
             if domain == "benefits":
                 score += 1.5
@@ -341,63 +189,85 @@ def _rerank_entries(entries: list[dict], query: str, terms: list[str]):
             if target_groups.issubset({"families", "single_parents"}) and "family" not in intents:
                 score -= 4.0
             for phrase, penalty in NEGATIVE_HINTS["unemployment"].items():
-                if phrase in blob or phrase in title:
+                if phrase in features["hints"]:
                     score -= penalty
 
         if "contact" in intents and domain == "contacts":
             score += 3.0
-        if "application" in intents and ("application_required" in set(entry.get("tags") or []) or domain == "tools"):
+        if "application" in intents and ("application_required" in features["tags"] or domain == "tools"):
             score += 1.5
         if title and any(term in title for term in terms):
             score += 1.5
-        score += _topic_role_boost(entry, query, terms, intents)
+        score += _topic_role_boost(entry, query, terms, intents, topic_context)
 
-        reranked.append((score, entry))
+        ais, iqs = features["quality"]
+        reranked.append((score, ais, iqs, entry))
 
-    reranked.sort(
-        key=lambda item: (
-            item[0],
-            float(((item[1].get("qualityScores") or {}).get("ais") or 0)),
-            float(((item[1].get("qualityScores") or {}).get("iqs") or 0)),
-        ),
-        reverse=True,
-    )
+    reranked.sort(key=lambda item: item[:3], reverse=True)
 
-    return [entry for score, entry in reranked if score > 0.5][:6]
+    return [item[3] for item in reranked if item[0] > 0.5][:6]
 
-def query_entries(query: str, domain: str = None):
-    try:
-        session = SessionLocal()
-        terms = _extract_terms(query)
-        if not terms:
-            terms = [query.strip()]
 
-        match_clauses = []
-        score_parts = []
-        params = {}
-        for index, term in enumerate(terms):
-            key = f"q{index}"
-            params[key] = f"%{term}%"
-            clause = (
-                f"(title_de ILIKE :{key} OR title_en ILIKE :{key} OR title_easy_de ILIKE :{key} OR "
-                f"summary_de ILIKE :{key} OR summary_en ILIKE :{key} OR summary_easy_de ILIKE :{key} OR "
-                f"content_de ILIKE :{key} OR content_en ILIKE :{key} OR content_easy_de ILIKE :{key})"
-            )
-            match_clauses.append(clause)
-            score_parts.append(f"CASE WHEN {clause} THEN 1 ELSE 0 END")
+# Phase-one projection for keyword candidates: enough to rerank with a stored
+# rerank_features record. Everything else is hydrated for the final top-k only.
+RANKING_COLUMNS = (
+    "id", "domain", "title_de", "title_en", "title_easy_de",
+    "summary_de", "summary_en", "summary_easy_de",
+    "url", "topics", "tags", "target_groups", "status",
+)
 
-        sql = f"""
-        SELECT *,
-               ({' + '.join(score_parts)}) AS term_score
+# Inputs of compute_rerank_features beyond RANKING_COLUMNS.
+FEATURIZE_COLUMNS = ("content_de", "content_en", "provenance", "quality_scores")
+
+HYDRATE_SQL = f"""
+        SELECT {', '.join(ENTRY_COLUMNS)}
         FROM entries
-        WHERE ({' OR '.join(match_clauses)})
+        WHERE id = ANY(CAST(:ids AS uuid[]))
         """
-        if domain:
-            sql += " AND domain = :domain"
-            params["domain"] = domain
-        sql += """
-        ORDER BY
-            term_score DESC,
+
+TEXT_COLUMNS = (
+    "title_de", "title_en", "title_easy_de",
+    "summary_de", "summary_en", "summary_easy_de",
+    "content_de", "content_en", "content_easy_de",
+)
+
+# Titles and summaries carry pg_trgm indexes and are short enough for
+# word_similarity rechecks; content is only reached through the tsvectors.
+TRIGRAM_COLUMNS = (
+    "title_de", "title_en", "title_easy_de",
+    "summary_de", "summary_en", "summary_easy_de",
+)
+
+# ts_rank_cd weights in {D, C, B, A} order: content_easy_de, content, summary, title.
+TS_RANK_WEIGHTS = "'{0.1, 0.2, 0.4, 1.0}'::float4[]"
+
+KEYWORD_SEARCH_MODE = os.getenv("AI_KEYWORD_SEARCH_MODE", "fulltext").strip().lower()
+# A query shape the database rejects (migration not run) is skipped for this
+# long before it is tried again.
+QUERY_SHAPE_RETRY_SECONDS = float(os.getenv("AI_QUERY_SHAPE_RETRY_SECONDS", "300"))
+
+# "postgres" queries per request; "snapshot" serves the keyword leg from an
+# in-memory index (snapshot_index.py) and uses Postgres only until it is loaded.
+RETRIEVAL_BACKEND = os.getenv("AI_RETRIEVAL_BACKEND", "postgres").strip().lower()
+SNAPSHOT_POLL_SECONDS = float(os.getenv("AI_SNAPSHOT_POLL_SECONDS", "30"))
+# Cache invalidation: entries version polled every N seconds, and pushed via
+# LISTEN/NOTIFY on entries_changed when enabled.
+CORPUS_VERSION_POLL_SECONDS = float(os.getenv("AI_CORPUS_VERSION_POLL_SECONDS", "15"))
+CORPUS_LISTEN = os.getenv("AI_CORPUS_LISTEN", "true").strip().lower() in {"1", "true", "yes", "on"}
+# Per-leg budgets for retrieve_evidence_with_status; a leg that misses its deadline is
+# left out of the fusion and the response is marked degraded (0 disables).
+KEYWORD_LEG_TIMEOUT_MS = float(os.getenv("AI_KEYWORD_LEG_TIMEOUT_MS", "2000"))
+VECTOR_LEG_TIMEOUT_MS = float(os.getenv("AI_VECTOR_LEG_TIMEOUT_MS", "2000"))
+
+CORE_SCHEMA_PATH = os.path.join(os.path.dirname(__file__), '../../data/_schemas/core.schema.json')
+
+# Precomputed by crawlers/cli.py import_to_db (20261017_add_schema_validity.sql,
+# 20261018_add_rerank_features.sql). Rows flagged invalid against the current
+# schema fingerprint are dropped in SQL.
+INGEST_COLUMNS = ("schema_valid", "schema_fingerprint", "rerank_features")
+SCHEMA_VALID_FILTER = " AND (schema_valid IS NOT FALSE OR schema_fingerprint IS DISTINCT FROM :schema_fingerprint)"
+
+ORDER_BY_QUALITY = """
             CASE COALESCE(provenance->>'sourceTier', 'tier_unknown')
                 WHEN 'tier_1_official' THEN 0
                 WHEN 'tier_2_ngo_watchdog' THEN 1
@@ -408,56 +278,713 @@ def query_entries(query: str, domain: str = None):
             COALESCE((quality_scores->>'ais')::numeric, 0) DESC,
             COALESCE((quality_scores->>'iqs')::numeric, 0) DESC,
             last_seen DESC NULLS LAST
+"""
+
+
+def _tsquery_text(term: str):
+    """Turn an extracted term into a prefix tsquery ("arbeitslos:*"), or None."""
+    parts = re.findall(r"[a-zA-ZäöüÄÖÜß0-9]+", term or "")
+    if not parts:
+        return None
+    return " & ".join(f"{part.lower()}:*" for part in parts)
+
+
+def _select_columns(ingest_columns: bool):
+    """
+    With the ingest columns available, candidates are ranked from RANKING_COLUMNS
+    and the stored rerank_features; content and JSON blobs are only fetched for
+    rows whose feature record is missing or stale, and the final top-k is
+    hydrated afterwards (HYDRATE_SQL). Without them, rows are fetched whole.
+    """
+    if not ingest_columns:
+        return ", ".join(ENTRY_COLUMNS)
+    stale = f"(rerank_features IS NULL OR rerank_features->>'version' IS DISTINCT FROM '{FEATURES_VERSION}')"
+    featurize = [f"CASE WHEN {stale} THEN {column} END AS {column}" for column in FEATURIZE_COLUMNS]
+    return ", ".join(RANKING_COLUMNS + INGEST_COLUMNS + tuple(featurize))
+
+
+def _candidate_order(*leading: str) -> str:
+    """
+    ORDER BY list of the candidate queries, written out in full rather than
+    through select aliases so _position_column can reuse it. The trailing id
+    makes the order total: row_number() over it is exactly the rank the
+    ORDER BY ... LIMIT of the single-query statement produces.
+    """
+    return "\n            " + ",\n            ".join(leading) + f",{ORDER_BY_QUALITY.rstrip()},\n            id"
+
+
+def _position_column(order: str) -> str:
+    return f",\n               row_number() OVER (ORDER BY {order}) AS position"
+
+
+def _build_ilike_query(
+    terms: list[str], domain: str = None, ingest_columns: bool = True, prefix: str = "", positioned: bool = False
+):
+    match_clauses = []
+    score_parts = []
+    params = {}
+    for index, term in enumerate(terms):
+        key = f"{prefix}q{index}"
+        params[key] = f"%{term}%"
+        clause = "(" + " OR ".join(f"{column} ILIKE :{key}" for column in TEXT_COLUMNS) + ")"
+        match_clauses.append(clause)
+        score_parts.append(f"CASE WHEN {clause} THEN 1 ELSE 0 END")
+
+    term_score = " + ".join(score_parts)
+    order = _candidate_order(f"({term_score}) DESC")
+    sql = f"""
+        SELECT {_select_columns(ingest_columns)},
+               ({term_score}) AS term_score{_position_column(order) if positioned else ""}
+        FROM entries
+        WHERE ({' OR '.join(match_clauses)})
+        """
+    if domain:
+        sql += " AND domain = :domain"
+        params["domain"] = domain
+    if ingest_columns:
+        sql += SCHEMA_VALID_FILTER
+        params["schema_fingerprint"] = core_schema_fingerprint()
+    sql += f"""
+        ORDER BY {order}
         LIMIT 24
         """
-        results = session.execute(text(sql), params).mappings().all()
+    return sql, params
+
+
+def _build_fulltext_query(
+    terms: list[str], domain: str = None, ingest_columns: bool = True, prefix: str = "", positioned: bool = False
+):
+    """
+    Candidate generation through the weighted search_vector_* GIN indexes,
+    with a pg_trgm word_similarity fallback for partial words in titles and
+    summaries. term_score keeps the ILIKE scale (number of matched terms) so
+    the reranker thresholds stay unchanged; ts_rank_cd breaks ties.
+    """
+    match_clauses = []
+    score_parts = []
+    de_queries = []
+    en_queries = []
+    params = {}
+    for index, term in enumerate(terms):
+        key = f"{prefix}q{index}"
+        params[key] = term
+        clauses = []
+        tsquery = _tsquery_text(term)
+        if tsquery:
+            params[f"{prefix}tq{index}"] = tsquery
+            de_query = f"to_tsquery('german', :{prefix}tq{index})"
+            en_query = f"to_tsquery('english', :{prefix}tq{index})"
+            de_queries.append(de_query)
+            en_queries.append(en_query)
+            clauses.append(f"search_vector_de @@ {de_query}")
+            clauses.append(f"search_vector_en @@ {en_query}")
+        clauses.extend(f":{key} <% {column}" for column in TRIGRAM_COLUMNS)
+        clause = "(" + " OR ".join(clauses) + ")"
+        match_clauses.append(clause)
+        score_parts.append(f"CASE WHEN {clause} THEN 1 ELSE 0 END")
+
+    rank_parts = []
+    if de_queries:
+        rank_parts.append(f"ts_rank_cd({TS_RANK_WEIGHTS}, search_vector_de, {' || '.join(de_queries)})")
+        rank_parts.append(f"ts_rank_cd({TS_RANK_WEIGHTS}, search_vector_en, {' || '.join(en_queries)})")
+    search_rank = " + ".join(rank_parts) if rank_parts else "0"
+
+    term_score = " + ".join(score_parts)
+    order = _candidate_order(f"({term_score}) DESC", f"({search_rank}) DESC")
+    sql = f"""
+        SELECT {_select_columns(ingest_columns)},
+               ({term_score}) AS term_score,
+               ({search_rank}) AS search_rank{_position_column(order) if positioned else ""}
+        FROM entries
+        WHERE ({' OR '.join(match_clauses)})
+        """
+    if domain:
+        sql += " AND domain = :domain"
+        params["domain"] = domain
+    if ingest_columns:
+        sql += SCHEMA_VALID_FILTER
+        params["schema_fingerprint"] = core_schema_fingerprint()
+    sql += f"""
+        ORDER BY {order}
+        LIMIT 24
+        """
+    return sql, params
+
+
+def _shape_name(builder, ingest_columns: bool) -> str:
+    return f"{builder.__name__}(ingest_columns={ingest_columns})"
+
+
+def _keyword_query_shapes():
+    """
+    (builder, ingest_columns) in preference order; each later one needs fewer
+    migrations. Shapes the database recently rejected are left out; the last
+    one always stays.
+    """
+    builders = [_build_ilike_query]
+    if KEYWORD_SEARCH_MODE == "fulltext":
+        builders.insert(0, _build_fulltext_query)
+    *preferred, last = [(builder, ingest_columns) for ingest_columns in (True, False) for builder in builders]
+    now = time.monotonic()
+    shapes = [shape for shape in preferred if _UNAVAILABLE_QUERY_SHAPES.get(_shape_name(*shape), 0.0) <= now]
+    if len(shapes) < len(preferred):
+        telemetry.increment("retrieval.keyword_query_shapes_skipped", len(preferred) - len(shapes))
+    return [*shapes, last]
+
+
+def _keyword_query_attempts(terms: list[str], domain: str = None):
+    for builder, ingest_columns in _keyword_query_shapes():
+        sql, params = builder(terms, domain, ingest_columns=ingest_columns)
+        yield _shape_name(builder, ingest_columns), sql, params, ingest_columns
+
+
+def _batch_keyword_query_attempts(terms_list: list[list[str]], domain: str = None):
+    """
+    _keyword_query_attempts for several queries in one statement: each query's
+    candidate SQL runs as its own subquery (parameters prefixed per query),
+    tagged with its index, and the parts are combined with UNION ALL. Every
+    query keeps its own LIMIT and ordering, and carries its rank as a
+    position column numbered over that same ordering, so rows and order are
+    exactly those of the single-query statement.
+    """
+    for builder, ingest_columns in _keyword_query_shapes():
+        parts = []
+        params = {}
+        for qidx, terms in enumerate(terms_list):
+            sql, query_params = builder(
+                terms, domain, ingest_columns=ingest_columns, prefix=f"b{qidx}_", positioned=True
+            )
+            parts.append(f"(SELECT {qidx} AS qidx, candidates.* FROM ({sql}) AS candidates)")
+            params.update(query_params)
+        sql = "\nUNION ALL\n".join(parts) + "\nORDER BY qidx, position"
+        yield _shape_name(builder, ingest_columns), sql, params, ingest_columns
+
+
+# Shape name -> monotonic time until which the shape is skipped. Only
+# ProgrammingError (undefined column, function or operator) marks a shape;
+# single and batch statements share the entry.
+_UNAVAILABLE_QUERY_SHAPES: dict[str, float] = {}
+
+
+def _note_query_fallback(name: str, exc: Exception):
+    telemetry.increment("retrieval.keyword_query_fallbacks")
+    if not isinstance(exc, ProgrammingError):
+        # Timeouts and dropped connections say nothing about the schema.
+        print(f"Keyword search via {name} failed, falling back: {exc}")
+        return
+    reported = name in _UNAVAILABLE_QUERY_SHAPES
+    _UNAVAILABLE_QUERY_SHAPES[name] = time.monotonic() + QUERY_SHAPE_RETRY_SECONDS
+    if not reported:
+        print(f"Keyword search via {name} unavailable, falling back: {exc}")
+
+
+def _run_attempts(session, attempts):
+    """Return (rows, projected) from the first query shape the database accepts."""
+    *fallbacks, last = attempts
+    for name, sql, params, projected in fallbacks:
+        try:
+            return _timed_execute(session.execute, sql, params).mappings().all(), projected
+        except SQLAlchemyError as exc:
+            # Search vectors, pg_trgm or schema_valid not migrated yet, or a
+            # transient error: keep serving via the next cheaper query shape.
+            session.rollback()
+            _note_query_fallback(name, exc)
+    _, sql, params, projected = last
+    return _timed_execute(session.execute, sql, params).mappings().all(), projected
+
+
+async def _arun_attempts(conn, attempts):
+    *fallbacks, last = attempts
+    for name, sql, params, projected in fallbacks:
+        try:
+            result = await _atimed_execute(conn.execute, sql, params)
+            return result.mappings().all(), projected
+        except SQLAlchemyError as exc:
+            await conn.rollback()
+            _note_query_fallback(name, exc)
+    _, sql, params, projected = last
+    result = await _atimed_execute(conn.execute, sql, params)
+    return result.mappings().all(), projected
+
+
+def _fetch_keyword_rows(session, terms: list[str], domain: str = None):
+    """Return (rows, projected); projected rows still need _hydrate_ranked."""
+    return _run_attempts(session, _keyword_query_attempts(terms, domain))
+
+
+async def _afetch_keyword_rows(conn, terms: list[str], domain: str = None):
+    return await _arun_attempts(conn, _keyword_query_attempts(terms, domain))
+
+
+def _split_batch_rows(rows, count: int) -> list[list[dict]]:
+    """Group UNION ALL batch rows back into per-query row lists."""
+    grouped = [[] for _ in range(count)]
+    for row in rows:
+        row = dict(row)
+        qidx = row.pop("qidx")
+        row.pop("position", None)
+        grouped[qidx].append(row)
+    return grouped
+
+
+def _row_bytes(rows) -> int:
+    """Approximate payload size of fetched rows (text length of non-null values)."""
+    return sum(len(str(value)) for row in rows for value in row.values() if value is not None)
+
+
+def _hydrate_ranked(ranked: list[dict], rows) -> list[dict]:
+    """Swap projected top-k entries for fully normalized rows, keeping rank order."""
+    by_id = {str(row["id"]): row for row in rows}
+    hydrated = []
+    for entry in ranked:
+        row = by_id.get(entry["id"])
+        if row is None:
+            # Deleted between the two phases.
+            continue
+        # Ranking is done; the features the candidate carried are not needed again.
+        full = normalize_entry_row({**row, "id": entry["id"]})
+        full["_schema_checked"] = entry.get("_schema_checked", False)
+        hydrated.append(full)
+    return hydrated
+
+
+def _timed_execute(execute, sql, params):
+    start = time.perf_counter()
+    try:
+        return execute(text(sql), params)
+    finally:
+        telemetry.observe("db.query_ms", (time.perf_counter() - start) * 1000)
+
+
+async def _atimed_execute(execute, sql, params):
+    start = time.perf_counter()
+    try:
+        return await execute(text(sql), params)
+    finally:
+        telemetry.observe("db.query_ms", (time.perf_counter() - start) * 1000)
+
+
+def _record_pool_metrics(wait_ms: float):
+    telemetry.observe("db.pool_wait_ms", wait_ms)
+    status = pool_status()
+    telemetry.set_gauge("db.pool_checked_out", status["checkedOut"])
+    telemetry.set_gauge("db.pool_saturation", status["saturation"])
+
+
+def _query_terms(query: str):
+    return analyze_query(query).search_terms
+
+
+def _rank_keyword_rows(results, query: str, terms: list[str], analysis: QueryAnalysis = None):
+    telemetry.observe("db.candidate_bytes", _row_bytes(results))
+    fingerprint = core_schema_fingerprint()
+    out = []
+    for r in results:
+        d = dict(r)
+        if "id" in d and d["id"] is not None:
+            d["id"] = str(d["id"])
+        normalized = _normalize_db_entry(d)
+        normalized["_term_score"] = d.get("term_score", 0)
+        normalized["_schema_checked"] = (
+            d.get("schema_valid") is True and d.get("schema_fingerprint") == fingerprint
+        )
+        out.append(normalized)
+    return _finish_ranking(out, query, terms, analysis)
+
+
+def _finish_ranking(entries: list[dict], query: str, terms: list[str], analysis: QueryAnalysis = None):
+    ranked = _rerank_entries(entries, query, terms, analysis)
+    for entry in ranked:
+        entry.pop("_term_score", None)
+        entry.pop("_features", None)
+    return ranked
+
+
+def _snapshot_version():
+    session = SessionLocal()
+    try:
+        row = session.execute(
+            text("SELECT max(updated_at) AS updated_at, count(*) AS total FROM entries")
+        ).mappings().one()
+        return (row["updated_at"], row["total"])
+    finally:
         session.close()
-        out = []
-        for r in results:
-            d = dict(r)
-            if "id" in d and d["id"] is not None:
-                d["id"] = str(d["id"])
-            normalized = _normalize_db_entry(d)
-            normalized["_term_score"] = d.get("term_score", 0)
-            out.append(normalized)
-        ranked = _rerank_entries(out, query, terms)
-        for entry in ranked:
-            entry.pop("_term_score", None)
+
+
+def _load_snapshot(version):
+    start = time.perf_counter()
+    session = SessionLocal()
+    try:
+        try:
+            columns = ", ".join(ENTRY_COLUMNS + INGEST_COLUMNS)
+            rows = session.execute(text(f"SELECT {columns} FROM entries")).mappings().all()
+        except SQLAlchemyError:
+            session.rollback()
+            rows = session.execute(text(f"SELECT {', '.join(ENTRY_COLUMNS)} FROM entries")).mappings().all()
+    finally:
+        session.close()
+    index = SnapshotIndex(rows, version, TEXT_COLUMNS, _normalize_db_entry)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    telemetry.increment("retrieval.snapshot_reloads")
+    telemetry.set_gauge("retrieval.snapshot_entries", len(index))
+    print(f"[retrieval] loaded snapshot of {len(index)} entries in {elapsed_ms:.0f} ms (version {version})")
+    return index
+
+
+_SNAPSHOT_STORE = SnapshotStore(_snapshot_version, _load_snapshot, SNAPSHOT_POLL_SECONDS)
+
+
+def warm_snapshot():
+    """Start loading the in-memory index at startup when the snapshot backend is enabled."""
+    if RETRIEVAL_BACKEND == "snapshot":
+        _SNAPSHOT_STORE.refresh_async()
+
+
+def _on_corpus_change(previous: str, current: str):
+    telemetry.increment("retrieval.corpus_version_changes")
+    if RETRIEVAL_BACKEND == "snapshot":
+        _SNAPSHOT_STORE.refresh_async()
+
+
+CORPUS_VERSION = CorpusVersion(_snapshot_version, CORPUS_VERSION_POLL_SECONDS)
+CORPUS_VERSION.subscribe(_on_corpus_change)
+
+
+def corpus_version() -> str:
+    """Token of the current entries version, used in retrieval cache keys."""
+    return CORPUS_VERSION.current()
+
+
+def _listen_connection():
+    # Dedicated connection, detached so it does not hold a pool slot.
+    conn = engine.raw_connection()
+    conn.detach()
+    return conn.dbapi_connection
+
+
+# DBAPI drivers whose connections CorpusVersion.listen can wait on.
+LISTEN_DRIVERS = ("psycopg2", "psycopg")
+
+
+def watch_corpus_version():
+    """Load the corpus version at startup and subscribe to entries_changed notifications."""
+    CORPUS_VERSION.refresh_async()
+    if not CORPUS_LISTEN:
+        CORPUS_VERSION.skip_listen("AI_CORPUS_LISTEN is off")
+    elif engine.dialect.driver not in LISTEN_DRIVERS:
+        telemetry.increment("retrieval.corpus_listen_skipped")
+        CORPUS_VERSION.skip_listen(f"driver {engine.dialect.driver} has no LISTEN support here")
+    else:
+        CORPUS_VERSION.listen(_listen_connection)
+
+
+def corpus_version_status() -> dict:
+    """Corpus version token and whether NOTIFY-driven refresh is active, for /health."""
+    return CORPUS_VERSION.status()
+
+
+def _snapshot_entries(query: str, terms: list[str], domain: str = None, analysis: QueryAnalysis = None):
+    """Keyword leg from the in-memory snapshot; None means "ask Postgres"."""
+    if RETRIEVAL_BACKEND != "snapshot":
+        return None
+    index = _SNAPSHOT_STORE.current()
+    if index is None:
+        telemetry.increment("retrieval.snapshot_misses")
+        return None
+    start = time.perf_counter()
+    entries = index.search(terms, domain, core_schema_fingerprint())
+    telemetry.observe("retrieval.snapshot_query_ms", (time.perf_counter() - start) * 1000)
+    telemetry.increment("retrieval.snapshot_hits")
+    return _finish_ranking(entries, query, terms, analysis)
+
+
+def query_entries(query: str, domain: str = None):
+    try:
+        analysis = analyze_query(query)
+        terms = analysis.search_terms
+        snapshot = _snapshot_entries(query, terms, domain, analysis)
+        if snapshot is not None:
+            return snapshot
+        start = time.perf_counter()
+        session = SessionLocal()
+
+        try:
+            session.connection()
+            _record_pool_metrics((time.perf_counter() - start) * 1000)
+            results, projected = _fetch_keyword_rows(session, terms, domain)
+            ranked = _rank_keyword_rows(results, query, terms, analysis)
+            if projected and ranked:
+                ids = [entry["id"] for entry in ranked]
+                rows = _timed_execute(session.execute, HYDRATE_SQL, {"ids": ids}).mappings().all()
+                telemetry.observe("db.hydrate_bytes", _row_bytes(rows))
+                ranked = _hydrate_ranked(ranked, rows)
+        finally:
+            session.close()
         return ranked
     except Exception as e:
         print(f"DB error: {e}")
         return []
 
+
+async def aquery_entries(query: str, domain: str = None):
+    """
+    query_entries on the pooled asyncpg engine, so the round trip does not
+    block the event loop. Without asyncpg the sync path runs in a worker thread.
+    """
+    analysis = analyze_query(query)
+    terms = analysis.search_terms
+    snapshot = _snapshot_entries(query, terms, domain, analysis)
+    if snapshot is not None:
+        return snapshot
+    async_engine = get_async_engine()
+    if async_engine is None:
+        return await asyncio.to_thread(query_entries, query, domain)
+    try:
+        start = time.perf_counter()
+        async with async_engine.connect() as conn:
+            _record_pool_metrics((time.perf_counter() - start) * 1000)
+            results, projected = await _afetch_keyword_rows(conn, terms, domain)
+            ranked = _rank_keyword_rows(results, query, terms, analysis)
+            if projected and ranked:
+                ids = [entry["id"] for entry in ranked]
+                result = await _atimed_execute(conn.execute, HYDRATE_SQL, {"ids": ids})
+                rows = result.mappings().all()
+                telemetry.observe("db.hydrate_bytes", _row_bytes(rows))
+                ranked = _hydrate_ranked(ranked, rows)
+        return ranked
+    except Exception as e:
+        print(f"DB error: {e}")
+        return []
+
+
+def _rank_batch_rows(grouped_rows, queries: list[str], analyses: list[QueryAnalysis]):
+    return [
+        _rank_keyword_rows(rows, query, analysis.search_terms, analysis)
+        for rows, query, analysis in zip(grouped_rows, queries, analyses)
+    ]
+
+
+def _batch_hydrate_ids(ranked_lists: list[list[dict]]) -> list[str]:
+    return list(dict.fromkeys(entry["id"] for ranked in ranked_lists for entry in ranked))
+
+
+def query_entries_batch(queries: list[str], domain: str = None):
+    """
+    query_entries for several queries: one keyword statement for all of them
+    and one hydration round trip over the union of their top-k ids.
+    """
+    analyses = [analyze_query(query) for query in queries]
+    terms_list = [analysis.search_terms for analysis in analyses]
+    snapshots = [
+        _snapshot_entries(query, analysis.search_terms, domain, analysis)
+        for query, analysis in zip(queries, analyses)
+    ]
+    if all(snapshot is not None for snapshot in snapshots):
+        return snapshots
+    try:
+        start = time.perf_counter()
+        session = SessionLocal()
+        try:
+            session.connection()
+            _record_pool_metrics((time.perf_counter() - start) * 1000)
+            rows, projected = _run_attempts(session, _batch_keyword_query_attempts(terms_list, domain))
+            ranked_lists = _rank_batch_rows(_split_batch_rows(rows, len(queries)), queries, analyses)
+            ids = _batch_hydrate_ids(ranked_lists)
+            if projected and ids:
+                rows = _timed_execute(session.execute, HYDRATE_SQL, {"ids": ids}).mappings().all()
+                telemetry.observe("db.hydrate_bytes", _row_bytes(rows))
+                ranked_lists = [_hydrate_ranked(ranked, rows) for ranked in ranked_lists]
+        finally:
+            session.close()
+        return ranked_lists
+    except Exception as e:
+        print(f"DB error: {e}")
+        return [[] for _ in queries]
+
+
+async def aquery_entries_batch(queries: list[str], domain: str = None):
+    analyses = [analyze_query(query) for query in queries]
+    terms_list = [analysis.search_terms for analysis in analyses]
+    snapshots = [
+        _snapshot_entries(query, analysis.search_terms, domain, analysis)
+        for query, analysis in zip(queries, analyses)
+    ]
+    if all(snapshot is not None for snapshot in snapshots):
+        return snapshots
+    async_engine = get_async_engine()
+    if async_engine is None:
+        return await asyncio.to_thread(query_entries_batch, queries, domain)
+    try:
+        start = time.perf_counter()
+        async with async_engine.connect() as conn:
+            _record_pool_metrics((time.perf_counter() - start) * 1000)
+            rows, projected = await _arun_attempts(conn, _batch_keyword_query_attempts(terms_list, domain))
+            ranked_lists = _rank_batch_rows(_split_batch_rows(rows, len(queries)), queries, analyses)
+            ids = _batch_hydrate_ids(ranked_lists)
+            if projected and ids:
+                result = await _atimed_execute(conn.execute, HYDRATE_SQL, {"ids": ids})
+                rows = result.mappings().all()
+                telemetry.observe("db.hydrate_bytes", _row_bytes(rows))
+                ranked_lists = [_hydrate_ranked(ranked, rows) for ranked in ranked_lists]
+        return ranked_lists
+    except Exception as e:
+        print(f"DB error: {e}")
+        return [[] for _ in queries]
+
+@lru_cache(maxsize=1)
 def load_core_schema():
-    schema_path = os.path.join(os.path.dirname(__file__), '../../data/_schemas/core.schema.json')
-    with open(schema_path, 'r', encoding='utf-8') as f:
+    with open(CORE_SCHEMA_PATH, 'r', encoding='utf-8') as f:
         return json.load(f)
 
+@lru_cache(maxsize=1)
+def _core_schema_validator():
+    return Draft7Validator(load_core_schema())
+
+@lru_cache(maxsize=1)
+def core_schema_fingerprint():
+    from crawlers.shared.validator import schema_fingerprint
+    return schema_fingerprint(load_core_schema())
+
 def validate_entry(entry):
-    schema = load_core_schema()
-    try:
-        jsonschema.validate(instance=entry, schema=schema)
+    if _core_schema_validator().is_valid(entry):
         return True
-    except jsonschema.ValidationError as e:
-        print("[VALIDATION ERROR]", e)
-        print("[INVALID ENTRY]", entry)
-        return False
+    telemetry.increment("retrieval.entries_schema_invalid")
+    return False
+
+def _validated_entries(keyword_results: list[dict]) -> list[dict]:
+    validated: list[dict] = []
+    for entry in keyword_results:
+        # Rows validated at import against the current schema skip the online check.
+        if entry.pop("_schema_checked", False):
+            validated.append(entry)
+            continue
+        telemetry.increment("retrieval.entries_validated_online")
+        if validate_entry(entry):
+            validated.append(entry)
+    return validated
 
-def retrieve_evidence(query: str, domain: str = None) -> list:
-    keyword_results = query_entries(query, domain)
-    validated: list[dict] = [entry for entry in keyword_results if validate_entry(entry)]
+def _keyword_only_evidence(validated: list[dict]) -> list:
+    return [Evidence(source="db", payload=entry, confidence=0.95) for entry in validated]
 
-    # Hybrid retrieval: fuse keyword results with semantic vector search over RAG corpus.
-    # Falls back silently to keyword-only if Qdrant / Ollama are not available.
-    try:
-        from .vector_retrieval import hybrid_retrieve
-        evidence = hybrid_retrieve(query=query, keyword_entries=validated, domain=domain)
-    except Exception as exc:
-        print(f"[retrieve_evidence] hybrid_retrieve failed, using keyword fallback: {exc}")
-        evidence = []
-        for entry in validated:
-            evidence.append(Evidence(source="db", content=json.dumps(entry), confidence=0.95))
 
+def _or_no_evidence(evidence: list) -> list:
     if not evidence:
         evidence.append(Evidence(source="db", content="No evidence found", confidence=0.0))
     return evidence
+
+
+async def _run_leg(name: str, coro, deadline: float | None, fallback, on_timeout=None):
+    """
+    Await one retrieval leg until `deadline` (loop time); on timeout or error
+    return `fallback`. The flag is True whenever the leg's result is missing
+    from the fusion, so the response is cached as degraded. `on_timeout`
+    receives the reason of a missed deadline.
+    """
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    try:
+        timeout = None if deadline is None else max(deadline - start, 0.0)
+        return await asyncio.wait_for(coro, timeout), False
+    except asyncio.TimeoutError:
+        telemetry.increment(f"retrieval.{name}_leg_timeouts")
+        print(f"[retrieval] {name} leg missed its deadline, fusing without it")
+        if on_timeout is not None:
+            on_timeout(f"{name} leg missed its deadline")
+        return fallback, True
+    except Exception as exc:
+        telemetry.increment(f"retrieval.{name}_leg_failures")
+        print(f"[retrieval] {name} leg failed, fusing without it: {exc}")
+        return fallback, True
+    finally:
+        telemetry.observe(f"retrieval.{name}_leg_ms", (loop.time() - start) * 1000)
+
+
+def _leg_deadline(budget_ms: float):
+    if budget_ms <= 0:
+        return None
+    return asyncio.get_running_loop().time() + budget_ms / 1000
+
+
+async def _run_legs(keyword_coro, vector_call, empty):
+    """
+    Run the keyword leg (coroutine) and the vector leg (blocking call, in a
+    worker thread) concurrently, each against its own budget. Returns
+    (keyword_result, vector_result, degraded_legs).
+    """
+    from .vector_retrieval import VECTOR_BREAKER, run_breaker_call
+
+    keyword_deadline = _leg_deadline(KEYWORD_LEG_TIMEOUT_MS)
+    vector_deadline = _leg_deadline(VECTOR_LEG_TIMEOUT_MS)
+    breaker_call = BreakerCall()
+    (keyword_result, keyword_degraded), (vector_result, vector_degraded) = await asyncio.gather(
+        _run_leg("keyword", keyword_coro, keyword_deadline, empty()),
+        # A late worker thread finishes in the background; only its result is
+        # dropped. The miss counts as the call's breaker failure, so a hanging
+        # Ollama opens the breaker instead of starting a new thread per
+        # request; the thread's own late outcome is then ignored.
+        _run_leg(
+            "vector",
+            asyncio.to_thread(run_breaker_call, breaker_call, vector_call),
+            vector_deadline,
+            empty(),
+            lambda reason: VECTOR_BREAKER.record_failure(reason, breaker_call),
+        ),
+    )
+    degraded = [
+        name for name, missing in (("keyword", keyword_degraded), ("vector", vector_degraded)) if missing
+    ]
+    if degraded:
+        telemetry.increment("retrieval.degraded_responses")
+    return keyword_result, vector_result, degraded
+
+
+async def _validated_keyword_leg(query: str, domain: str = None):
+    return _validated_entries(await aquery_entries(query, domain))
+
+
+async def _validated_keyword_leg_batch(queries: list[str], domain: str = None):
+    return [_validated_entries(entries) for entries in await aquery_entries_batch(queries, domain)]
+
+
+async def retrieve_evidence_with_status(query: str, domain: str = None):
+    """
+    Hybrid retrieval with the keyword (Postgres) and vector (Qdrant/Ollama)
+    legs running in parallel under per-leg budgets. Returns
+    (evidence, degraded_legs); degraded_legs names legs that missed their
+    deadline, failed or were short-circuited, and were left out of the fusion.
+    """
+    from .vector_retrieval import fuse_evidence, vector_search
+
+    validated, vector_results, degraded = await _run_legs(
+        _validated_keyword_leg(query, domain), lambda: vector_search(query), list
+    )
+    try:
+        evidence = fuse_evidence(validated, vector_results)
+    except Exception as exc:
+        print(f"[retrieval] fusion failed, using keyword fallback: {exc}")
+        evidence = _keyword_only_evidence(validated)
+    return _or_no_evidence(evidence), degraded
+
+
+async def retrieve_evidence_batch(queries: list[str], domain: str = None):
+    """
+    retrieve_evidence_with_status for several queries with shared database,
+    embedding and Qdrant round trips. Returns (evidence_lists, degraded_legs).
+    """
+    from .vector_retrieval import fuse_evidence, vector_search_batch
+
+    def empty():
+        return [[] for _ in queries]
+
+    validated_lists, vector_lists, degraded = await _run_legs(
+        _validated_keyword_leg_batch(queries, domain), lambda: vector_search_batch(queries), empty
+    )
+    evidence_lists = []
+    for validated, vector_results in zip(validated_lists, vector_lists):
+        try:
+            evidence = fuse_evidence(validated, vector_results)
+        except Exception as exc:
+            print(f"[retrieve_evidence_batch] fusion failed, using keyword fallback: {exc}")
+            evidence = _keyword_only_evidence(validated)
+        evidence_lists.append(_or_no_evidence(evidence))
+    return evidence_lists, degraded
@@ -1,20 +1,113 @@
 """
 Strict JSON schemas for outputs
 """
+import datetime
+import enum
+import hashlib
+import json
 from typing import Any, Dict, List, Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr, computed_field, model_validator
+
+try:
+    import orjson
+except ImportError:  # optional: json_default makes the stdlib encoder write the same bytes, only slower
+    orjson = None
+
+_UNPARSED = object()
+
+
+def json_default(value: Any) -> Any:
+    """Encode the non-JSON values orjson handles natively the way orjson does."""
+    if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, enum.Enum):
+        return value.value
+    return str(value)
+
+
+def dumps_payload(payload: Any) -> str:
+    """
+    Encode an evidence payload as compact JSON, with orjson when it is
+    installed. The encoding is part of content_hash and so of every
+    synthesize cache key shared between workers; both paths write identical
+    text for the dicts, lists, strings, numbers and dates payloads carry.
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(payload).decode("utf-8")
+        except TypeError:
+            pass
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":"), default=json_default)
+
 
 class Evidence(BaseModel):
+    """
+    One retrieved item. Retrieval builds it from the structured payload
+    (Evidence(payload=...)); `content`, the JSON string clients receive, is
+    encoded from it once, on first access. Evidence built from a content
+    string (cached responses, clients) parses it once, on first `payload`
+    access.
+    """
+
     source: str
-    content: str
     confidence: float
+    _content: Optional[str] = PrivateAttr(default=None)
+    _payload: Any = PrivateAttr(default=_UNPARSED)
+    _content_hash: Optional[str] = PrivateAttr(default=None)
+
+    @model_validator(mode="wrap")
+    @classmethod
+    def _split_content(cls, data, handler):
+        if not isinstance(data, dict):
+            return handler(data)
+        data = dict(data)
+        content = data.pop("content", None)
+        payload = data.pop("payload", _UNPARSED)
+        evidence = handler(data)
+        if content is None and payload is _UNPARSED:
+            raise ValueError("Evidence needs content or payload")
+        evidence._content = content
+        evidence._payload = payload
+        return evidence
+
+    @computed_field
+    @property
+    def content(self) -> str:
+        if self._content is None:
+            self._content = dumps_payload(self._payload)
+        return self._content
+
+    @property
+    def payload(self) -> Optional[dict]:
+        """The structured payload; None for plain-text content such as "No evidence found"."""
+        if self._payload is _UNPARSED:
+            try:
+                self._payload = json.loads(self._content)
+            except ValueError:
+                self._payload = None
+        return self._payload if isinstance(self._payload, dict) else None
+
+    @property
+    def content_hash(self) -> str:
+        if self._content_hash is None:
+            self._content_hash = hashlib.sha256(self.content.encode("utf-8")).hexdigest()
+        return self._content_hash
+
+    def __eq__(self, other):
+        if not isinstance(other, Evidence):
+            return NotImplemented
+        return (self.source, self.confidence, self.content) == (other.source, other.confidence, other.content)
 
 class QueryRequest(BaseModel):
     query: str
     explicit_escalation: bool = False
 
 
+class BatchQueryRequest(BaseModel):
+    queries: List[str] = Field(min_length=1, max_length=32)
+
+
 class ChatMessage(BaseModel):
     role: str
     content: str
@@ -39,6 +132,13 @@ class RetrieveResponse(BaseModel):
     evidence: List[Evidence] = Field(default_factory=list)
     weak_evidence: bool = False
     latency_ms: int
+    degraded: bool = False
+    degraded_legs: List[str] = Field(default_factory=list)
+
+
+class BatchRetrieveResponse(BaseModel):
+    results: List[RetrieveResponse] = Field(default_factory=list)
+    latency_ms: int
 
 
 class PlainLanguageAnswerVariants(BaseModel):
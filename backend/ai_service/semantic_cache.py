@@ -0,0 +1,104 @@
+"""
+Semantic answer cache for /synthesize.
+
+Synthesize cache keys use normalize_query, so "Ich habe meinen Job verloren,
+was nun?" and "job verloren was tun" never share an answer even when they
+retrieve the same evidence. This index remembers, per (model, evidence
+fingerprint), the embedding of every query an answer was cached for. A new
+query whose exact key misses can reuse the answer of a remembered query if
+both retrieved identical evidence and their embeddings have a cosine
+similarity of at least `threshold`.
+
+The index only maps to synthesize cache keys; the answers themselves stay in
+ai_cache, so TTLs, byte budgets and the L2 tier apply unchanged and an
+evicted answer is simply a miss here. Query vectors are read from the
+vector leg's query-embedding cache, which the retrieval that produced the
+evidence has just filled; when the vector leg did not run (RAG disabled,
+Ollama down, breaker open) the lookup is skipped rather than embedding again.
+
+Env vars:
+  AI_SEMANTIC_CACHE            default "true"; "false" disables the lookup
+  AI_SEMANTIC_CACHE_THRESHOLD  default 0.92
+  AI_SEMANTIC_CACHE_GROUPS     (model, evidence) groups kept, default 4096
+"""
+
+from __future__ import annotations
+
+import math
+import os
+import threading
+from collections import OrderedDict
+
+# Queries remembered per (model, evidence fingerprint); the oldest are dropped.
+MAX_QUERIES_PER_GROUP = 16
+
+
+def _unit(vector: list[float]) -> list[float] | None:
+    norm = math.sqrt(sum(value * value for value in vector))
+    if not norm:
+        return None
+    return [value / norm for value in vector]
+
+
+class SemanticAnswerIndex:
+    def __init__(self, threshold: float = 0.92, max_groups: int = 4096) -> None:
+        self.threshold = threshold
+        self.max_groups = max_groups
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._groups: OrderedDict[tuple[str, str], list[tuple[list[float], str]]] = OrderedDict()
+
+    @classmethod
+    def from_env(cls) -> "SemanticAnswerIndex | None":
+        if os.getenv("AI_SEMANTIC_CACHE", "true").strip().lower() in ("false", "0", "no"):
+            return None
+        return cls(
+            threshold=float(os.getenv("AI_SEMANTIC_CACHE_THRESHOLD", "0.92")),
+            max_groups=int(os.getenv("AI_SEMANTIC_CACHE_GROUPS", "4096")),
+        )
+
+    def match(self, model: str, evidence_hash: str, vector: list[float]) -> tuple[str, float] | None:
+        """(cache key, similarity) of the closest remembered query above the threshold."""
+        query = _unit(vector)
+        with self._lock:
+            entries = self._groups.get((model, evidence_hash)) or []
+            best: tuple[str, float] | None = None
+            if query is not None:
+                for stored, key in entries:
+                    if len(stored) != len(query):
+                        continue
+                    similarity = sum(a * b for a, b in zip(query, stored))
+                    if similarity >= self.threshold and (best is None or similarity > best[1]):
+                        best = (key, similarity)
+            if best is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self._groups.move_to_end((model, evidence_hash))
+            return best
+
+    def remember(self, model: str, evidence_hash: str, vector: list[float], key: str) -> None:
+        """Record that `key` answers the query embedded as `vector`."""
+        unit = _unit(vector)
+        if unit is None:
+            return
+        group_key = (model, evidence_hash)
+        with self._lock:
+            entries = [entry for entry in self._groups.get(group_key, []) if entry[1] != key]
+            entries.append((unit, key))
+            self._groups[group_key] = entries[-MAX_QUERIES_PER_GROUP:]
+            self._groups.move_to_end(group_key)
+            while len(self._groups) > self.max_groups:
+                self._groups.popitem(last=False)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "groups": len(self._groups),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hitRate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "threshold": self.threshold,
+            }
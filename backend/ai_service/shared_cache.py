@@ -0,0 +1,207 @@
+"""
+Second cache tier shared by the gateway workers of one host.
+
+ai_cache (cache.ResponseCache) is per process, so every uvicorn worker warms
+its own copy and a restart starts cold. A SharedCacheStore sits behind it:
+L1 misses are read through to the store and every set is written to both.
+Keys and TTLs are the ones endpoints.py already uses (cache_key,
+fingerprint_evidence), so an entry written by one worker is valid for all.
+
+The default store is a SQLite file in WAL mode. It is called from the
+request path, so set() only queues the row for a writer thread, which
+commits queued rows in batches; get() reads on its own connection with a
+short busy timeout, so a worker holding the write lock delays a request by
+at most that long. Another backend (e.g. a networked store) only has to
+implement get/set/sweep/stats, must not block either, and can be selected
+with AI_CACHE_L2=package.module:ClassName.
+
+Entries whose keys became unreachable (retrieve keys of an old corpus
+version) are not purged here; they expire with their TTL and are removed by
+sweep().
+
+Env vars:
+  AI_CACHE_L2           none (default) | sqlite | module:Class
+  AI_CACHE_L2_PATH      SQLite file, default data/_cache/ai_response_cache.sqlite3
+  AI_CACHE_L2_MAX_ROWS  rows kept after a sweep, default 100000
+  AI_CACHE_L2_READ_TIMEOUT_MS  busy timeout of a read, default 50
+  AI_CACHE_L2_QUEUE     writes waiting for the writer thread before new ones
+                        are dropped, default 1000
+"""
+
+from __future__ import annotations
+
+import importlib
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+_DEFAULT_PATH = Path(__file__).resolve().parents[2] / "data" / "_cache" / "ai_response_cache.sqlite3"
+
+
+class SharedCacheStore:
+    name = "none"
+
+    def get(self, key: str) -> tuple[Any, float, float] | None:
+        """(value, expires_at, fresh_until) for a live entry, else None."""
+        return None
+
+    def set(self, key: str, value: Any, expires_at: float, fresh_until: float | None = None) -> None:
+        """Store `value` until `expires_at`; it is served as stale after `fresh_until`."""
+        return None
+
+    def sweep(self) -> int:
+        """Remove expired entries; returns the number removed."""
+        return 0
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """Wait until queued writes are stored; False if `timeout` passed first."""
+        return True
+
+    def stats(self) -> dict[str, Any]:
+        return {"store": self.name}
+
+
+class SQLiteCacheStore(SharedCacheStore):
+    name = "sqlite"
+    # Rows committed together by the writer thread.
+    WRITE_BATCH = 64
+
+    def __init__(
+        self,
+        path: str | os.PathLike,
+        max_rows: int = 100000,
+        read_timeout: float = 0.05,
+        queue_size: int = 1000,
+    ) -> None:
+        self.path = Path(path)
+        self.max_rows = max_rows
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+        self.dropped_writes = 0
+        self._lock = threading.Lock()
+        self._read_lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Writes and sweeps run off the request path and may wait for other workers.
+        self._db = sqlite3.connect(str(self.path), timeout=5.0, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS ai_cache ("
+            " key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL, fresh_until REAL)"
+        )
+        columns = {row[1] for row in self._db.execute("PRAGMA table_info(ai_cache)")}
+        if "fresh_until" not in columns:
+            self._db.execute("ALTER TABLE ai_cache ADD COLUMN fresh_until REAL")
+        self._db.execute("CREATE INDEX IF NOT EXISTS ai_cache_expires ON ai_cache (expires_at)")
+        self._db.commit()
+        self._reader = sqlite3.connect(str(self.path), timeout=read_timeout, check_same_thread=False)
+        self._pending: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._writer = threading.Thread(target=self._write_loop, name="ai-cache-l2-writer", daemon=True)
+        self._writer.start()
+
+    def get(self, key: str) -> tuple[Any, float, float] | None:
+        with self._read_lock:
+            try:
+                row = self._reader.execute(
+                    "SELECT value, expires_at, fresh_until FROM ai_cache WHERE key = ? AND expires_at > ?",
+                    (key, time.time()),
+                ).fetchone()
+            except sqlite3.Error as exc:
+                self.errors += 1
+                print(f"[shared_cache] read failed: {exc}")
+                return None
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        value, expires_at, fresh_until = row
+        return json.loads(value), expires_at, expires_at if fresh_until is None else fresh_until
+
+    def set(self, key: str, value: Any, expires_at: float, fresh_until: float | None = None) -> None:
+        encoded = json.dumps(value, ensure_ascii=False, default=str)
+        try:
+            self._pending.put_nowait((key, encoded, expires_at, fresh_until))
+        except queue.Full:
+            # The L1 copy still serves this worker; other workers recompute.
+            self.dropped_writes += 1
+
+    def flush(self, timeout: float | None = None) -> bool:
+        done = self._pending.all_tasks_done
+        with done:
+            return done.wait_for(lambda: not self._pending.unfinished_tasks, timeout)
+
+    def _write_loop(self) -> None:
+        while True:
+            rows = [self._pending.get()]
+            while len(rows) < self.WRITE_BATCH:
+                try:
+                    rows.append(self._pending.get_nowait())
+                except queue.Empty:
+                    break
+            with self._lock:
+                try:
+                    self._db.executemany(
+                        "INSERT OR REPLACE INTO ai_cache (key, value, expires_at, fresh_until) VALUES (?, ?, ?, ?)",
+                        rows,
+                    )
+                    self._db.commit()
+                except sqlite3.Error as exc:
+                    self.errors += 1
+                    print(f"[shared_cache] write of {len(rows)} row(s) failed: {exc}")
+            for _ in rows:
+                self._pending.task_done()
+
+    def sweep(self) -> int:
+        with self._lock:
+            try:
+                removed = self._db.execute("DELETE FROM ai_cache WHERE expires_at <= ?", (time.time(),)).rowcount
+                # Over the row cap: drop the entries closest to expiry.
+                removed += self._db.execute(
+                    "DELETE FROM ai_cache WHERE key IN ("
+                    " SELECT key FROM ai_cache ORDER BY expires_at DESC LIMIT -1 OFFSET ?)",
+                    (self.max_rows,),
+                ).rowcount
+                self._db.commit()
+                return removed
+            except sqlite3.Error as exc:
+                self.errors += 1
+                print(f"[shared_cache] sweep failed: {exc}")
+                return 0
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "store": self.name,
+                "path": str(self.path),
+                "hits": self.hits,
+                "misses": self.misses,
+                "errors": self.errors,
+                "pendingWrites": self._pending.qsize(),
+                "droppedWrites": self.dropped_writes,
+            }
+
+
+def get_shared_store() -> SharedCacheStore | None:
+    """The L2 store selected by AI_CACHE_L2; None when disabled or it cannot be opened."""
+    choice = os.getenv("AI_CACHE_L2", "none").strip()
+    if choice.lower() in ("", "none"):
+        return None
+    try:
+        if choice.lower() == "sqlite":
+            return SQLiteCacheStore(
+                os.getenv("AI_CACHE_L2_PATH") or _DEFAULT_PATH,
+                max_rows=int(os.getenv("AI_CACHE_L2_MAX_ROWS", "100000")),
+                read_timeout=float(os.getenv("AI_CACHE_L2_READ_TIMEOUT_MS", "50")) / 1000,
+                queue_size=int(os.getenv("AI_CACHE_L2_QUEUE", "1000")),
+            )
+        module_name, _, class_name = choice.partition(":")
+        return getattr(importlib.import_module(module_name), class_name)()
+    except Exception as exc:
+        print(f"[shared_cache] AI_CACHE_L2={choice!r} unavailable, in-process cache only: {exc}")
+        return None
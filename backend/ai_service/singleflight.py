@@ -0,0 +1,45 @@
+"""
+Request coalescing for the AI endpoints.
+
+When many users ask the same question at once, every request misses ai_cache
+before the first answer is stored, and each would run its own retrieval and
+provider.generate_text call. SingleFlight.run lets the first caller for a key
+start the computation as a task; identical callers that arrive while it is
+in flight await that task and get the same result (or exception).
+
+The task is shielded, so a leader whose client disconnects does not cancel
+the work the other callers are waiting for. Keys are the cache keys
+endpoints.py already computes; counters go to telemetry as
+singleflight.<namespace>.leaders and singleflight.<namespace>.coalesced.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Awaitable, Callable
+
+from . import telemetry
+
+
+class SingleFlight:
+    def __init__(self) -> None:
+        self._tasks: dict[str, asyncio.Task] = {}
+
+    def in_flight(self) -> int:
+        return len(self._tasks)
+
+    async def run(self, key: str, compute: Callable[[], Awaitable[Any]]) -> Any:
+        namespace = key.split("::", 1)[0]
+        task = self._tasks.get(key)
+        if task is None:
+            task = asyncio.ensure_future(compute())
+            self._tasks[key] = task
+            task.add_done_callback(lambda done, key=key: self._forget(key, done))
+            telemetry.increment(f"singleflight.{namespace}.leaders")
+        else:
+            telemetry.increment(f"singleflight.{namespace}.coalesced")
+        return await asyncio.shield(task)
+
+    def _forget(self, key: str, task: asyncio.Task) -> None:
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
@@ -0,0 +1,252 @@
+"""
+In-process retrieval index over a snapshot of the entries table.
+
+The published dataset is small (~1000 entries), so the keyword leg can be
+answered from memory instead of a Postgres round trip per request:
+  - entries are normalized once when the snapshot is built,
+  - an inverted index maps folded tokens to entry positions, with a trigram
+    index over the token vocabulary for substring (ILIKE-style) lookups,
+  - folded per-entry text blobs verify matches, so results follow the same
+    "term occurs in a text column" semantics as the ILIKE query,
+  - domain/schema facets and the SQL quality ordering are precomputed arrays.
+
+SnapshotStore keeps the current index and rebuilds it in a background thread
+when the table version (max(updated_at), row count) changes; the swap is a
+single reference assignment, so readers always see a complete index.
+Postgres stays the source of truth: callers fall back to SQL while no
+snapshot is loaded.
+"""
+
+from __future__ import annotations
+
+import datetime
+import re
+import threading
+import time
+from typing import Any, Callable, Iterable
+
+_FOLD_TABLE = str.maketrans({"ä": "ae", "ö": "oe", "ü": "ue", "ß": "ss"})
+_TOKEN_RE = re.compile(r"[^\W_]+")
+
+SOURCE_TIER_ORDER = {
+    "tier_1_official": 0,
+    "tier_2_ngo_watchdog": 1,
+    "tier_4_academic": 2,
+    "tier_3_press": 3,
+}
+
+
+def fold(text: str) -> str:
+    """Lowercase and transliterate umlauts so "Bürgergeld" and "buergergeld" meet."""
+    return (text or "").lower().translate(_FOLD_TABLE)
+
+
+def _trigrams(token: str) -> set[str]:
+    return {token[index:index + 3] for index in range(len(token) - 2)}
+
+
+def _as_float(value: Any) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _timestamp(value: Any):
+    if isinstance(value, datetime.datetime):
+        return value.timestamp()
+    if isinstance(value, datetime.date):
+        return datetime.datetime.combine(value, datetime.time()).timestamp()
+    if isinstance(value, str) and value:
+        try:
+            return datetime.datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+        except ValueError:
+            return None
+    return None
+
+
+def quality_sort_key(row: dict) -> tuple:
+    """Python twin of retrieval.ORDER_BY_QUALITY."""
+    provenance = row.get("provenance") or {}
+    quality = row.get("quality_scores") or {}
+    tier = provenance.get("sourceTier") if isinstance(provenance, dict) else None
+    last_seen = _timestamp(row.get("last_seen"))
+    return (
+        SOURCE_TIER_ORDER.get(tier, 4),
+        -_as_float(quality.get("ais") if isinstance(quality, dict) else None),
+        -_as_float(quality.get("iqs") if isinstance(quality, dict) else None),
+        last_seen is None,
+        -(last_seen or 0.0),
+    )
+
+
+class SnapshotIndex:
+    def __init__(
+        self,
+        rows: Iterable[dict],
+        version: Any,
+        text_columns: tuple[str, ...],
+        normalize: Callable[[dict], dict],
+        limit: int = 24,
+    ) -> None:
+        self.version = version
+        self.limit = limit
+        self.entries: list[dict] = []
+        self.blobs: list[str] = []
+        self.domains: list[Any] = []
+        self.schema_valid: list[Any] = []
+        self.schema_fingerprints: list[Any] = []
+        self.order: list[int] = []
+        postings: dict[str, set[int]] = {}
+
+        ordering = []
+        for position, row in enumerate(rows):
+            row = dict(row)
+            if row.get("id") is not None:
+                row["id"] = str(row["id"])
+            blob = "\n".join(fold(str(row.get(column) or "")) for column in text_columns)
+            for token in _TOKEN_RE.findall(blob):
+                postings.setdefault(token, set()).add(position)
+            self.entries.append(normalize(row))
+            self.blobs.append(blob)
+            self.domains.append(row.get("domain"))
+            self.schema_valid.append(row.get("schema_valid"))
+            self.schema_fingerprints.append(row.get("schema_fingerprint"))
+            ordering.append((quality_sort_key(row), position))
+
+        ordering.sort()
+        # rank[position] -> place in the SQL quality ordering
+        self.order = [0] * len(ordering)
+        for rank, (_, position) in enumerate(ordering):
+            self.order[position] = rank
+
+        self._vocabulary = list(postings)
+        self._postings = [frozenset(postings[token]) for token in self._vocabulary]
+        self._gram_tokens: dict[str, set[int]] = {}
+        for token_id, token in enumerate(self._vocabulary):
+            for gram in _trigrams(token):
+                self._gram_tokens.setdefault(gram, set()).add(token_id)
+        self._part_cache: dict[str, frozenset[int]] = {}
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def _positions_for_part(self, part: str) -> frozenset[int]:
+        cached = self._part_cache.get(part)
+        if cached is not None:
+            return cached
+        if len(part) >= 3:
+            grams = sorted(_trigrams(part), key=lambda gram: len(self._gram_tokens.get(gram, ())))
+            token_ids = set(self._gram_tokens.get(grams[0], ()))
+            for gram in grams[1:]:
+                token_ids &= self._gram_tokens.get(gram, set())
+                if not token_ids:
+                    break
+        else:
+            token_ids = range(len(self._vocabulary))
+        positions: set[int] = set()
+        for token_id in token_ids:
+            if part in self._vocabulary[token_id]:
+                positions |= self._postings[token_id]
+        result = frozenset(positions)
+        if len(self._part_cache) < 4096:
+            self._part_cache[part] = result
+        return result
+
+    def _positions_for_term(self, term: str) -> set[int]:
+        folded = fold(term)
+        parts = _TOKEN_RE.findall(folded)
+        if not parts:
+            return set()
+        candidates = set(self._positions_for_part(parts[0]))
+        for part in parts[1:]:
+            candidates &= self._positions_for_part(part)
+        if len(parts) == 1 and parts[0] == folded:
+            return candidates
+        # Multi-part terms ("covid-19") must still occur verbatim in one column.
+        return {position for position in candidates if folded in self.blobs[position]}
+
+    def search(self, terms: list[str], domain: str = None, schema_fingerprint: str = None) -> list[dict]:
+        """
+        Same contract as the keyword SQL: up to `limit` rows ordered by the
+        number of matched terms, then source tier / quality / recency. Returns
+        shallow copies of the normalized entries with _term_score and
+        _schema_checked set.
+        """
+        scores: dict[int, int] = {}
+        for term in terms:
+            for position in self._positions_for_term(term):
+                scores[position] = scores.get(position, 0) + 1
+
+        matches = []
+        for position, term_score in scores.items():
+            if domain and self.domains[position] != domain:
+                continue
+            valid = self.schema_valid[position]
+            current = self.schema_fingerprints[position] == schema_fingerprint
+            if valid is False and current:
+                continue
+            matches.append((-term_score, self.order[position], position))
+        matches.sort()
+
+        out = []
+        for negative_score, _, position in matches[: self.limit]:
+            entry = dict(self.entries[position])
+            entry["_term_score"] = -negative_score
+            entry["_schema_checked"] = self.schema_valid[position] is True and (
+                self.schema_fingerprints[position] == schema_fingerprint
+            )
+            out.append(entry)
+        return out
+
+
+class SnapshotStore:
+    """
+    Holds the current SnapshotIndex and refreshes it off the request path.
+
+    `load_version()` is a cheap query (max(updated_at), count); `build(version)`
+    loads all rows and returns a new SnapshotIndex. Both run in a daemon thread.
+    """
+
+    def __init__(self, load_version: Callable[[], Any], build: Callable[[Any], SnapshotIndex], poll_seconds: float) -> None:
+        self._load_version = load_version
+        self._build = build
+        self.poll_seconds = poll_seconds
+        self.index: SnapshotIndex | None = None
+        self._last_check = 0.0
+        self._refreshing = threading.Lock()
+
+    def current(self) -> SnapshotIndex | None:
+        """Return the loaded index (or None) and schedule a version check when due."""
+        if time.monotonic() - self._last_check >= self.poll_seconds:
+            self.refresh_async()
+        return self.index
+
+    def refresh_async(self) -> None:
+        if not self._refreshing.acquire(blocking=False):
+            return
+        self._last_check = time.monotonic()
+        threading.Thread(target=self._refresh_locked, name="snapshot-refresh", daemon=True).start()
+
+    def refresh(self) -> bool:
+        """Synchronously rebuild if the table version moved; True when swapped."""
+        with self._refreshing:
+            self._last_check = time.monotonic()
+            return self._refresh()
+
+    def _refresh_locked(self) -> None:
+        try:
+            self._refresh()
+        finally:
+            self._refreshing.release()
+
+    def _refresh(self) -> bool:
+        try:
+            version = self._load_version()
+            if self.index is not None and self.index.version == version:
+                return False
+            self.index = self._build(version)
+            return True
+        except Exception as exc:
+            print(f"[snapshot_index] refresh failed, keeping previous snapshot: {exc}")
+            return False
@@ -1,8 +1,56 @@
 """
 Telemetry and safety fallbacks
 - Log all requests with feature, model, latency, success/failure, token/cost estimates
+- In-process counters and timings exposed via GET /metrics
 - Explicit weak evidence handling
 """
+import threading
+
+_METRICS_LOCK = threading.Lock()
+_COUNTERS: dict[str, float] = {}
+_GAUGES: dict[str, float] = {}
+_OBSERVATIONS: dict[str, dict[str, float]] = {}
+
+
+def increment(name: str, value: float = 1) -> None:
+    with _METRICS_LOCK:
+        _COUNTERS[name] = _COUNTERS.get(name, 0) + value
+
+
+def set_gauge(name: str, value: float) -> None:
+    with _METRICS_LOCK:
+        _GAUGES[name] = value
+
+
+def observe(name: str, value: float) -> None:
+    """Record one sample (e.g. a latency in ms) as count/sum/min/max."""
+    with _METRICS_LOCK:
+        stats = _OBSERVATIONS.get(name)
+        if stats is None:
+            _OBSERVATIONS[name] = {"count": 1, "sum": value, "min": value, "max": value}
+            return
+        stats["count"] += 1
+        stats["sum"] += value
+        stats["min"] = min(stats["min"], value)
+        stats["max"] = max(stats["max"], value)
+
+
+def snapshot() -> dict:
+    with _METRICS_LOCK:
+        return {
+            "counters": dict(_COUNTERS),
+            "gauges": dict(_GAUGES),
+            "observations": {name: dict(stats) for name, stats in _OBSERVATIONS.items()},
+        }
+
+
+def reset_metrics() -> None:
+    with _METRICS_LOCK:
+        _COUNTERS.clear()
+        _GAUGES.clear()
+        _OBSERVATIONS.clear()
+
+
 def log_telemetry(feature, model, latency_ms, success, token_estimate, cost_estimate):
     # TODO: implement logging to file/db
     pass
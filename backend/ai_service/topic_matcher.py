@@ -0,0 +1,236 @@
+"""
+Precompiled trusted-topic matching for the retrieval reranker.
+
+The topic registry (data/_topics/trusted_topic_sources.json) is compiled once
+into:
+  - a keyword automaton (Aho-Corasick) that detects all topic profiles in a
+    query with a single pass over the query text, and
+  - a host-suffix index mapping a registered source host to the
+    (topic, source, role, path patterns) records that apply to it,
+so the per-entry topic/role boost becomes a handful of dictionary lookups.
+"""
+
+from __future__ import annotations
+
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any
+
+
+ROLE_WEIGHTS: dict[str, float] = {
+    "official_rule_source": 4.0,
+    "official_glossary_source": 3.5,
+    "official_contact_source": 3.0,
+    "official_light_language_source": 2.5,
+    "official_background_source": 1.5,
+    "ngo_context_source": 1.5,
+    "journalism_source": 1.0,
+}
+DEFAULT_ROLE_WEIGHT = 0.5
+PATH_PATTERN_BOOST = 1.2
+
+_KEYWORD_FOLD = (
+    ("ä", "ae"), ("ö", "oe"), ("ü", "ue"), ("ß", "ss"),
+    ("Ã¤", "ae"), ("Ã¶", "oe"), ("Ã¼", "ue"), ("ÃŸ", "ss"),
+)
+
+GLOSSARY_TERMS = frozenset({"bedarfsgemeinschaft", "aufstocker", "regelbedarf", "mehrbedarf"})
+LIGHT_LANGUAGE_HINTS = ("leicht", "leichte sprache", "einfach")
+
+
+def fold_keyword(value: str) -> str:
+    """Lowercase and transliterate umlauts (including their mis-decoded UTF-8 forms)."""
+    value = value.lower()
+    for source, target in _KEYWORD_FOLD:
+        value = value.replace(source, target)
+    return value
+
+
+class KeywordAutomaton:
+    """Aho-Corasick automaton reporting every keyword that occurs in a text."""
+
+    def __init__(self, keywords) -> None:
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        self._output: list[tuple[str, ...]] = [()]
+        for keyword in keywords:
+            if keyword:
+                self._add(keyword)
+        self._link()
+
+    def _add(self, keyword: str) -> None:
+        state = 0
+        for char in keyword:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(())
+                self._goto[state][char] = next_state
+            state = next_state
+        if keyword not in self._output[state]:
+            self._output[state] = self._output[state] + (keyword,)
+
+    def _link(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[next_state] = target if target != next_state else 0
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+
+    def find(self, text: str) -> set[str]:
+        found: set[str] = set()
+        state = 0
+        goto = self._goto
+        fail = self._fail
+        output = self._output
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if output[state]:
+                found.update(output[state])
+        return found
+
+
+@dataclass(frozen=True)
+class SourceRule:
+    topic_index: int
+    source_id: str
+    role: str
+    path_patterns: tuple[str, ...]
+
+
+@dataclass
+class TopicQueryContext:
+    """Per-query part of the topic boost: matched topics and role bonuses."""
+
+    topic_indices: frozenset[int]
+    role_bonus: dict[str, float] = field(default_factory=dict)
+
+    def bonus_for(self, role: str) -> float:
+        return self.role_bonus.get(role, DEFAULT_ROLE_WEIGHT)
+
+
+class TopicMatcher:
+    def __init__(self, registry: list[Any], source_hosts: dict[str, str]) -> None:
+        self.topics: list[dict] = [topic for topic in registry or [] if isinstance(topic, dict)]
+        self._keyword_topics: dict[str, set[int]] = {}
+        self._host_rules: dict[str, list[SourceRule]] = {}
+
+        for index, topic in enumerate(self.topics):
+            for keyword in topic.get("keywords", []):
+                if isinstance(keyword, str):
+                    self._keyword_topics.setdefault(keyword.lower(), set()).add(index)
+            for source in topic.get("sources", []):
+                if not isinstance(source, dict):
+                    continue
+                source_id = str(source.get("sourceId") or "").strip()
+                expected_host = (source_hosts or {}).get(source_id)
+                if not expected_host:
+                    continue
+                patterns = tuple(
+                    pattern.lower()
+                    for pattern in source.get("preferredPathPatterns", [])
+                    if isinstance(pattern, str)
+                )
+                self._host_rules.setdefault(expected_host, []).append(
+                    SourceRule(
+                        topic_index=index,
+                        source_id=source_id,
+                        role=str(source.get("role") or "discovered"),
+                        path_patterns=patterns,
+                    )
+                )
+
+        self._automaton = KeywordAutomaton(self._keyword_topics.keys())
+
+        # Profile ranking by keyword hits on folded text (rewrite/enrich).
+        self._folded_keyword_topics: dict[str, dict[int, int]] = {}
+        self._always_hits: dict[int, int] = {}
+        for index, topic in enumerate(self.topics):
+            for keyword in topic.get("keywords", []):
+                if not isinstance(keyword, str):
+                    continue
+                folded = fold_keyword(keyword)
+                if not folded:
+                    self._always_hits[index] = self._always_hits.get(index, 0) + 1
+                    continue
+                counts = self._folded_keyword_topics.setdefault(folded, {})
+                counts[index] = counts.get(index, 0) + 1
+
+    def detect_indices(self, query: str, terms) -> frozenset[int]:
+        matched: set[int] = set()
+        for keyword in self._automaton.find((query or "").lower()):
+            matched.update(self._keyword_topics[keyword])
+        for term in terms or ():
+            matched.update(self._keyword_topics.get(term, ()))
+        return frozenset(matched)
+
+    def detect(self, query: str, terms) -> list[dict]:
+        indices = self.detect_indices(query, terms)
+        return [topic for index, topic in enumerate(self.topics) if index in indices]
+
+    def rank_profiles(self, text: str) -> list[dict]:
+        """
+        Topics whose keywords occur in the folded text, most keyword hits
+        first (ties by topic id). Each listed keyword counts once per listing.
+        """
+        folded = fold_keyword(text or "")
+        hits = dict(self._always_hits)
+        # Substring tests run in C; for long entry texts that beats walking
+        # the automaton character by character in Python.
+        for keyword, counts in self._folded_keyword_topics.items():
+            if keyword in folded:
+                for index, count in counts.items():
+                    hits[index] = hits.get(index, 0) + count
+        ranked = sorted(hits.items(), key=lambda item: (-item[1], str(self.topics[item[0]].get("id") or ""), item[0]))
+        return [self.topics[index] for index, _ in ranked]
+
+    def query_context(self, query: str, terms, intents) -> TopicQueryContext:
+        terms = list(terms or ())
+        intents = set(intents or ())
+        lowered_query = (query or "").lower()
+        role_bonus = dict(ROLE_WEIGHTS)
+        if "contact" in intents:
+            role_bonus["official_contact_source"] += 2.0
+        if "application" in intents:
+            role_bonus["official_rule_source"] += 1.8
+        if any(token in terms for token in GLOSSARY_TERMS):
+            role_bonus["official_glossary_source"] += 1.5
+        if any(hint in lowered_query for hint in LIGHT_LANGUAGE_HINTS):
+            role_bonus["official_light_language_source"] += 2.0
+        return TopicQueryContext(
+            topic_indices=self.detect_indices(query, terms),
+            role_bonus=role_bonus,
+        )
+
+    def rules_for_host(self, host: str) -> list[SourceRule]:
+        rules: list[SourceRule] = []
+        suffix = host
+        while suffix:
+            rules.extend(self._host_rules.get(suffix, ()))
+            _, dot, suffix = suffix.partition(".")
+            if not dot:
+                break
+        return rules
+
+    def boost(self, host: str, lowered_url: str, context: TopicQueryContext) -> float:
+        if not host or not context.topic_indices:
+            return 0.0
+        boost = 0.0
+        for rule in self.rules_for_host(host):
+            if rule.topic_index not in context.topic_indices:
+                continue
+            boost += context.bonus_for(rule.role)
+            for pattern in rule.path_patterns:
+                if pattern in lowered_url:
+                    boost += PATH_PATTERN_BOOST
+        return boost
@@ -2,7 +2,7 @@
 Vector retrieval layer for the AI sidecar.
 
 Provides hybrid retrieval: Qdrant semantic search (document corpus)
-fused with Postgres ILIKE results via Reciprocal Rank Fusion (RRF).
+fused with Postgres keyword results via Reciprocal Rank Fusion (RRF).
 
 The result is a unified ranked list of Evidence objects passed to synthesis.
 
@@ -10,19 +10,30 @@ Env vars:
   OLLAMA_BASE_URL       default: http://localhost:11434
   OLLAMA_EMBED_MODEL    default: nomic-embed-text
   QDRANT_URL            default: http://localhost:6333
+  RAG_VECTOR_BACKEND    default: qdrant  – "local" searches the in-process index instead
   RAG_ENABLED           default: "true"  – set "false" to disable vector retrieval
   RAG_VECTOR_WEIGHT     default: 0.6
   RAG_KEYWORD_WEIGHT    default: 0.4
   RAG_VECTOR_LIMIT      default: 8       – chunks to fetch from Qdrant
   RAG_CONTEXT_LIMIT     default: 5       – fused results sent to LLM
+  RAG_QUERY_EMBED_TIMEOUT_SECONDS default: 3 – query embedding timeout, no retries
+  RAG_BREAKER_WINDOW        default: 20  – recent vector calls the failure rate is taken over
+  RAG_BREAKER_MIN_CALLS     default: 5   – calls needed before the breaker may open
+  RAG_BREAKER_FAILURE_RATE  default: 0.5 – failure rate that opens the breaker
+  RAG_BREAKER_RESET_SECONDS default: 30  – probe interval while open; also the
+                                           retry delay after RagIndexer() failed
 """
 
 from __future__ import annotations
 
-import json
 import os
+import time
+from contextvars import ContextVar
 from typing import Any
 
+from . import telemetry
+from .circuit_breaker import BreakerCall, CircuitBreaker
+from .rerank_features import chunk_token_features, overlap_tokens, usable_chunk_tokens
 from .schemas import Evidence
 
 
@@ -89,20 +100,64 @@ def _rrf_fuse(
 # ---------------------------------------------------------------------------
 
 _indexer: Any = None
+_indexer_failed_at: float | None = None
 
 
 def _get_indexer():
-    global _indexer
+    """The shared RagIndexer or LocalRagIndexer; a failed construction is retried after RAG_BREAKER_RESET_SECONDS."""
+    global _indexer, _indexer_failed_at
     if _indexer is not None:
         return _indexer
+    if _indexer_failed_at is not None and time.monotonic() - _indexer_failed_at < _breaker_reset_seconds():
+        return None
     try:
-        from crawlers.rag.index_docs import RagIndexer
-        _indexer = RagIndexer()
-    except Exception:
+        from crawlers.rag.embedding_cache import QueryEmbeddingCache
+        from crawlers.rag.index_docs import OllamaEmbedder, create_indexer
+        # One short attempt: the leg's deadline drops a slow embed anyway, and
+        # the worker thread it runs in should not outlive that by minutes.
+        embedder = OllamaEmbedder(timeout=float(os.getenv("RAG_QUERY_EMBED_TIMEOUT_SECONDS", "3")), attempts=1)
+        _indexer = create_indexer(query_cache=QueryEmbeddingCache.from_env(), embedder=embedder)
+        _indexer_failed_at = None
+    except Exception as exc:
+        print(f"[vector_retrieval] RagIndexer unavailable: {exc}")
         _indexer = None
+        _indexer_failed_at = time.monotonic()
     return _indexer
 
 
+def _breaker_reset_seconds() -> float:
+    return float(os.getenv("RAG_BREAKER_RESET_SECONDS", "30"))
+
+
+def _probe_vector_backends() -> bool:
+    """Background probe while the breaker is open: Ollama answers and the vector store is readable."""
+    indexer = _get_indexer()
+    if indexer is None or not indexer.embedder.healthcheck():
+        return False
+    return indexer.ping()
+
+
+VECTOR_BREAKER = CircuitBreaker(
+    "vector_leg",
+    window=int(os.getenv("RAG_BREAKER_WINDOW", "20")),
+    min_calls=int(os.getenv("RAG_BREAKER_MIN_CALLS", "5")),
+    failure_rate=float(os.getenv("RAG_BREAKER_FAILURE_RATE", "0.5")),
+    reset_seconds=_breaker_reset_seconds(),
+    probe=_probe_vector_backends,
+)
+
+
+def vector_leg_status() -> dict:
+    """Breaker state of the vector leg for /health."""
+    return {"enabled": _is_rag_enabled(), **VECTOR_BREAKER.status()}
+
+
+def embedding_cache_stats() -> dict | None:
+    """Hit/miss counters of the query-embedding cache; None before the indexer exists."""
+    cache = getattr(_indexer, "query_cache", None)
+    return cache.stats() if cache is not None else None
+
+
 def _is_rag_enabled() -> bool:
     return os.getenv("RAG_ENABLED", "true").strip().lower() not in ("false", "0", "no")
 
@@ -127,25 +182,11 @@ _LAYER_WEIGHTS: dict[str, float] = {
 }
 
 
-def _content_length_factor(text: str) -> float:
-    n = len(text.strip())
-    if n < 60:
-        return 0.72
-    if n < 140:
-        return 0.88
-    return 1.0
-
-
-def _token_overlap(query: str, candidate: str) -> float:
-    stop = {
-        "der", "die", "das", "ein", "eine", "und", "oder", "mit", "von",
-        "im", "in", "an", "auf", "zu", "ist", "es", "ich", "sie", "wir",
-    }
-    q_tokens = {t for t in query.lower().split() if len(t) >= 3 and t not in stop}
-    c_tokens = {t for t in candidate.lower().split() if len(t) >= 3 and t not in stop}
-    if not q_tokens:
-        return 0.0
-    return len(q_tokens & c_tokens) / len(q_tokens)
+def _chunk_tokens(rec: dict) -> dict:
+    """Token record stored at index time; computed here for chunks indexed before it existed."""
+    return usable_chunk_tokens(rec.get("rerank_tokens")) or chunk_token_features(
+        rec.get("title", ""), rec.get("text", "")
+    )
 
 
 def rerank_vector_results(query: str, records: list[dict]) -> list[dict]:
@@ -155,28 +196,40 @@ def rerank_vector_results(query: str, records: list[dict]) -> list[dict]:
       - source_trust_level × knowledge_layer weights (fallback for unweighted items)
       - content length factor
       - query token overlap
-    """
-    scored: list[tuple[float, dict]] = []
-    for rec in records:
-        raw = float(rec.get("raw_score", 0.0))
 
+    Token sets and text length come from the payload's rerank_tokens record;
+    the scores are computed over all candidates in one NumPy pass.
+    """
+    if not records:
+        return []
+    import numpy as np  # installed with qdrant-client; only needed once there are hits
+
+    q_tokens = overlap_tokens(query)
+    q_count = len(q_tokens) or 1
+    raw = np.empty(len(records))
+    weights = np.empty(len(records))
+    chars = np.empty(len(records))
+    title_hits = np.zeros(len(records))
+    text_hits = np.zeros(len(records))
+    for i, rec in enumerate(records):
+        raw[i] = float(rec.get("raw_score", 0.0))
         stored_weight = float(rec.get("source_weight") or 0.0)
         if stored_weight > 0:
-            sw = stored_weight
+            weights[i] = stored_weight
         else:
             trust = _TRUST_WEIGHTS.get(rec.get("source_trust_level", ""), 1.0)
             layer = _LAYER_WEIGHTS.get(rec.get("knowledge_layer", ""), 0.7)
-            sw = trust * layer / 2.0  # centre around ~1.0
-
-        cf = _content_length_factor(rec.get("text", ""))
-        title_overlap = _token_overlap(query, rec.get("title", ""))
-        text_overlap = _token_overlap(query, rec.get("text", ""))
-        final = raw * sw * cf + title_overlap * 0.35 + text_overlap * 0.15
+            weights[i] = trust * layer / 2.0  # centre around ~1.0
+        tokens = _chunk_tokens(rec)
+        chars[i] = tokens["chars"]
+        if q_tokens:
+            title_hits[i] = len(q_tokens.intersection(tokens["title"]))
+            text_hits[i] = len(q_tokens.intersection(tokens["text"]))
 
-        scored.append((final, {**rec, "final_score": final}))
-
-    scored.sort(key=lambda x: x[0], reverse=True)
-    return [r for _, r in scored]
+    length_factor = np.select([chars < 60, chars < 140], [0.72, 0.88], 1.0)
+    final = raw * weights * length_factor + (title_hits * 0.35 + text_hits * 0.15) / q_count
+    order = np.argsort(-final, kind="stable")
+    return [{**records[i], "final_score": float(final[i])} for i in order]
 
 
 # ---------------------------------------------------------------------------
@@ -186,7 +239,7 @@ def rerank_vector_results(query: str, records: list[dict]) -> list[dict]:
 def _structured_entry_to_evidence(entry: dict, score: float) -> Evidence:
     return Evidence(
         source="db",
-        content=json.dumps(entry),
+        payload=entry,
         confidence=min(1.0, max(0.0, score)),
     )
 
@@ -214,7 +267,7 @@ def _rag_chunk_to_evidence(chunk: dict, score: float) -> Evidence:
     }
     return Evidence(
         source="rag",
-        content=json.dumps(payload),
+        payload=payload,
         confidence=min(1.0, max(0.0, score)),
     )
 
@@ -223,31 +276,94 @@ def _rag_chunk_to_evidence(chunk: dict, score: float) -> Evidence:
 # Public API
 # ---------------------------------------------------------------------------
 
-def hybrid_retrieve(
-    query: str,
-    keyword_entries: list[dict],
-    domain: str | None = None,
-) -> list[Evidence]:
+class VectorLegUnavailable(RuntimeError):
+    """The vector leg did not run (no indexer, breaker open) or failed."""
+
+
+def vector_search(query: str) -> list[dict]:
+    """
+    Vector leg: embed the query, search Qdrant and rerank the chunks.
+
+    Returns [] if RAG is disabled; raises VectorLegUnavailable if Qdrant or
+    Ollama is unavailable or the circuit breaker is open, so the caller can
+    tell "no hits" from "no vector leg".
     """
-    Hybrid retrieval: fuse Postgres keyword results with Qdrant vector results.
+    if not _is_rag_enabled():
+        return []
+    return _guarded_vector_call(
+        lambda indexer: rerank_vector_results(query, indexer.search(query=query, limit=_vector_limit()))
+    )
+
 
-    Falls back silently to keyword-only if RAG is disabled or Qdrant is unavailable.
+def cached_query_embedding(query: str) -> list[float] | None:
     """
-    vector_limit = int(os.getenv("RAG_VECTOR_LIMIT", "8"))
+    The query's vector from the query-embedding cache, which the vector leg
+    filled when it searched for this query; None if it is not cached. Never
+    calls Ollama.
+    """
+    cache = getattr(_indexer, "query_cache", None)
+    if cache is None:
+        return None
+    return cache.get(_indexer.embedder.model, query)
+
+
+def vector_search_batch(queries: list[str]) -> list[list[dict]]:
+    """vector_search for many queries with one embedding call and one Qdrant batch query."""
+    if not _is_rag_enabled() or not queries:
+        return [[] for _ in queries]
+    return _guarded_vector_call(
+        lambda indexer: [
+            rerank_vector_results(query, raw_chunks)
+            for query, raw_chunks in zip(queries, indexer.search_batch(queries=queries, limit=_vector_limit()))
+        ]
+    )
+
+
+# Breaker call of the vector leg running in this thread, set by
+# run_breaker_call so the caller can settle it when the leg misses its deadline.
+_BREAKER_CALL: ContextVar[BreakerCall | None] = ContextVar("vector_breaker_call", default=None)
+
+
+def run_breaker_call(call: BreakerCall, fn):
+    """Run `fn()` with its VECTOR_BREAKER outcome recorded against `call`."""
+    token = _BREAKER_CALL.set(call)
+    try:
+        return fn()
+    finally:
+        _BREAKER_CALL.reset(token)
+
+
+def _guarded_vector_call(call):
+    """Run `call(indexer)` through VECTOR_BREAKER; VectorLegUnavailable when open or on failure."""
+    indexer = _get_indexer()
+    if indexer is None:
+        raise VectorLegUnavailable("RagIndexer unavailable")
+    pending = _BREAKER_CALL.get()
+    admitted = VECTOR_BREAKER.acquire(pending)
+    if admitted is None:
+        if pending is not None and pending.settled:
+            raise VectorLegUnavailable("vector leg missed its deadline")
+        telemetry.increment("retrieval.vector_short_circuit")
+        raise VectorLegUnavailable("vector leg circuit breaker is open")
+    try:
+        result = call(indexer)
+    except Exception as exc:
+        VECTOR_BREAKER.record_failure(exc, admitted)
+        raise VectorLegUnavailable(f"Qdrant unavailable: {exc}") from exc
+    VECTOR_BREAKER.record_success(admitted)
+    return result
+
+
+def _vector_limit() -> int:
+    return int(os.getenv("RAG_VECTOR_LIMIT", "8"))
+
+
+def fuse_evidence(keyword_entries: list[dict], vector_results: list[dict]) -> list[Evidence]:
+    """RRF-fuse both legs; keyword-only when the vector leg returned nothing."""
     context_limit = int(os.getenv("RAG_CONTEXT_LIMIT", "5"))
     vector_weight = float(os.getenv("RAG_VECTOR_WEIGHT", "0.6"))
     keyword_weight = float(os.getenv("RAG_KEYWORD_WEIGHT", "0.4"))
 
-    vector_results: list[dict] = []
-    if _is_rag_enabled():
-        indexer = _get_indexer()
-        if indexer is not None:
-            try:
-                raw_chunks = indexer.search(query=query, limit=vector_limit)
-                vector_results = rerank_vector_results(query, raw_chunks)
-            except Exception as exc:
-                print(f"[vector_retrieval] Qdrant unavailable, keyword-only fallback: {exc}")
-
     if not vector_results:
         return [
             _structured_entry_to_evidence(entry, max(0.1, 1.0 - i * 0.15))
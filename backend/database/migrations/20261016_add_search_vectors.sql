@@ -0,0 +1,32 @@
+-- Migration: Weighted full-text search vectors for AI retrieval
+--
+-- Title (A), summary (B) and content (C/D) are folded into one stored tsvector
+-- per language so candidate generation in backend/ai_service/retrieval.py can
+-- run through a single GIN index and rank with ts_rank_cd weights.
+-- Partial-word matches are served by the trigram indexes from
+-- 20260307_add_trgm_indexes.sql.
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+ALTER TABLE entries ADD COLUMN IF NOT EXISTS search_vector_de tsvector
+  GENERATED ALWAYS AS (
+    setweight(to_tsvector('german', COALESCE(title_de, '')), 'A') ||
+    setweight(to_tsvector('german', COALESCE(title_easy_de, '')), 'A') ||
+    setweight(to_tsvector('german', COALESCE(summary_de, '')), 'B') ||
+    setweight(to_tsvector('german', COALESCE(summary_easy_de, '')), 'B') ||
+    setweight(to_tsvector('german', COALESCE(content_de, '')), 'C') ||
+    setweight(to_tsvector('german', COALESCE(content_easy_de, '')), 'D')
+  ) STORED;
+
+ALTER TABLE entries ADD COLUMN IF NOT EXISTS search_vector_en tsvector
+  GENERATED ALWAYS AS (
+    setweight(to_tsvector('english', COALESCE(title_en, '')), 'A') ||
+    setweight(to_tsvector('english', COALESCE(summary_en, '')), 'B') ||
+    setweight(to_tsvector('english', COALESCE(content_en, '')), 'C')
+  ) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_entries_search_vector_de
+  ON entries USING gin (search_vector_de);
+
+CREATE INDEX IF NOT EXISTS idx_entries_search_vector_en
+  ON entries USING gin (search_vector_en);
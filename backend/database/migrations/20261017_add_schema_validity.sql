@@ -0,0 +1,11 @@
+-- Migration: Precomputed core-schema validity for AI retrieval
+--
+-- crawlers/cli.py import_to_db validates each entry against
+-- data/_schemas/core.schema.json and stores the result together with the
+-- sha256 fingerprint of the schema it used. backend/ai_service/retrieval.py
+-- filters on these columns instead of validating every row per request;
+-- rows imported before this migration (NULL) or against a different schema
+-- fingerprint are still validated online.
+
+ALTER TABLE entries ADD COLUMN IF NOT EXISTS schema_valid BOOLEAN;
+ALTER TABLE entries ADD COLUMN IF NOT EXISTS schema_fingerprint TEXT;
@@ -0,0 +1,9 @@
+-- Migration: Per-entry rerank feature records for AI retrieval
+--
+-- Written by crawlers/cli.py import_to_db from
+-- backend/ai_service/rerank_features.py (keyword flags, lowercased title,
+-- facets, source host, quality tuple) so the sidecar reranker never has to
+-- scan full content. Rows without a record, or with an older record
+-- version, are featurized online.
+
+ALTER TABLE entries ADD COLUMN IF NOT EXISTS rerank_features JSONB;
@@ -0,0 +1,24 @@
+-- Migration: Notify listeners when entries change
+--
+-- The AI sidecar keys its retrieval cache by the entries version
+-- (max(updated_at), row count) and LISTENs on entries_changed to move to a
+-- new version immediately after imports (crawlers/cli.py import_to_db) and
+-- moderation decisions. Statement-level, so a bulk import sends one
+-- notification per statement; Postgres folds duplicates within a
+-- transaction. The updated_at index keeps the version query an index lookup.
+
+CREATE INDEX IF NOT EXISTS idx_entries_updated_at ON entries(updated_at);
+
+CREATE OR REPLACE FUNCTION notify_entries_changed()
+RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM pg_notify('entries_changed', TG_OP);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS entries_changed_notify ON entries;
+CREATE TRIGGER entries_changed_notify
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON entries
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION notify_entries_changed();
@@ -29,6 +29,8 @@ from crawlers.tools.seeded_crawler import SeededToolsCrawler
 from crawlers.organizations.seeded_crawler import SeededOrganizationsCrawler
 from crawlers.contacts.seeded_crawler import SeededContactsCrawler
 from crawlers.shared.validator import SchemaValidator
+from backend.ai_service.entry_rows import normalize_entry_row
+from backend.ai_service.rerank_features import compute_rerank_features
 from crawlers.shared.quality_scorer import QualityScorer
 from crawlers.shared.diff_generator import DiffGenerator
 from crawlers.shared.link_expander import LinkExpander
@@ -84,6 +86,42 @@ def _get_easy_title(entry: dict) -> str | None:
     return None
 
 
+def _entry_row(entry: dict, domain: str) -> dict:
+    """The entries row (ENTRY_COLUMNS) import_to_db writes for a crawler entry."""
+    return {
+        'id': entry['id'],
+        'domain': domain,
+        'title_de': _get_localized_value(entry, 'title', 'de'),
+        'title_en': _get_localized_value(entry, 'title', 'en'),
+        'title_easy_de': _get_easy_title(entry),
+        'summary_de': _get_localized_value(entry, 'summary', 'de'),
+        'summary_en': _get_localized_value(entry, 'summary', 'en'),
+        'summary_easy_de': _get_localized_value(entry, 'summary', 'easy_de'),
+        'content_de': _get_localized_value(entry, 'content', 'de'),
+        'content_en': _get_localized_value(entry, 'content', 'en'),
+        'content_easy_de': _get_localized_value(entry, 'content', 'easy_de'),
+        'url': entry['url'],
+        'topics': entry.get('topics', []),
+        'tags': entry.get('tags', []),
+        'target_groups': entry.get('targetGroups', []),
+        'valid_from': entry.get('validFrom'),
+        'valid_until': entry.get('validUntil'),
+        'deadline': entry.get('deadline'),
+        'status': entry['status'],
+        'first_seen': entry.get('firstSeen'),
+        'last_seen': entry.get('lastSeen'),
+        'source_unavailable': entry.get('sourceUnavailable', False),
+        'provenance': entry.get('provenance', {}),
+        'translations': entry.get('translations', {}),
+        'quality_scores': entry.get('qualityScores', {}),
+    }
+
+
+def _is_core_valid_row(validator: SchemaValidator, row: dict) -> bool:
+    """Core-schema verdict for the document the AI sidecar builds from `row`."""
+    return validator.is_core_valid(normalize_entry_row(row))
+
+
 def _json_value(raw):
     return raw if raw not in (None, '', [], {}) else None
 
@@ -486,20 +524,21 @@ def import_to_db(domain: str, data_dir: str):
         conn = psycopg2.connect(database_url)
         cur = conn.cursor()
         
+        # Core-schema validity is computed once here so the AI retrieval path
+        # only filters on the schema_valid column. It is checked on the
+        # document the sidecar builds from the row, against the repository
+        # schemas it fingerprints, whatever data_dir the entries come from.
+        validator = SchemaValidator(str(Path(__file__).parent.parent / 'data' / '_schemas'))
         imported_count = 0
+        invalid_count = 0
         
         for entry in entries:
             try:
-                title_de = _get_localized_value(entry, 'title', 'de')
-                title_en = _get_localized_value(entry, 'title', 'en')
-                title_easy_de = _get_easy_title(entry)
+                row = _entry_row(entry, domain)
                 title_legacy = _get_legacy_title(entry)
-                summary_de = _get_localized_value(entry, 'summary', 'de')
-                summary_en = _get_localized_value(entry, 'summary', 'en')
-                summary_easy_de = _get_localized_value(entry, 'summary', 'easy_de')
-                content_de = _get_localized_value(entry, 'content', 'de')
-                content_en = _get_localized_value(entry, 'content', 'en')
-                content_easy_de = _get_localized_value(entry, 'content', 'easy_de')
+                schema_valid = _is_core_valid_row(validator, row)
+                if not schema_valid:
+                    invalid_count += 1
 
                 # Insert into entries table
                 cur.execute("""
@@ -510,10 +549,12 @@ def import_to_db(domain: str, data_dir: str):
                         url, topics, tags, target_groups,
                         valid_from, valid_until, deadline, status,
                         first_seen, last_seen, source_unavailable,
-                        provenance, translations, quality_scores
+                        provenance, translations, quality_scores,
+                        schema_valid, schema_fingerprint, rerank_features
                     ) VALUES (
                         %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s,
-                        %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s
+                        %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s,
+                        %s, %s, %s
                     )
                     ON CONFLICT (id) DO UPDATE SET
                         title = EXCLUDED.title,
@@ -539,17 +580,22 @@ def import_to_db(domain: str, data_dir: str):
                         provenance = EXCLUDED.provenance,
                         translations = EXCLUDED.translations,
                         quality_scores = EXCLUDED.quality_scores,
+                        schema_valid = EXCLUDED.schema_valid,
+                        schema_fingerprint = EXCLUDED.schema_fingerprint,
+                        rerank_features = EXCLUDED.rerank_features,
                         updated_at = NOW()
                 """, (
-                    entry['id'], domain,
+                    row['id'], row['domain'],
                     title_legacy,
-                    title_de, title_en, title_easy_de,
-                    summary_de, summary_en, summary_easy_de,
-                    content_de, content_en, content_easy_de,
-                    entry['url'], entry.get('topics', []), entry.get('tags', []), entry.get('targetGroups', []),
-                    entry.get('validFrom'), entry.get('validUntil'), entry.get('deadline'), entry['status'],
-                    entry.get('firstSeen'), entry.get('lastSeen'), entry.get('sourceUnavailable', False),
-                    Json(entry.get('provenance', {})), Json(entry.get('translations', {})), Json(entry.get('qualityScores', {}))
+                    row['title_de'], row['title_en'], row['title_easy_de'],
+                    row['summary_de'], row['summary_en'], row['summary_easy_de'],
+                    row['content_de'], row['content_en'], row['content_easy_de'],
+                    row['url'], row['topics'], row['tags'], row['target_groups'],
+                    row['valid_from'], row['valid_until'], row['deadline'], row['status'],
+                    row['first_seen'], row['last_seen'], row['source_unavailable'],
+                    Json(row['provenance']), Json(row['translations']), Json(row['quality_scores']),
+                    schema_valid, validator.core_schema_fingerprint,
+                    Json(compute_rerank_features({**entry, 'domain': domain}))
                 ))
                 
                 # Insert into domain-specific table if applicable
@@ -723,6 +769,8 @@ def import_to_db(domain: str, data_dir: str):
         conn.close()
         
         logger.info(f"Successfully imported {imported_count}/{len(entries)} entries")
+        if invalid_count:
+            logger.warning(f"{invalid_count} {domain} entries failed core schema validation (schema_valid = false)")
         return True
         
     except Exception as e:
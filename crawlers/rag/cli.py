@@ -160,10 +160,10 @@ def cmd_ingest(args: argparse.Namespace) -> None:
 
 def cmd_index(args: argparse.Namespace) -> None:
     from .ingest import ingest_source, ingest_all
-    from .index_docs import RagIndexer
+    from .index_docs import create_indexer
     from .sources import load_registry, get_source
 
-    idx = RagIndexer()
+    idx = create_indexer()
     if not idx.embedder.healthcheck():
         print("ERROR: Ollama is not reachable at", idx.embedder.base_url, file=sys.stderr)
         print("Start Ollama with: ollama serve", file=sys.stderr)
@@ -195,9 +195,9 @@ def cmd_index(args: argparse.Namespace) -> None:
 
 
 def cmd_search(args: argparse.Namespace) -> None:
-    from .index_docs import RagIndexer
+    from .index_docs import create_indexer
 
-    idx = RagIndexer()
+    idx = create_indexer()
     results = idx.search(args.query, limit=args.limit)
     if not results:
         print("No results.")
@@ -240,7 +240,7 @@ def main() -> None:
     p_ingest.add_argument("--source-id", nargs="*")
     p_ingest.add_argument("--force", action="store_true", help="Re-fetch even if cached")
 
-    p_index = sub.add_parser("index", help="Ingest + embed + upsert to Qdrant")
+    p_index = sub.add_parser("index", help="Ingest + embed + upsert to Qdrant (or the local index)")
     p_index.add_argument("--source-id", nargs="*")
     p_index.add_argument("--force", action="store_true")
 
@@ -0,0 +1,153 @@
+"""
+Query-embedding cache for online RAG search.
+
+RagIndexer.search embeds every query through Ollama's /api/embed before it
+can ask Qdrant. Repeated and popular queries (the life-event suite, cached
+UI suggestions) produce the same vector every time, so vectors are kept in a
+bounded LRU keyed on (embed model, normalized query). When a path is given,
+entries are also written to a small SQLite file and read back after a
+restart.
+
+Queries are normalized by collapsing whitespace only: embedding models are
+case sensitive, so "Wohngeld" and "wohngeld" stay separate entries.
+Indexing (chunk embeddings) does not go through this cache.
+
+Env vars:
+  RAG_EMBED_CACHE_SIZE       in-memory entries, default 2048 (0 disables)
+  RAG_EMBED_CACHE_PATH       SQLite file for persistence, default: memory only
+  RAG_EMBED_CACHE_DISK_MAX   rows kept on disk, default 50000
+"""
+
+from __future__ import annotations
+
+import os
+import sqlite3
+import threading
+from array import array
+from collections import OrderedDict
+from pathlib import Path
+
+
+def normalize_embed_query(text: str) -> str:
+    return " ".join((text or "").split())
+
+
+class QueryEmbeddingCache:
+    def __init__(
+        self,
+        max_entries: int = 2048,
+        path: str | os.PathLike | None = None,
+        max_disk_entries: int = 50000,
+    ) -> None:
+        self.max_entries = max_entries
+        self.max_disk_entries = max_disk_entries
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        self._lock = threading.Lock()
+        self._store: OrderedDict[tuple[str, str], list[float]] = OrderedDict()
+        self._db: sqlite3.Connection | None = None
+        self._writes = 0
+        if path:
+            self._open(Path(path))
+
+    @classmethod
+    def from_env(cls) -> "QueryEmbeddingCache | None":
+        size = int(os.getenv("RAG_EMBED_CACHE_SIZE", "2048"))
+        if size <= 0:
+            return None
+        return cls(
+            max_entries=size,
+            path=os.getenv("RAG_EMBED_CACHE_PATH") or None,
+            max_disk_entries=int(os.getenv("RAG_EMBED_CACHE_DISK_MAX", "50000")),
+        )
+
+    def _open(self, path: Path) -> None:
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            db = sqlite3.connect(str(path), check_same_thread=False)
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS query_embeddings ("
+                " model TEXT NOT NULL, query TEXT NOT NULL, vector BLOB NOT NULL,"
+                " PRIMARY KEY (model, query))"
+            )
+            db.commit()
+            self._db = db
+        except sqlite3.Error as exc:
+            print(f"[embedding_cache] persistence disabled, cannot open {path}: {exc}")
+            self._db = None
+
+    def get(self, model: str, query: str) -> list[float] | None:
+        key = (model, normalize_embed_query(query))
+        with self._lock:
+            vector = self._store.get(key)
+            if vector is not None:
+                self._store.move_to_end(key)
+                self.hits += 1
+                return vector
+            vector = self._load(key)
+            if vector is not None:
+                self._remember(key, vector)
+                self.hits += 1
+                self.disk_hits += 1
+                return vector
+            self.misses += 1
+            return None
+
+    def set(self, model: str, query: str, vector: list[float]) -> None:
+        key = (model, normalize_embed_query(query))
+        with self._lock:
+            self._remember(key, vector)
+            self._persist(key, vector)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._store),
+                "hits": self.hits,
+                "misses": self.misses,
+                "diskHits": self.disk_hits,
+                "hitRate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "persistent": self._db is not None,
+            }
+
+    def _remember(self, key: tuple[str, str], vector: list[float]) -> None:
+        self._store[key] = vector
+        self._store.move_to_end(key)
+        while len(self._store) > self.max_entries:
+            self._store.popitem(last=False)
+
+    def _load(self, key: tuple[str, str]) -> list[float] | None:
+        if self._db is None:
+            return None
+        try:
+            row = self._db.execute(
+                "SELECT vector FROM query_embeddings WHERE model = ? AND query = ?", key
+            ).fetchone()
+        except sqlite3.Error as exc:
+            print(f"[embedding_cache] read failed: {exc}")
+            return None
+        if row is None:
+            return None
+        return array("d", row[0]).tolist()
+
+    def _persist(self, key: tuple[str, str], vector: list[float]) -> None:
+        if self._db is None:
+            return
+        try:
+            self._db.execute(
+                "INSERT OR REPLACE INTO query_embeddings (model, query, vector) VALUES (?, ?, ?)",
+                (*key, array("d", vector).tobytes()),
+            )
+            self._writes += 1
+            if self._writes % 256 == 0:
+                # Keep the newest rows; rowid grows with every replace.
+                self._db.execute(
+                    "DELETE FROM query_embeddings WHERE rowid <= "
+                    "(SELECT max(rowid) FROM query_embeddings) - ?",
+                    (self.max_disk_entries,),
+                )
+            self._db.commit()
+        except sqlite3.Error as exc:
+            print(f"[embedding_cache] write failed: {exc}")
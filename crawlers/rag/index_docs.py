@@ -7,6 +7,8 @@ Env vars:
   OLLAMA_BASE_URL      default: http://localhost:11434
   OLLAMA_EMBED_MODEL   default: nomic-embed-text
   QDRANT_URL           default: http://localhost:6333
+  RAG_VECTOR_BACKEND   default: qdrant – "local" uses the in-process index (local_index.py)
+  RAG_EMBED_CACHE_*    query-embedding cache for search (see embedding_cache.py)
 
 Usage (via CLI):
   python -m crawlers.rag.cli index
@@ -29,24 +31,118 @@ from qdrant_client.models import (
     MatchAny,
     MatchValue,
     PointStruct,
+    QueryRequest,
     VectorParams,
 )
 
+from backend.ai_service.rerank_features import chunk_token_features
+
+from .embedding_cache import QueryEmbeddingCache
 from .schemas import RagChunk
 
 COLLECTION_NAME = "rag_systemfehler"
 
 
+def chunk_point_id(chunk_id: str) -> int:
+    """Deterministic integer point ID from chunk_id."""
+    return int(hashlib.sha1(chunk_id.encode()).hexdigest()[:16], 16)
+
+
+def chunk_payload(chunk: RagChunk) -> dict[str, Any]:
+    return {
+        "chunk_id": chunk.chunk_id,
+        "document_id": chunk.document_id,
+        "source_id": chunk.source_id,
+        "title": chunk.title,
+        "section_title": chunk.section_title,
+        "url": chunk.url,
+        "source_name": chunk.source_name,
+        "source_trust_level": chunk.source_trust_level,
+        "document_type": chunk.document_type,
+        "knowledge_layer": chunk.knowledge_layer,
+        "language": chunk.language,
+        "jurisdiction": chunk.jurisdiction,
+        "topics": chunk.topics,
+        "target_groups": chunk.target_groups,
+        "publication_date": chunk.publication_date,
+        "license_or_rights": chunk.license_or_rights,
+        "text": chunk.text,
+        "char_start": chunk.char_start,
+        "char_end": chunk.char_end,
+        "chunk_index": chunk.chunk_index,
+        "total_chunks": chunk.total_chunks,
+        "source_weight": chunk.source_weight,
+        # Token sets for rerank_vector_results, so online reranking skips tokenizing.
+        "rerank_tokens": chunk_token_features(chunk.title, chunk.text),
+    }
+
+
+def records_from_hits(query: str, hits, limit: int) -> list[dict[str, Any]]:
+    """Score (similarity, payload) hits with source weight and topic boost; best `limit` first."""
+    from .sources import topic_boost_for_query
+
+    records: list[dict[str, Any]] = []
+    for score, hit_payload in hits:
+        payload = dict(hit_payload or {})
+        raw = float(score or 0.0)
+        sw = float(payload.get("source_weight") or 1.0)
+        tb = topic_boost_for_query(query, payload)
+        payload["raw_score"] = raw
+        payload["source_weight_applied"] = sw
+        payload["topic_boost_applied"] = tb
+        payload["score"] = round(raw * sw * tb, 5)
+        records.append(payload)
+
+    records.sort(key=lambda r: r["score"], reverse=True)
+    return records[:limit]
+
+
+def embed_queries(embedder, cache: QueryEmbeddingCache | None, queries: list[str]) -> list[list[float]]:
+    """Query vectors from the cache where possible; misses share one embed_batch call."""
+    if cache is None:
+        return embedder.embed_batch(queries)
+    model = embedder.model
+    vectors: list[list[float] | None] = [cache.get(model, query) for query in queries]
+    missing = [index for index, vector in enumerate(vectors) if vector is None]
+    if missing:
+        fresh = embedder.embed_batch([queries[index] for index in missing])
+        for index, vector in zip(missing, fresh):
+            cache.set(model, queries[index], vector)
+            vectors[index] = vector
+    return vectors
+
+
+def create_indexer(query_cache: QueryEmbeddingCache | None = None, embedder: OllamaEmbedder | None = None):
+    """RagIndexer, or LocalRagIndexer when RAG_VECTOR_BACKEND=local."""
+    backend = os.getenv("RAG_VECTOR_BACKEND", "qdrant").strip().lower()
+    if backend == "local":
+        from .local_index import LocalRagIndexer
+        return LocalRagIndexer(embedder=embedder, query_cache=query_cache)
+    if backend != "qdrant":
+        raise ValueError(f"Unknown RAG_VECTOR_BACKEND: {backend!r} (expected 'qdrant' or 'local')")
+    return RagIndexer(embedder=embedder, query_cache=query_cache)
+
+
 class OllamaEmbedder:
+    """
+    Ollama /api/embed client. The defaults (120 s, 3 attempts) suit batch
+    indexing; online query embedding passes a short timeout and one attempt
+    so a hung Ollama does not hold a worker thread for minutes.
+    """
+
     def __init__(
         self,
         base_url: str | None = None,
         model: str | None = None,
+        timeout: float = 120.0,
+        attempts: int = 3,
     ) -> None:
         self.base_url = (
             base_url or os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
         ).rstrip("/")
         self.model = model or os.getenv("OLLAMA_EMBED_MODEL", "embeddinggemma:latest")
+        self.timeout = timeout
+        self.attempts = max(1, attempts)
 
     def embed(self, text: str) -> list[float]:
         return self.embed_batch([text])[0]
@@ -54,12 +150,12 @@ class OllamaEmbedder:
     def embed_batch(self, texts: list[str]) -> list[list[float]]:
         cleaned = [t.replace("\x00", " ").strip()[:8000] or "empty" for t in texts]
         last_error: Exception | None = None
-        for attempt in range(1, 4):
+        for attempt in range(1, self.attempts + 1):
             try:
                 resp = requests.post(
                     f"{self.base_url}/api/embed",
                     json={"model": self.model, "input": cleaned},
-                    timeout=120,
+                    timeout=self.timeout,
                 )
                 resp.raise_for_status()
                 vecs = resp.json().get("embeddings", [])
@@ -68,9 +164,9 @@ class OllamaEmbedder:
                 return [[float(v) for v in vec] for vec in vecs]
             except Exception as exc:
                 last_error = exc
-                if attempt < 3:
+                if attempt < self.attempts:
                     time.sleep(0.8 * attempt)
-        raise RuntimeError(f"Embedding failed after retries: {last_error}") from last_error
+        raise RuntimeError(f"Embedding failed after {self.attempts} attempt(s): {last_error}") from last_error
 
     def healthcheck(self) -> bool:
         try:
@@ -85,10 +181,12 @@ class RagIndexer:
         self,
         qdrant_url: str | None = None,
         embedder: OllamaEmbedder | None = None,
+        query_cache: QueryEmbeddingCache | None = None,
     ) -> None:
         url = qdrant_url or os.getenv("QDRANT_URL", "http://localhost:6333")
         self.qdrant = QdrantClient(url=url)
         self.embedder = embedder or OllamaEmbedder()
+        self.query_cache = query_cache
 
     def ensure_collection(self) -> None:
         existing = {c.name for c in self.qdrant.get_collections().collections}
@@ -103,34 +201,7 @@ class RagIndexer:
 
     def _chunk_to_point(self, chunk: RagChunk) -> PointStruct:
         vector = self.embedder.embed(chunk.text)
-        # Deterministic integer ID from chunk_id
-        hash_val = hashlib.sha1(chunk.chunk_id.encode()).hexdigest()[:16]
-        point_id = int(hash_val, 16)
-        payload: dict[str, Any] = {
-            "chunk_id": chunk.chunk_id,
-            "document_id": chunk.document_id,
-            "source_id": chunk.source_id,
-            "title": chunk.title,
-            "section_title": chunk.section_title,
-            "url": chunk.url,
-            "source_name": chunk.source_name,
-            "source_trust_level": chunk.source_trust_level,
-            "document_type": chunk.document_type,
-            "knowledge_layer": chunk.knowledge_layer,
-            "language": chunk.language,
-            "jurisdiction": chunk.jurisdiction,
-            "topics": chunk.topics,
-            "target_groups": chunk.target_groups,
-            "publication_date": chunk.publication_date,
-            "license_or_rights": chunk.license_or_rights,
-            "text": chunk.text,
-            "char_start": chunk.char_start,
-            "char_end": chunk.char_end,
-            "chunk_index": chunk.chunk_index,
-            "total_chunks": chunk.total_chunks,
-            "source_weight": chunk.source_weight,
-        }
-        return PointStruct(id=point_id, vector=vector, payload=payload)
+        return PointStruct(id=chunk_point_id(chunk.chunk_id), vector=vector, payload=chunk_payload(chunk))
 
     def index_chunks(self, chunks: list[RagChunk], batch_size: int = 32) -> int:
         self.ensure_collection()
@@ -145,32 +216,8 @@ class RagIndexer:
             points: list[PointStruct] = []
             for chunk, vector in zip(batch, vectors):
                 try:
-                    hash_val = hashlib.sha1(chunk.chunk_id.encode()).hexdigest()[:16]
-                    point_id = int(hash_val, 16)
-                    payload: dict[str, Any] = {
-                        "chunk_id": chunk.chunk_id,
-                        "document_id": chunk.document_id,
-                        "source_id": chunk.source_id,
-                        "title": chunk.title,
-                        "section_title": chunk.section_title,
-                        "url": chunk.url,
-                        "source_name": chunk.source_name,
-                        "source_trust_level": chunk.source_trust_level,
-                        "document_type": chunk.document_type,
-                        "knowledge_layer": chunk.knowledge_layer,
-                        "language": chunk.language,
-                        "jurisdiction": chunk.jurisdiction,
-                        "topics": chunk.topics,
-                        "target_groups": chunk.target_groups,
-                        "publication_date": chunk.publication_date,
-                        "license_or_rights": chunk.license_or_rights,
-                        "text": chunk.text,
-                        "char_start": chunk.char_start,
-                        "char_end": chunk.char_end,
-                        "chunk_index": chunk.chunk_index,
-                        "total_chunks": chunk.total_chunks,
-                        "source_weight": chunk.source_weight,
-                    }
+                    point_id = chunk_point_id(chunk.chunk_id)
+                    payload = chunk_payload(chunk)
                     points.append(PointStruct(id=point_id, vector=vector, payload=payload))
                 except Exception as exc:
                     print(f"  Skip {chunk.chunk_id}: {exc}")
@@ -200,8 +247,63 @@ class RagIndexer:
         min_trust_level: str | None = None,
     ) -> list[dict[str, Any]]:
         """Semantic search over the RAG collection."""
-        query_vector = self.embedder.embed(query)
+        query_vector = self.embed_queries([query])[0]
+        query_filter = self._search_filter(knowledge_layers, topics, min_trust_level)
+
+        result = self.qdrant.query_points(
+            collection_name=COLLECTION_NAME,
+            query=query_vector,
+            query_filter=query_filter,
+            limit=limit * 4,  # over-fetch so reranking has room to reorder
+            with_payload=True,
+        )
+        return self._records_from_points(query, result.points, limit)
+
+    def search_batch(
+        self,
+        queries: list[str],
+        limit: int = 8,
+        knowledge_layers: list[str] | None = None,
+        topics: list[str] | None = None,
+        min_trust_level: str | None = None,
+    ) -> list[list[dict[str, Any]]]:
+        """search() for many queries: one embedding call and one Qdrant batch query."""
+        if not queries:
+            return []
+        query_vectors = self.embed_queries(queries)
+        query_filter = self._search_filter(knowledge_layers, topics, min_trust_level)
+
+        responses = self.qdrant.query_batch_points(
+            collection_name=COLLECTION_NAME,
+            requests=[
+                QueryRequest(
+                    query=vector,
+                    filter=query_filter,
+                    limit=limit * 4,
+                    with_payload=True,
+                )
+                for vector in query_vectors
+            ],
+        )
+        return [
+            self._records_from_points(query, response.points, limit)
+            for query, response in zip(queries, responses)
+        ]
+
+    def embed_queries(self, queries: list[str]) -> list[list[float]]:
+        return embed_queries(self.embedder, self.query_cache, queries)
 
+    def ping(self) -> bool:
+        """Raise if Qdrant does not answer."""
+        self.qdrant.get_collections()
+        return True
+
+    def _search_filter(
+        self,
+        knowledge_layers: list[str] | None,
+        topics: list[str] | None,
+        min_trust_level: str | None,
+    ) -> Filter | None:
         must: list[Any] = []
         if knowledge_layers:
             must.append(
@@ -215,31 +317,10 @@ class RagIndexer:
                     key="source_trust_level", match=MatchValue(value=min_trust_level)
                 )
             )
+        return Filter(must=must) if must else None
 
-        result = self.qdrant.query_points(
-            collection_name=COLLECTION_NAME,
-            query=query_vector,
-            query_filter=Filter(must=must) if must else None,
-            limit=limit * 4,  # over-fetch so reranking has room to reorder
-            with_payload=True,
-        )
-
-        from .sources import topic_boost_for_query
-
-        records: list[dict[str, Any]] = []
-        for point in result.points or []:
-            payload = dict(point.payload or {})
-            raw = float(point.score or 0.0)
-            sw = float(payload.get("source_weight") or 1.0)
-            tb = topic_boost_for_query(query, payload)
-            payload["raw_score"] = raw
-            payload["source_weight_applied"] = sw
-            payload["topic_boost_applied"] = tb
-            payload["score"] = round(raw * sw * tb, 5)
-            records.append(payload)
-
-        records.sort(key=lambda r: r["score"], reverse=True)
-        return records[:limit]
+    def _records_from_points(self, query: str, points, limit: int) -> list[dict[str, Any]]:
+        return records_from_hits(query, ((point.score, point.payload) for point in points or []), limit)
 
     def delete_source(self, source_id: str) -> None:
         """Remove all chunks for a given source_id from the collection."""
@@ -0,0 +1,390 @@
+"""
+In-process vector index, an alternative to Qdrant for small deployments and
+offline evaluation runs (RAG_VECTOR_BACKEND=local).
+
+Layout of RAG_LOCAL_INDEX_DIR (default data/_cache/rag_local_index):
+  vectors.f32     float32 matrix, one L2-normalized embedding per row; opened
+                  with numpy.memmap so only the pages a search touches are
+                  resident
+  payloads.jsonl  one payload per row, the same fields RagIndexer stores in Qdrant
+  meta.json       dim, row count, embed model, point ids and the byte size of
+                  both data files (written last, so a crashed write is ignored)
+  hnsw.bin        optional hnswlib graph over the rows, built on load when
+                  hnswlib is installed and the index has RAG_LOCAL_HNSW_MIN rows
+
+Similarity is cosine, as in the Qdrant collection. Searches are exact (one
+matrix product + argpartition) unless the HNSW graph exists and no filter is
+given. Filters behave like RagIndexer._search_filter: knowledge_layer in any
+of, topics overlapping any of, source_trust_level equal to.
+
+Usage:
+  RAG_VECTOR_BACKEND=local python -m crawlers.rag.cli index
+  RAG_VECTOR_BACKEND=local python -m crawlers.rag.cli search "Bürgergeld beantragen"
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from .embedding_cache import QueryEmbeddingCache
+from .index_docs import (
+    OllamaEmbedder,
+    chunk_payload,
+    chunk_point_id,
+    embed_queries,
+    records_from_hits,
+)
+from .schemas import RagChunk
+
+try:
+    import hnswlib
+except ImportError:  # optional; exact search only
+    hnswlib = None
+
+_DEFAULT_DIR = Path(__file__).resolve().parents[2] / "data" / "_cache" / "rag_local_index"
+
+VECTORS_FILE = "vectors.f32"
+PAYLOADS_FILE = "payloads.jsonl"
+META_FILE = "meta.json"
+HNSW_FILE = "hnsw.bin"
+
+
+def _normalize_rows(vectors) -> np.ndarray:
+    matrix = np.asarray(vectors, dtype=np.float32)
+    if matrix.ndim == 1:
+        matrix = matrix[None, :]
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+class LocalVectorIndex:
+    """Memory-mapped vector matrix + payload rows with filtered cosine top-k."""
+
+    def __init__(self, directory: str | os.PathLike, hnsw_min_rows: int | None = None) -> None:
+        self.directory = Path(directory)
+        self.hnsw_min_rows = (
+            hnsw_min_rows if hnsw_min_rows is not None else int(os.getenv("RAG_LOCAL_HNSW_MIN", "50000"))
+        )
+        self._lock = threading.Lock()
+        self._loaded_mtime: float | None = None
+        self.meta: dict[str, Any] = {}
+        self.vectors: np.ndarray | None = None
+        self.payloads: list[dict[str, Any]] = []
+        self.graph = None
+        self._layers = np.empty(0, dtype=str)
+        self._trust = np.empty(0, dtype=str)
+        self._topic_rows: dict[str, np.ndarray] = {}
+
+    # -- reading ------------------------------------------------------------
+
+    @property
+    def count(self) -> int:
+        self.ensure_loaded()
+        return int(self.meta.get("count", 0))
+
+    def ensure_loaded(self) -> None:
+        """(Re)load when meta.json changed on disk, e.g. after `cli index`."""
+        meta_path = self.directory / META_FILE
+        try:
+            mtime = meta_path.stat().st_mtime
+        except FileNotFoundError:
+            mtime = None
+        if self.meta and mtime == self._loaded_mtime:
+            return
+        with self._lock:
+            if not self.meta or mtime != self._loaded_mtime:
+                self._load(mtime)
+
+    def _load(self, mtime: float | None) -> None:
+        meta = self._read_meta()
+        count, dim = meta["count"], meta["dim"]
+        vectors = None
+        payloads: list[dict[str, Any]] = []
+        if count:
+            vectors = np.memmap(self.directory / VECTORS_FILE, dtype=np.float32, mode="r", shape=(count, dim))
+            with open(self.directory / PAYLOADS_FILE, "rb") as handle:
+                data = handle.read(meta["payload_bytes"])
+            payloads = [json.loads(line) for line in data.splitlines() if line]
+            if len(payloads) != count:
+                raise RuntimeError(f"{self.directory}: {len(payloads)} payloads for {count} vectors")
+
+        topic_rows: dict[str, list[int]] = {}
+        for row, payload in enumerate(payloads):
+            for topic in payload.get("topics") or []:
+                topic_rows.setdefault(topic, []).append(row)
+
+        self.meta = meta
+        self.vectors = vectors
+        self.payloads = payloads
+        self._layers = np.array([p.get("knowledge_layer") or "" for p in payloads], dtype=str)
+        self._trust = np.array([p.get("source_trust_level") or "" for p in payloads], dtype=str)
+        self._topic_rows = {topic: np.array(rows, dtype=np.int64) for topic, rows in topic_rows.items()}
+        self.graph = self._load_graph(vectors) if vectors is not None else None
+        self._loaded_mtime = mtime
+
+    def _read_meta(self) -> dict[str, Any]:
+        try:
+            return json.loads((self.directory / META_FILE).read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return {"dim": 0, "count": 0, "model": None, "ids": [], "vector_bytes": 0, "payload_bytes": 0}
+
+    def _load_graph(self, vectors: np.ndarray):
+        if hnswlib is None or len(vectors) < self.hnsw_min_rows:
+            return None
+        count, dim = vectors.shape
+        path = self.directory / HNSW_FILE
+        graph = hnswlib.Index(space="ip", dim=dim)
+        if path.exists():
+            graph.load_index(str(path), max_elements=count)
+            if graph.get_current_count() == count:
+                graph.set_ef(int(os.getenv("RAG_LOCAL_HNSW_EF", "128")))
+                return graph
+            graph = hnswlib.Index(space="ip", dim=dim)
+        print(f"[local_index] building HNSW graph over {count} rows")
+        graph.init_index(max_elements=count, ef_construction=200, M=16)
+        graph.add_items(vectors, np.arange(count))
+        graph.set_ef(int(os.getenv("RAG_LOCAL_HNSW_EF", "128")))
+        try:
+            graph.save_index(str(path))
+        except OSError as exc:
+            print(f"[local_index] could not save {path}: {exc}")
+        return graph
+
+    def _filter_rows(
+        self,
+        knowledge_layers: list[str] | None,
+        topics: list[str] | None,
+        min_trust_level: str | None,
+    ) -> np.ndarray | None:
+        """Row numbers passing the filters; None when nothing is filtered."""
+        if not (knowledge_layers or topics or min_trust_level):
+            return None
+        mask = np.ones(len(self.payloads), dtype=bool)
+        if knowledge_layers:
+            mask &= np.isin(self._layers, list(knowledge_layers))
+        if topics:
+            topic_mask = np.zeros(len(self.payloads), dtype=bool)
+            for topic in topics:
+                rows = self._topic_rows.get(topic)
+                if rows is not None:
+                    topic_mask[rows] = True
+            mask &= topic_mask
+        if min_trust_level:
+            mask &= self._trust == min_trust_level
+        return np.flatnonzero(mask)
+
+    def search(
+        self,
+        query_vectors,
+        limit: int,
+        knowledge_layers: list[str] | None = None,
+        topics: list[str] | None = None,
+        min_trust_level: str | None = None,
+    ) -> list[list[tuple[float, dict[str, Any]]]]:
+        """Top-`limit` (cosine, payload) hits per query vector, best first."""
+        self.ensure_loaded()
+        queries = _normalize_rows(query_vectors)
+        if self.vectors is None or limit <= 0:
+            return [[] for _ in range(len(queries))]
+        if queries.shape[1] != self.vectors.shape[1]:
+            raise ValueError(
+                f"query dim {queries.shape[1]} != index dim {self.vectors.shape[1]}"
+                f" (index built with {self.meta.get('model')})"
+            )
+
+        rows = self._filter_rows(knowledge_layers, topics, min_trust_level)
+        if rows is None and self.graph is not None:
+            k = min(limit, len(self.payloads))
+            labels, distances = self.graph.knn_query(queries, k=k)
+            return [
+                [(float(1.0 - distance), self.payloads[int(label)]) for label, distance in zip(row_labels, row_distances)]
+                for row_labels, row_distances in zip(labels, distances)
+            ]
+
+        matrix = self.vectors if rows is None else self.vectors[rows]
+        if len(matrix) == 0:
+            return [[] for _ in range(len(queries))]
+        scores = queries @ matrix.T
+        k = min(limit, scores.shape[1])
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        results = []
+        for query_scores, candidates in zip(scores, top):
+            ordered = candidates[np.argsort(-query_scores[candidates], kind="stable")]
+            row_ids = ordered if rows is None else rows[ordered]
+            results.append(
+                [(float(query_scores[pos]), self.payloads[int(row)]) for pos, row in zip(ordered, row_ids)]
+            )
+        return results
+
+    # -- writing ------------------------------------------------------------
+
+    def upsert(self, ids: list[int], vectors, payloads: list[dict[str, Any]], model: str | None = None) -> None:
+        """Add or replace rows. New ids are appended in place; replacements rewrite the files."""
+        if not ids:
+            return
+        matrix = _normalize_rows(vectors)
+        with self._lock:
+            meta = self._read_meta()
+            if meta["count"] and meta["dim"] != matrix.shape[1]:
+                raise ValueError(f"vector dim {matrix.shape[1]} != index dim {meta['dim']}")
+            self.directory.mkdir(parents=True, exist_ok=True)
+            existing = set(meta["ids"])
+            if existing.isdisjoint(ids) and len(set(ids)) == len(ids):
+                self._append(meta, ids, matrix, payloads, model)
+            else:
+                rows = self._read_rows(meta)
+                for point_id, vector, payload in zip(ids, matrix, payloads):
+                    rows[point_id] = (vector, payload)
+                self._rewrite(rows, matrix.shape[1], model or meta.get("model"))
+
+    def delete(self, key: str, value: Any) -> int:
+        """Remove rows whose payload[key] == value; returns the number removed."""
+        with self._lock:
+            meta = self._read_meta()
+            rows = self._read_rows(meta)
+            kept = {point_id: row for point_id, row in rows.items() if row[1].get(key) != value}
+            removed = len(rows) - len(kept)
+            if removed:
+                self._rewrite(kept, meta["dim"], meta.get("model"))
+            return removed
+
+    def _read_rows(self, meta: dict[str, Any]) -> dict[int, tuple[np.ndarray, dict[str, Any]]]:
+        if not meta["count"]:
+            return {}
+        vectors = np.fromfile(self.directory / VECTORS_FILE, dtype=np.float32, count=meta["count"] * meta["dim"])
+        vectors = vectors.reshape(meta["count"], meta["dim"])
+        with open(self.directory / PAYLOADS_FILE, "rb") as handle:
+            lines = [line for line in handle.read(meta["payload_bytes"]).splitlines() if line]
+        return {
+            point_id: (vector, json.loads(line))
+            for point_id, vector, line in zip(meta["ids"], vectors, lines)
+        }
+
+    def _append(self, meta, ids, matrix: np.ndarray, payloads, model) -> None:
+        vector_path, payload_path = self.directory / VECTORS_FILE, self.directory / PAYLOADS_FILE
+        encoded = b"".join(json.dumps(p, ensure_ascii=False).encode("utf-8") + b"\n" for p in payloads)
+        # Drop bytes a crashed earlier write left past the committed size.
+        for path, size in ((vector_path, meta["vector_bytes"]), (payload_path, meta["payload_bytes"])):
+            with open(path, "ab") as handle:
+                handle.truncate(size)
+        with open(vector_path, "ab") as handle:
+            handle.write(matrix.tobytes())
+        with open(payload_path, "ab") as handle:
+            handle.write(encoded)
+        self._write_meta({
+            "dim": int(matrix.shape[1]),
+            "count": meta["count"] + len(ids),
+            "model": model or meta.get("model"),
+            "ids": list(meta["ids"]) + list(ids),
+            "vector_bytes": meta["vector_bytes"] + matrix.nbytes,
+            "payload_bytes": meta["payload_bytes"] + len(encoded),
+        })
+
+    def _rewrite(self, rows: dict[int, tuple[np.ndarray, dict[str, Any]]], dim: int, model) -> None:
+        ids = list(rows)
+        matrix = np.array([rows[i][0] for i in ids], dtype=np.float32).reshape(len(ids), dim)
+        encoded = b"".join(json.dumps(rows[i][1], ensure_ascii=False).encode("utf-8") + b"\n" for i in ids)
+        # Readers keep their memmap of the old inode until meta.json moves.
+        for name, data in ((VECTORS_FILE, matrix.tobytes()), (PAYLOADS_FILE, encoded)):
+            tmp = self.directory / f"{name}.tmp"
+            tmp.write_bytes(data)
+            os.replace(tmp, self.directory / name)
+        self._write_meta({
+            "dim": dim,
+            "count": len(ids),
+            "model": model,
+            "ids": ids,
+            "vector_bytes": matrix.nbytes,
+            "payload_bytes": len(encoded),
+        })
+
+    def _write_meta(self, meta: dict[str, Any]) -> None:
+        (self.directory / HNSW_FILE).unlink(missing_ok=True)
+        tmp = self.directory / f"{META_FILE}.tmp"
+        tmp.write_text(json.dumps(meta), encoding="utf-8")
+        os.replace(tmp, self.directory / META_FILE)
+
+
+class LocalRagIndexer:
+    """RagIndexer interface (index_chunks, search, search_batch, delete_source) over LocalVectorIndex."""
+
+    def __init__(
+        self,
+        directory: str | os.PathLike | None = None,
+        embedder: OllamaEmbedder | None = None,
+        query_cache: QueryEmbeddingCache | None = None,
+    ) -> None:
+        self.index = LocalVectorIndex(directory or os.getenv("RAG_LOCAL_INDEX_DIR") or _DEFAULT_DIR)
+        self.embedder = embedder or OllamaEmbedder()
+        self.query_cache = query_cache
+
+    def ensure_collection(self) -> None:
+        self.index.directory.mkdir(parents=True, exist_ok=True)
+
+    def ping(self) -> bool:
+        """Raise if the index files cannot be read."""
+        self.index.ensure_loaded()
+        return True
+
+    def index_chunks(self, chunks: list[RagChunk], batch_size: int = 32) -> int:
+        ids: list[int] = []
+        vectors: list[list[float]] = []
+        payloads: list[dict[str, Any]] = []
+        for i in range(0, len(chunks), batch_size):
+            batch = chunks[i : i + batch_size]
+            try:
+                batch_vectors = self.embedder.embed_batch([c.text for c in batch])
+            except Exception as exc:
+                print(f"  Embed batch failed: {exc}")
+                continue
+            for chunk, vector in zip(batch, batch_vectors):
+                ids.append(chunk_point_id(chunk.chunk_id))
+                vectors.append(vector)
+                payloads.append(chunk_payload(chunk))
+        self.index.upsert(ids, vectors, payloads, model=self.embedder.model)
+        return len(ids)
+
+    def search(
+        self,
+        query: str,
+        limit: int = 8,
+        knowledge_layers: list[str] | None = None,
+        topics: list[str] | None = None,
+        min_trust_level: str | None = None,
+    ) -> list[dict[str, Any]]:
+        """Semantic search over the local index."""
+        return self.search_batch([query], limit, knowledge_layers, topics, min_trust_level)[0]
+
+    def search_batch(
+        self,
+        queries: list[str],
+        limit: int = 8,
+        knowledge_layers: list[str] | None = None,
+        topics: list[str] | None = None,
+        min_trust_level: str | None = None,
+    ) -> list[list[dict[str, Any]]]:
+        """search() for many queries: one embedding call and one matrix product."""
+        if not queries:
+            return []
+        hit_lists = self.index.search(
+            self.embed_queries(queries),
+            limit * 4,  # over-fetch so reranking has room to reorder
+            knowledge_layers,
+            topics,
+            min_trust_level,
+        )
+        return [records_from_hits(query, hits, limit) for query, hits in zip(queries, hit_lists)]
+
+    def embed_queries(self, queries: list[str]) -> list[list[float]]:
+        return embed_queries(self.embedder, self.query_cache, queries)
+
+    def delete_source(self, source_id: str) -> None:
+        """Remove all chunks for a given source_id from the index."""
+        self.index.delete("source_id", source_id)
@@ -29,6 +29,7 @@ Integrates with existing schema files in data/_schemas/
 """
 
 from encodings import undefined
+import hashlib
 import json
 import os
 from pathlib import Path
@@ -38,6 +39,17 @@ import jsonschema
 from jsonschema import Draft7Validator, RefResolver
 
 
+def schema_fingerprint(schema: Dict[str, Any]) -> str:
+    """
+    Stable sha256 of a schema document, independent of key order and whitespace.
+
+    Stored next to each imported entry so readers can tell whether the
+    entry's schema_valid flag was computed against the schema they use.
+    """
+    canonical = json.dumps(schema, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
 class SchemaValidator:
     """
     Validates entries against core and extension schemas
@@ -72,6 +84,8 @@ class SchemaValidator:
         self.schemas_dir = Path(schemas_dir)
         self.core_schema = self._load_schema('core.schema.json')
         self.extension_schemas = self._load_extension_schemas()
+        self.core_schema_fingerprint = schema_fingerprint(self.core_schema)
+        self._core_validator = Draft7Validator(self.core_schema)
         self._allowed_core_fields = set(self.core_schema.get('properties', {}).keys())
         self._allowed_extension_fields = {
             domain: set(schema.get('properties', {}).keys())
@@ -110,6 +124,10 @@ class SchemaValidator:
         
         return schemas
     
+    def is_core_valid(self, entry: Dict[str, Any]) -> bool:
+        """Check an entry against the core schema only, with the compiled validator"""
+        return self._core_validator.is_valid(entry)
+
     def validate_entry(self, entry: Dict[str, Any], domain: str) -> Dict[str, Any]:
         """
         Validate an entry against core and domain-specific schemas
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Prompt size and Ollama prefill time of the synthesis prompt with
+token-budgeted evidence packing (backend/ai_service/evidence_packing.py)
+versus the previous fixed block (first 5 items with confidence >= 0.5,
+excerpts cut at 320 characters).
+
+Evidence per query of tests/fixtures/life_event_*_queries.json is taken from
+data/*/entries.json by word overlap with the query, so no Postgres is
+needed; --live retrieves it the way /synthesize does instead. Token counts
+are the packer's estimates. With --ollama every prompt is also sent to the
+local model with num_predict=1 and Ollama's prompt_eval_count /
+prompt_eval_duration are reported. The two variants alternate per query so
+neither benefits from Ollama reusing the other's prompt prefix.
+
+Usage:
+    python scripts/bench_evidence_packing.py
+    python scripts/bench_evidence_packing.py --ollama --model qwen2.5:3b
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from backend.ai_service import endpoints  # noqa: E402
+from backend.ai_service.evidence_packing import _parts, _word_set, estimate_tokens  # noqa: E402
+from backend.ai_service.provider import AIProviderError, OllamaProvider  # noqa: E402
+from backend.ai_service.schemas import Evidence  # noqa: E402
+
+FIXTURES = [
+    ROOT / "tests" / "fixtures" / "life_event_suggested_queries.json",
+    ROOT / "tests" / "fixtures" / "life_event_gold_queries.json",
+]
+
+
+def _load_queries() -> list[str]:
+    queries = []
+    for path in FIXTURES:
+        queries.extend(item["query"] for item in json.loads(path.read_text(encoding="utf-8"))["queries"])
+    return queries
+
+
+def _load_entries() -> list[tuple[dict, set[str]]]:
+    entries = []
+    for path in sorted((ROOT / "data").glob("*/entries.json")):
+        payload = json.loads(path.read_text(encoding="utf-8"))
+        for entry in payload["entries"] if isinstance(payload, dict) else payload:
+            header, text = _parts(entry)
+            entries.append((entry, _word_set(f"{header[0]} {text}")))
+    return entries
+
+
+def _offline_evidence(query: str, entries, top_k: int) -> list[Evidence]:
+    words = _word_set(query)
+    scored = sorted(((len(words & tokens), index) for index, (_, tokens) in enumerate(entries)), reverse=True)
+    hits = [(score, index) for score, index in scored[:top_k] if score]
+    if not hits:
+        return []
+    best = hits[0][0]
+    return [
+        Evidence(source="db", payload=entries[index][0], confidence=round(0.5 + 0.45 * score / best, 3))
+        for score, index in hits
+    ]
+
+
+def legacy_block(evidence) -> str:
+    """The evidence block as endpoints rendered it before token budgeting."""
+    rows = []
+    for index, ev in enumerate([item for item in evidence if item.confidence >= 0.5][:5], start=1):
+        header, text = _parts(ev.payload or {})
+        lines = [f"[{index}] {header[0]}", *header[1:]]
+        if text[:320]:
+            lines.append(f"Text: {text[:320]}")
+        rows.append("\n".join(lines))
+    return "\n\n".join(rows)
+
+
+def _legacy_prompt(query, evidence) -> str:
+    packed_prompt, packed = endpoints._synthesis_prompt(query, evidence)
+    return packed_prompt.replace(packed.text, legacy_block(evidence), 1)
+
+
+def _prefill(ollama: OllamaProvider, model: str, user_prompt: str) -> tuple[int, float] | None:
+    payload = ollama._chat_payload(model, endpoints.SYNTHESIZE_SYSTEM_PROMPT, user_prompt, 0.0, 1)
+    try:
+        response = ollama._post(ollama.chat_path, payload)
+    except AIProviderError as exc:
+        print(f"ollama: {exc}")
+        return None
+    return int(response.get("prompt_eval_count") or 0), int(response.get("prompt_eval_duration") or 0) / 1e6
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--top-k", type=int, default=8, help="evidence items per query")
+    parser.add_argument("--live", action="store_true", help="retrieve evidence through endpoints (needs Postgres)")
+    parser.add_argument("--ollama", action="store_true", help="measure prefill on the local Ollama model")
+    parser.add_argument("--model", default=None, help="Ollama model, default: the synthesize route")
+    args = parser.parse_args()
+
+    queries = _load_queries()
+    entries = None if args.live else _load_entries()
+    model = args.model or endpoints.model_router.route("synthesize", explicit_escalation=False)
+    ollama = OllamaProvider() if args.ollama else None
+
+    rows = {"before": [], "packed": []}
+    prefill = {"before": [], "packed": []}
+    for turn, query in enumerate(queries):
+        if args.live:
+            evidence, _ = asyncio.run(endpoints._coalesced_evidence(query))
+        else:
+            evidence = _offline_evidence(query, entries, args.top_k)
+        prompts = {"before": _legacy_prompt(query, evidence), "packed": endpoints._synthesis_prompt(query, evidence)[0]}
+        for name, prompt in prompts.items():
+            rows[name].append(estimate_tokens(endpoints.SYNTHESIZE_SYSTEM_PROMPT) + estimate_tokens(prompt))
+        for name in (("before", "packed") if turn % 2 else ("packed", "before")):
+            if ollama is not None and (measured := _prefill(ollama, model, prompts[name])) is not None:
+                prefill[name].append(measured)
+
+    print(f"{len(queries)} queries, evidence: {'live retrieval' if args.live else f'offline top {args.top_k}'}")
+    for name, tokens in rows.items():
+        print(
+            f"{name:7s} estimated prompt tokens  mean {statistics.mean(tokens):6.1f}  "
+            f"max {max(tokens):5d}  stdev {statistics.pstdev(tokens):6.1f}"
+        )
+    if ollama is None:
+        return 0
+    if not prefill["before"] or not prefill["packed"]:
+        print("no prefill measurements (Ollama unreachable?)")
+        return 1
+    for name, measured in prefill.items():
+        print(
+            f"{name:7s} {model}: prompt_eval_count mean {statistics.mean(c for c, _ in measured):6.1f}  "
+            f"prefill mean {statistics.mean(ms for _, ms in measured):7.1f} ms"
+        )
+    saved = statistics.mean(ms for _, ms in prefill["before"]) - statistics.mean(ms for _, ms in prefill["packed"])
+    print(f"prefill saved per request: {saved:.1f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
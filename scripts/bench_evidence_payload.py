@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Benchmark: per-request evidence handling in /synthesize with structured
+payloads (Evidence(payload=...)) versus the previous JSON-string evidence.
+
+The "string" path reproduces what a /synthesize request did before: every
+entry json.dumps'd at retrieval, the strings json.loads'd again by
+_evidence_cards (twice, through two _extractive_answer calls) and
+the evidence block, and fingerprint_evidence hashing model_dump copies.
+The "payload" path runs the current endpoints helpers. Both end with the
+cache dump and the JSON response body. Entries come from data/*/entries.json.
+
+Usage:
+    python scripts/bench_evidence_payload.py --items 8 --rounds 2000
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from backend.ai_service import endpoints  # noqa: E402
+from backend.ai_service.cache import fingerprint_evidence  # noqa: E402
+from backend.ai_service.evidence_packing import pack_evidence  # noqa: E402
+from backend.ai_service.schemas import AnswerResponse, Evidence  # noqa: E402
+
+
+def _load_entries(limit: int) -> list[dict]:
+    entries = []
+    for path in sorted((ROOT / "data").glob("*/entries.json")):
+        payload = json.loads(path.read_text(encoding="utf-8"))
+        entries.extend(payload["entries"] if isinstance(payload, dict) else payload)
+    return entries[:limit]
+
+
+def _string_fingerprint(evidence: list[Evidence]) -> str:
+    compact = []
+    for item in evidence:
+        entry = item.model_dump()
+        compact.append(
+            {
+                "source": entry.get("source"),
+                "confidence": entry.get("confidence"),
+                "content_hash": hashlib.sha256(str(entry.get("content", "")).encode("utf-8")).hexdigest(),
+            }
+        )
+    return hashlib.sha256(json.dumps(compact, sort_keys=True, ensure_ascii=True).encode("utf-8")).hexdigest()
+
+
+def _response(evidence, extractive) -> AnswerResponse:
+    answer, sources, variants = extractive
+    return AnswerResponse(
+        answer=answer, explanation="", sources=sources, provider="ollama", model="m",
+        latency_ms=0, evidence=evidence, plain_language=variants,
+    )
+
+
+def string_request(entries: list[dict]) -> str:
+    evidence = [Evidence(source="db", content=json.dumps(entry), confidence=0.95) for entry in entries]
+    for _ in range(2):  # the second _evidence_cards and the evidence block
+        for item in evidence:
+            json.loads(item.content)
+    # Fresh objects parse their content again inside _extractive_answer.
+    fresh = [Evidence(source=item.source, content=item.content, confidence=item.confidence) for item in evidence]
+    extractive = endpoints._extractive_answer(fresh)
+    pack_evidence(fresh)
+    _string_fingerprint(evidence)
+    response = _response(evidence, extractive)
+    response.model_dump()
+    return response.model_dump_json()
+
+
+def payload_request(entries: list[dict]) -> str:
+    evidence = [Evidence(source="db", payload=entry, confidence=0.95) for entry in entries]
+    _, extractive = endpoints._evidence_state(evidence)
+    pack_evidence(evidence)
+    fingerprint_evidence(evidence)
+    response = _response(evidence, extractive)
+    response.model_dump()
+    return response.model_dump_json()
+
+
+def _measure(fn, entries, rounds):
+    fn(entries)
+    start = time.perf_counter()
+    for _ in range(rounds):
+        fn(entries)
+    elapsed_ms = (time.perf_counter() - start) / rounds * 1000
+    tracemalloc.start()
+    fn(entries)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed_ms, peak
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=8, help="evidence items per request")
+    parser.add_argument("--rounds", type=int, default=2000)
+    args = parser.parse_args()
+
+    entries = _load_entries(args.items)
+    print(f"{len(entries)} evidence items/request, {args.rounds} rounds")
+    for name, fn in (("string evidence", string_request), ("payload evidence", payload_request)):
+        elapsed_ms, peak = _measure(fn, entries, args.rounds)
+        print(f"{name:17s} {elapsed_ms:7.3f} ms/request  peak traced memory {peak / 1024:7.1f} KiB")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
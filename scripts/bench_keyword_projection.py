@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Benchmark: single-phase keyword fetch (all columns for every candidate)
+versus the two-phase projected fetch + top-k hydration in query_entries.
+
+Needs DATABASE_URL pointing at an entries table with the ingest columns
+(20261017_add_schema_validity.sql, 20261018_add_rerank_features.sql) populated
+by `crawlers/cli.py import --to-db`.
+
+Usage:
+    DATABASE_URL=postgresql://... python scripts/bench_keyword_projection.py --rounds 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from sqlalchemy import text  # noqa: E402
+
+from backend.ai_service import retrieval  # noqa: E402
+from backend.ai_service.db import SessionLocal  # noqa: E402
+
+
+QUERIES = [
+    "Ich habe meinen Job verloren, was nun?",
+    "Wie beantrage ich Bürgergeld?",
+    "Kinderzuschlag fuer Familien beantragen",
+    "Wohngeld beantragen",
+    "Jobcenter Kontakt Telefon",
+    "Schulden Beratung",
+]
+
+
+def single_phase(session, query):
+    terms = retrieval._query_terms(query)
+    builder = retrieval._build_fulltext_query if retrieval.KEYWORD_SEARCH_MODE == "fulltext" else retrieval._build_ilike_query
+    sql, params = builder(terms, None, ingest_columns=False)
+    rows = session.execute(text(sql), params).mappings().all()
+    return retrieval._rank_keyword_rows(rows, query, terms), retrieval._row_bytes(rows)
+
+
+def two_phase(session, query):
+    terms = retrieval._query_terms(query)
+    rows, projected = retrieval._fetch_keyword_rows(session, terms)
+    ranked = retrieval._rank_keyword_rows(rows, query, terms)
+    moved = retrieval._row_bytes(rows)
+    if projected and ranked:
+        hydrate = session.execute(
+            text(retrieval.HYDRATE_SQL), {"ids": [entry["id"] for entry in ranked]}
+        ).mappings().all()
+        moved += retrieval._row_bytes(hydrate)
+        ranked = retrieval._hydrate_ranked(ranked, hydrate)
+    return ranked, moved
+
+
+def run(fn, rounds):
+    session = SessionLocal()
+    try:
+        fn(session, QUERIES[0])  # warm connection and plans
+        moved = 0
+        results = []
+        start = time.perf_counter()
+        for _ in range(rounds):
+            results = []
+            for query in QUERIES:
+                ranked, size = fn(session, query)
+                results.append([entry["id"] for entry in ranked])
+                moved += size
+        elapsed = time.perf_counter() - start
+    finally:
+        session.close()
+    calls = rounds * len(QUERIES)
+    return elapsed / calls * 1000, moved / calls, results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark projected keyword fetch + hydration")
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    full_ms, full_bytes, full_ids = run(single_phase, args.rounds)
+    proj_ms, proj_bytes, proj_ids = run(two_phase, args.rounds)
+
+    print(f"{len(QUERIES)} queries x {args.rounds} rounds, keyword mode {retrieval.KEYWORD_SEARCH_MODE}")
+    print(f"  single-phase (all columns)   {full_ms:8.2f} ms/query  {full_bytes:10.0f} bytes/query")
+    print(f"  two-phase (project+hydrate)  {proj_ms:8.2f} ms/query  {proj_bytes:10.0f} bytes/query")
+    print(f"  same top-k ids: {full_ids == proj_ids}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Qdrant versus the in-process local vector index
+(crawlers/rag/local_index.py) for the vector leg of hybrid retrieval.
+
+Both stores are searched with the same precomputed query vectors, so Ollama
+is only called once per query and the timings cover the store alone. Pass
+--synthetic N to benchmark the local index on N random rows when no Qdrant
+or Ollama is available; otherwise the local index is filled from the Qdrant
+collection first (scroll, no re-embedding).
+
+Usage:
+    python scripts/bench_local_vector_index.py --rounds 20
+    python scripts/bench_local_vector_index.py --synthetic 200000 --dim 768 --hnsw-min 100000
+"""
+
+from __future__ import annotations
+
+import argparse
+import resource
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+import numpy as np  # noqa: E402
+
+from crawlers.rag.index_docs import COLLECTION_NAME  # noqa: E402
+from crawlers.rag.local_index import LocalVectorIndex  # noqa: E402
+
+
+QUERIES = [
+    "Ich habe meinen Job verloren, was nun?",
+    "Wie beantrage ich Bürgergeld?",
+    "Kinderzuschlag fuer Familien beantragen",
+    "Wohngeld beantragen",
+    "Jobcenter Kontakt Telefon",
+    "Schulden Beratung",
+]
+
+FILTERS = {
+    "no filter": {},
+    "knowledge_layer": {"knowledge_layers": ["official_guidance"]},
+    "topics": {"topics": ["arbeit", "familie"]},
+}
+
+
+def _rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _time_ms(fn, rounds: int) -> float:
+    fn()  # warm-up: page in the memmap, build filter masks
+    start = time.perf_counter()
+    for _ in range(rounds):
+        fn()
+    return (time.perf_counter() - start) / rounds * 1000
+
+
+def fill_from_qdrant(index: LocalVectorIndex, indexer, batch: int = 512) -> int:
+    offset, total = None, 0
+    while True:
+        points, offset = indexer.qdrant.scroll(
+            collection_name=COLLECTION_NAME,
+            limit=batch,
+            offset=offset,
+            with_payload=True,
+            with_vectors=True,
+        )
+        if points:
+            index.upsert([p.id for p in points], [p.vector for p in points], [p.payload for p in points])
+            total += len(points)
+        if offset is None:
+            return total
+
+
+def fill_synthetic(index: LocalVectorIndex, rows: int, dim: int, batch: int = 10000) -> None:
+    rng = np.random.default_rng(7)
+    layers = ["law", "official_guidance", "ngo_guidance"]
+    topics = ["arbeit", "familie", "wohnen", "gesundheit"]
+    for start in range(0, rows, batch):
+        count = min(batch, rows - start)
+        index.upsert(
+            list(range(start, start + count)),
+            rng.standard_normal((count, dim), dtype=np.float32),
+            [
+                {
+                    "chunk_id": f"c{start + i}",
+                    "knowledge_layer": layers[(start + i) % len(layers)],
+                    "topics": [topics[(start + i) % len(topics)]],
+                    "source_trust_level": "tier_2_official",
+                }
+                for i in range(count)
+            ],
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark Qdrant vs. local vector index")
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--limit", type=int, default=32, help="Hits per query (search() over-fetches limit*4)")
+    parser.add_argument("--synthetic", type=int, metavar="ROWS", help="Skip Qdrant; random vectors")
+    parser.add_argument("--dim", type=int, default=768)
+    parser.add_argument("--hnsw-min", type=int, default=None, help="Override RAG_LOCAL_HNSW_MIN")
+    args = parser.parse_args()
+
+    indexer = None
+    with tempfile.TemporaryDirectory() as directory:
+        index = LocalVectorIndex(directory, hnsw_min_rows=args.hnsw_min)
+        if args.synthetic:
+            fill_synthetic(index, args.synthetic, args.dim)
+            vectors = np.random.default_rng(11).standard_normal((len(QUERIES), args.dim), dtype=np.float32)
+        else:
+            from crawlers.rag.index_docs import RagIndexer
+
+            indexer = RagIndexer()
+            print(f"copied {fill_from_qdrant(index, indexer)} points from Qdrant")
+            vectors = np.asarray(indexer.embed_queries(QUERIES), dtype=np.float32)
+
+        rss_before = _rss_mb()
+        load_start = time.perf_counter()
+        index.ensure_loaded()
+        load_ms = (time.perf_counter() - load_start) * 1000
+        print(
+            f"local index: {index.count} rows, load {load_ms:.0f} ms,"
+            f" graph={'hnsw' if index.graph is not None else 'none'},"
+            f" peak RSS +{_rss_mb() - rss_before:.0f} MB (vectors are memory-mapped)"
+        )
+
+        results: dict[str, float] = {}
+        for label, filters in FILTERS.items():
+            results[f"local batch ({label})"] = _time_ms(
+                lambda: index.search(vectors, args.limit * 4, **filters), args.rounds
+            ) / len(QUERIES)
+            results[f"local single ({label})"] = _time_ms(
+                lambda: [index.search(v, args.limit * 4, **filters) for v in vectors], args.rounds
+            ) / len(QUERIES)
+            if indexer is not None:
+                query_filter = indexer._search_filter(
+                    filters.get("knowledge_layers"), filters.get("topics"), None
+                )
+                results[f"qdrant single ({label})"] = _time_ms(
+                    lambda: [
+                        indexer.qdrant.query_points(
+                            collection_name=COLLECTION_NAME,
+                            query=v.tolist(),
+                            query_filter=query_filter,
+                            limit=args.limit * 4,
+                            with_payload=True,
+                        )
+                        for v in vectors
+                    ],
+                    args.rounds,
+                ) / len(QUERIES)
+
+    print(f"{len(QUERIES)} queries x {args.rounds} rounds, top-{args.limit * 4}")
+    for label, millis in results.items():
+        print(f"  {label:<36} {millis:8.3f} ms/query")
+
+
+if __name__ == "__main__":
+    main()
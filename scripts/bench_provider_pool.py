@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Benchmark: connection setup cost of completion requests. Compares the sync
+urllib path (OllamaProvider.generate_text, new connection per call), the
+async client with keep-alive disabled, and the pooled async client
+(agenerate_text). The last two differ only in connection reuse.
+
+By default all paths hit a local Ollama-shaped stub that answers instantly,
+so the differences are client and connection overhead alone. Pass --base-url and --model to
+measure against a real Ollama; for OpenAI-style TLS endpoints the saving per
+call is the TCP plus TLS handshake and is usually much larger than on
+localhost.
+
+Usage:
+    python scripts/bench_provider_pool.py --calls 200
+    python scripts/bench_provider_pool.py --base-url http://127.0.0.1:11434 --model qwen2.5:3b --calls 20
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from backend.ai_service.provider import OllamaProvider  # noqa: E402
+
+
+class _Stub(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers["Content-Length"]))
+        body = json.dumps({"message": {"content": "ok"}, "prompt_eval_count": 1, "eval_count": 1}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--base-url", default=None, help="Ollama to benchmark instead of the local stub")
+    parser.add_argument("--model", default="qwen2.5:3b")
+    args = parser.parse_args()
+
+    server = None
+    base_url = args.base_url
+    if base_url is None:
+        server = ThreadingHTTPServer(("127.0.0.1", 0), _Stub)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    os.environ["OLLAMA_BASE_URL"] = base_url
+    provider = OllamaProvider()
+    request = {"model": args.model, "system_prompt": "Antworte kurz.", "user_prompt": "Was ist Wohngeld?", "max_tokens": 8}
+
+    provider.generate_text(**request)  # warm-up (model load on a real Ollama)
+    start = time.perf_counter()
+    for _ in range(args.calls):
+        provider.generate_text(**request)
+    sync_ms = (time.perf_counter() - start) / args.calls * 1000
+
+    async def timed(target: OllamaProvider, keepalive: bool) -> float:
+        if not keepalive:
+            import httpx
+
+            target._client = httpx.AsyncClient(limits=httpx.Limits(max_keepalive_connections=0))
+            target._client_loop = asyncio.get_running_loop()
+        await target.agenerate_text(**request)
+        start = time.perf_counter()
+        for _ in range(args.calls):
+            await target.agenerate_text(**request)
+        elapsed = (time.perf_counter() - start) / args.calls * 1000
+        await target.aclose()
+        return elapsed
+
+    unpooled = OllamaProvider()
+    unpooled_ms = asyncio.run(timed(unpooled, keepalive=False))
+    pooled_ms = asyncio.run(timed(provider, keepalive=True))
+    stats = provider.pool_stats()
+    unpooled_stats = unpooled.pool_stats()
+    if server is not None:
+        server.shutdown()
+
+    print(f"target: {base_url}  calls: {args.calls}")
+    print(f"urllib, new connection per call:  {sync_ms:8.3f} ms/call")
+    print(f"async client, no keep-alive:      {unpooled_ms:8.3f} ms/call")
+    print(f"async client, pooled keep-alive:  {pooled_ms:8.3f} ms/call")
+    print(f"connection setup saved per call:  {unpooled_ms - pooled_ms:8.3f} ms")
+    print(
+        f"no keep-alive: {unpooled_stats['connectionsOpened']} connections, avg connect {unpooled_stats['avgConnectMs']} ms; "
+        f"pooled: {stats['connectionsOpened']} connection(s) for {stats['requests']} requests"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
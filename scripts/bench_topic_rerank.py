@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark: rerank cost per candidate with the per-entry topic registry
+scan (legacy) versus the precompiled TopicMatcher.
+
+Usage:
+    python scripts/bench_topic_rerank.py
+    python scripts/bench_topic_rerank.py --candidates 24 --rounds 200
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from unittest.mock import patch
+from urllib.parse import urlparse
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from backend.ai_service import retrieval  # noqa: E402
+from backend.ai_service.rerank_features import compute_rerank_features  # noqa: E402
+
+
+QUERIES = [
+    "Ich habe meinen Job verloren, was nun?",
+    "Wie beantrage ich Bürgergeld?",
+    "Was bedeutet Bedarfsgemeinschaft?",
+    "Kinderzuschlag fuer Familien beantragen",
+    "Wohngeld in leichter Sprache",
+    "Jobcenter Kontakt Telefon",
+]
+
+LEGACY_ROLE_WEIGHTS = {
+    "official_rule_source": 4.0,
+    "official_glossary_source": 3.5,
+    "official_contact_source": 3.0,
+    "official_light_language_source": 2.5,
+    "official_background_source": 1.5,
+    "ngo_context_source": 1.5,
+    "journalism_source": 1.0,
+}
+
+
+def legacy_detect_topic_profiles(query, terms):
+    normalized = (query or "").lower()
+    token_set = set(terms)
+    matched = []
+    for topic in retrieval._load_topic_registry():
+        if not isinstance(topic, dict):
+            continue
+        keywords = {str(keyword).lower() for keyword in topic.get("keywords", []) if isinstance(keyword, str)}
+        if not keywords:
+            continue
+        if any(keyword in normalized for keyword in keywords) or token_set.intersection(keywords):
+            matched.append(topic)
+    return matched
+
+
+def legacy_extract_host(value):
+    if not isinstance(value, str) or not value.strip():
+        return ""
+    host = (urlparse(value).netloc or "").lower()
+    return host[4:] if host.startswith("www.") else host
+
+
+def legacy_topic_role_boost(entry, query, terms, intents, context=None):
+    """The pre-TopicMatcher implementation, kept here as the benchmark baseline."""
+    profiles = legacy_detect_topic_profiles(query, terms)
+    if not profiles:
+        return 0.0
+    url = str(entry.get("url") or "")
+    provenance = entry.get("provenance") or {}
+    source_url = provenance.get("source") if isinstance(provenance, dict) else ""
+    host = legacy_extract_host(url) or legacy_extract_host(source_url)
+    lowered_url = f"{url} {source_url}".lower()
+    source_hosts = retrieval._load_registered_source_hosts()
+    boost = 0.0
+    for topic in profiles:
+        for source in topic.get("sources", []):
+            if not isinstance(source, dict):
+                continue
+            expected_host = source_hosts.get(str(source.get("sourceId") or "").strip())
+            if not expected_host or not host:
+                continue
+            if host != expected_host and not host.endswith(f".{expected_host}"):
+                continue
+            role = str(source.get("role") or "discovered")
+            boost += LEGACY_ROLE_WEIGHTS.get(role, 0.5)
+            for pattern in source.get("preferredPathPatterns", []):
+                if isinstance(pattern, str) and pattern.lower() in lowered_url:
+                    boost += 1.2
+            if role == "official_contact_source" and "contact" in intents:
+                boost += 2.0
+            if role == "official_rule_source" and "application" in intents:
+                boost += 1.8
+            if role == "official_glossary_source" and any(
+                token in terms for token in {"bedarfsgemeinschaft", "aufstocker", "regelbedarf", "mehrbedarf"}
+            ):
+                boost += 1.5
+            if role == "official_light_language_source" and any(
+                token in query.lower() for token in {"leicht", "leichte sprache", "einfach"}
+            ):
+                boost += 2.0
+    return boost
+
+
+def _text(value, lang="de"):
+    if isinstance(value, dict):
+        return value.get(lang) or value.get("en") or ""
+    return value or ""
+
+
+def load_candidates(limit: int) -> list[dict]:
+    candidates = []
+    for domain in ("benefits", "aid", "tools", "contacts", "organizations"):
+        path = ROOT / "data" / domain / "entries.json"
+        if not path.exists():
+            continue
+        payload = json.loads(path.read_text(encoding="utf-8"))
+        for entry in payload.get("entries", []) if isinstance(payload, dict) else payload:
+            candidates.append(
+                {
+                    "id": entry.get("id"),
+                    "title": _text(entry.get("title")),
+                    "summary": {"de": _text(entry.get("summary"))},
+                    "content": {"de": _text(entry.get("content"))},
+                    "url": entry.get("url"),
+                    "topics": entry.get("topics") or [],
+                    "tags": entry.get("tags") or [],
+                    "targetGroups": entry.get("targetGroups") or [],
+                    "domain": domain,
+                    "provenance": entry.get("provenance"),
+                    "qualityScores": entry.get("qualityScores"),
+                    "_term_score": 1,
+                }
+            )
+    # Prefer hosts that actually appear in the topic registry so the boost path is exercised.
+    hosts = set(retrieval._load_registered_source_hosts().values())
+    candidates.sort(key=lambda item: urlparse(str(item.get("url") or "")).netloc.removeprefix("www.") not in hosts)
+    # Feature records are precomputed at import time in production.
+    return [dict(entry, _features=compute_rerank_features(entry)) for entry in candidates[:limit]]
+
+
+def _time_per_candidate(fn, rounds: int, candidates: int) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        fn()
+    elapsed = time.perf_counter() - start
+    return elapsed / (rounds * len(QUERIES) * candidates) * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark rerank cost per candidate")
+    parser.add_argument("--candidates", type=int, default=24, help="Candidates per query (query_entries LIMIT)")
+    parser.add_argument("--rounds", type=int, default=100)
+    args = parser.parse_args()
+
+    candidates = load_candidates(args.candidates)
+    if not candidates:
+        print("No entries found under data/*/entries.json")
+        return
+    prepared = [(query, retrieval._extract_terms(query)) for query in QUERIES]
+    n = len(candidates)
+
+    def boost_legacy():
+        for query, terms in prepared:
+            intents = retrieval._detect_intents(query, terms)
+            for entry in candidates:
+                legacy_topic_role_boost(entry, query, terms, intents)
+
+    def boost_compiled():
+        for query, terms in prepared:
+            intents = retrieval._detect_intents(query, terms)
+            context = retrieval._topic_query_context(query, terms, intents)
+            for entry in candidates:
+                retrieval._topic_role_boost(entry, query, terms, intents, context)
+
+    def rerank():
+        for query, terms in prepared:
+            retrieval._rerank_entries([dict(entry) for entry in candidates], query, terms)
+
+    # Sanity check: both implementations agree on every candidate.
+    for query, terms in prepared:
+        intents = retrieval._detect_intents(query, terms)
+        for entry in candidates:
+            before = legacy_topic_role_boost(entry, query, terms, intents)
+            after = retrieval._topic_role_boost(entry, query, terms, intents)
+            assert abs(before - after) < 1e-9, (query, entry.get("url"), before, after)
+
+    retrieval._get_topic_matcher()  # compile outside the timed region
+    results = {
+        "topic boost (legacy)": _time_per_candidate(boost_legacy, args.rounds, n),
+        "topic boost (compiled)": _time_per_candidate(boost_compiled, args.rounds, n),
+    }
+    with patch.object(retrieval, "_topic_role_boost", legacy_topic_role_boost):
+        results["full rerank (legacy boost)"] = _time_per_candidate(rerank, args.rounds, n)
+    results["full rerank (compiled boost)"] = _time_per_candidate(rerank, args.rounds, n)
+
+    print(f"{n} candidates x {len(QUERIES)} queries x {args.rounds} rounds")
+    for label, micros in results.items():
+        print(f"  {label:<30} {micros:8.2f} us/candidate")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Hit rate of the semantic answer cache (backend/ai_service/semantic_cache.py)
+on the life-event query suite.
+
+Every query of tests/fixtures/life_event_suggested_queries.json and
+life_event_gold_queries.json is retrieved the way /synthesize retrieves it
+(same evidence fingerprint, same query-embedding cache), then looked up in a
+fresh SemanticAnswerIndex per threshold and remembered on a miss, as
+synthesize_answer does. No answers are generated, so only Postgres and
+Ollama (for the vector leg) are needed. Exact-key hits (same normalized
+query and evidence) are reported separately; they never reach the semantic
+index.
+
+Usage:
+    python scripts/eval_semantic_cache.py
+    python scripts/eval_semantic_cache.py --thresholds 0.88 0.92 0.95 --verbose
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from backend.ai_service import endpoints  # noqa: E402
+from backend.ai_service.cache import cache_key, fingerprint_evidence, normalize_query  # noqa: E402
+from backend.ai_service.semantic_cache import SemanticAnswerIndex  # noqa: E402
+from backend.ai_service.vector_retrieval import cached_query_embedding  # noqa: E402
+
+FIXTURES = [
+    ROOT / "tests" / "fixtures" / "life_event_suggested_queries.json",
+    ROOT / "tests" / "fixtures" / "life_event_gold_queries.json",
+]
+
+
+def _load_queries() -> list[dict]:
+    queries = []
+    for path in FIXTURES:
+        queries.extend(json.loads(path.read_text(encoding="utf-8"))["queries"])
+    return queries
+
+
+async def _retrieve_all(queries: list[dict]) -> list[tuple[dict, str, list[float] | None]]:
+    rows = []
+    for item in queries:
+        evidence, _ = await endpoints._coalesced_evidence(item["query"])
+        rows.append((item, fingerprint_evidence(evidence), cached_query_embedding(item["query"])))
+    return rows
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--thresholds", type=float, nargs="+", default=[0.88, 0.90, 0.92, 0.95])
+    parser.add_argument("--verbose", action="store_true", help="print every semantic hit")
+    args = parser.parse_args()
+
+    model = endpoints.model_router.route("synthesize", explicit_escalation=False)
+    rows = asyncio.run(_retrieve_all(_load_queries()))
+    embedded = sum(1 for _, _, vector in rows if vector is not None)
+    print(f"queries: {len(rows)}  embedded: {embedded}  distinct evidence sets: {len({fp for _, fp, _ in rows})}")
+    if not embedded:
+        print("no query embeddings available (RAG disabled or Ollama unreachable); nothing to measure")
+        return 1
+
+    for threshold in args.thresholds:
+        index = SemanticAnswerIndex(threshold=threshold)
+        seen: dict[tuple[str, str], str] = {}
+        exact = semantic = 0
+        for item, evidence_hash, vector in rows:
+            exact_key = (normalize_query(item["query"]), evidence_hash)
+            if exact_key in seen:
+                exact += 1
+                continue
+            seen[exact_key] = item["id"]
+            if vector is None:
+                continue
+            match = index.match(model, evidence_hash, vector)
+            if match is not None:
+                semantic += 1
+                if args.verbose:
+                    print(f"  {threshold:.2f} {item['id']} -> {match[0].split('::')[2]!r} ({match[1]:.3f})")
+                continue
+            index.remember(model, evidence_hash, vector, cache_key("synthesize", model, *exact_key))
+        print(
+            f"threshold {threshold:.2f}: exact hits {exact}, semantic hits {semantic}, "
+            f"hit rate {(exact + semantic) / len(rows):.1%}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
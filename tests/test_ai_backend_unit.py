@@ -1,10 +1,11 @@
 import json
+import time
 import unittest
 from unittest.mock import patch
 
 from fastapi.testclient import TestClient
 
-from backend.ai_service.cache import TTLCache, ai_cache, fingerprint_payload, normalize_query
+from backend.ai_service.cache import ResponseCache, TTLCache, ai_cache, cache_key, fingerprint_payload, normalize_query
 from backend.ai_service.gateway import app
 from backend.ai_service.provider import AIProviderError
 from backend.ai_service.schemas import Evidence
@@ -22,8 +23,7 @@ def load_sample_entry():
 
 class AIBackendUnitTests(unittest.TestCase):
     def setUp(self):
-        with ai_cache._lock:
-            ai_cache._store.clear()
+        ai_cache.clear()
         self.turnstile_patch = patch("backend.ai_service.gateway.is_turnstile_configured", return_value=False)
         self.turnstile_patch.start()
 
@@ -38,6 +38,46 @@ class AIBackendUnitTests(unittest.TestCase):
         cache.set("key", {"value": 1}, ttl_seconds=60)
         self.assertEqual(cache.get("key"), {"value": 1})
 
+    def test_ttl_cache_evicts_least_recent_entries_over_the_byte_budget(self):
+        cache = TTLCache(max_entries=10, max_bytes=80)
+        cache.set("a", {"text": "x" * 20}, ttl_seconds=60)
+        cache.set("b", {"text": "y" * 20}, ttl_seconds=60)
+        cache.get("a")
+        cache.set("c", {"text": "z" * 20}, ttl_seconds=60)
+        cache.set("huge", {"text": "w" * 100}, ttl_seconds=60)
+
+        self.assertIsNone(cache.get("b"))
+        self.assertIsNotNone(cache.get("a"))
+        self.assertIsNone(cache.get("huge"))
+        stats = cache.stats()
+        self.assertEqual((stats["entries"], stats["evictions"], stats["oversize"]), (2, 1, 1))
+        self.assertLessEqual(stats["bytes"], 80)
+
+    def test_ttl_cache_sweep_drops_expired_entries_without_reads(self):
+        cache = TTLCache()
+        cache.set("old", {"v": 1}, ttl_seconds=60)
+        cache.set("new", {"v": 2}, ttl_seconds=60)
+        with patch("backend.ai_service.cache.time.time", return_value=time.time() + 120):
+            cache.set("later", {"v": 3}, ttl_seconds=60)
+            self.assertEqual(cache.sweep(), 2)
+        self.assertEqual(cache.stats()["entries"], 1)
+        self.assertEqual(cache.stats()["expirations"], 2)
+
+    def test_response_cache_budgets_namespaces_separately(self):
+        cache = ResponseCache(budgets={"rewrite": 4000, "synthesize": 400}, shards=2)
+        for i in range(20):
+            cache.set(cache_key("synthesize", "m", f"q{i}", "fp"), {"answer": "x" * 100}, 60)
+        cache.set(cache_key("rewrite", "m", "q"), {"rewritten_query": "q"}, 60)
+
+        self.assertIsNotNone(cache.get(cache_key("rewrite", "m", "q")))
+        self.assertIsNone(cache.get(cache_key("rewrite", "m", "other")))
+        stats = cache.stats()
+        self.assertLessEqual(stats["synthesize"]["bytes"], 400)
+        self.assertGreater(stats["synthesize"]["evictions"], 0)
+        self.assertEqual(stats["rewrite"]["entries"], 1)
+        self.assertEqual((stats["rewrite"]["hits"], stats["rewrite"]["misses"]), (1, 1))
+        self.assertEqual(stats["default"]["entries"], 0)
+
     def test_fingerprint_payload_changes_with_content(self):
         first = fingerprint_payload({"id": "1", "tags": ["a"]})
         second = fingerprint_payload({"id": "1", "tags": ["b"]})
@@ -51,6 +91,41 @@ class AIBackendUnitTests(unittest.TestCase):
         self.assertIsInstance(payload["evidence"], list)
         self.assertIn("latency_ms", payload)
 
+    def test_retrieve_batch_reuses_retrieve_cache_and_batches_the_rest(self):
+        client.post("/retrieve", json={"query": "Buergergeld"})
+        evidence = [Evidence(source="db", content="{}", confidence=0.95)]
+
+        async def fake_batch(queries, domain=None):
+            self.assertEqual(queries, ["Wohngeld"])
+            return [evidence], []
+
+        with patch("backend.ai_service.endpoints.retrieve_evidence_batch", side_effect=fake_batch):
+            response = client.post("/retrieve/batch", json={"queries": ["buergergeld", "Wohngeld", "wohngeld "]})
+
+        self.assertEqual(response.status_code, 200)
+        results = response.json()["results"]
+        self.assertEqual(len(results), 3)
+        self.assertFalse(results[1]["weak_evidence"])
+        self.assertEqual(results[1]["evidence"], results[2]["evidence"])
+        self.assertEqual(client.post("/retrieve/batch", json={"queries": []}).status_code, 422)
+
+    def test_retrieve_batch_is_charged_one_rate_limit_slot_per_query(self):
+        async def fake_batch(queries, domain=None):
+            return [[] for _ in queries], []
+
+        with patch("backend.ai_service.endpoints.retrieve_evidence_batch", side_effect=fake_batch), patch(
+            "backend.ai_service.gateway.RATE_LIMIT_MAX_REQUESTS", 5
+        ), patch.dict("backend.ai_service.gateway.RATE_LIMIT_BUCKETS", clear=True):
+            first = client.post("/retrieve/batch", json={"queries": ["a", "b", "c"]})
+            second = client.post("/retrieve/batch", json={"queries": ["d", "e", "f"]})
+            third = client.post("/retrieve/batch", json={"queries": ["g", "h"]})
+            fourth = client.post("/retrieve/batch", json={"queries": ["i"]})
+
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(second.status_code, 429)
+        self.assertEqual(third.status_code, 200)
+        self.assertEqual(fourth.status_code, 429)
+
     def test_enrich_endpoint_returns_structured_metadata_suggestions(self):
         entry = load_sample_entry()
         response = client.post("/enrich", json={"entry_id": entry["id"], "entry": entry})
@@ -150,8 +225,8 @@ class AIBackendUnitTests(unittest.TestCase):
             "backend.ai_service.endpoints.LOCAL_SYNTHESIS_STRATEGY",
             "extractive",
         ), patch(
-            "backend.ai_service.endpoints.retrieve_evidence",
-            return_value=fake_evidence,
+            "backend.ai_service.endpoints.retrieve_evidence_with_status",
+            return_value=(fake_evidence, []),
         ):
             response = client.post("/synthesize", json={"query": "Ich bin arbeitslos geworden. Was nun?"})
 
@@ -184,10 +259,10 @@ class AIBackendUnitTests(unittest.TestCase):
         ]
 
         with patch("backend.ai_service.endpoints.LOCAL_SYNTHESIS_STRATEGY", "llm"), patch(
-            "backend.ai_service.endpoints.retrieve_evidence",
-            return_value=fake_evidence,
+            "backend.ai_service.endpoints.retrieve_evidence_with_status",
+            return_value=(fake_evidence, []),
         ), patch(
-            "backend.ai_service.endpoints.provider.generate_text",
+            "backend.ai_service.endpoints.provider.agenerate_text",
             side_effect=AIProviderError("provider exploded"),
         ):
             response = client.post("/synthesize", json={"query": "Buergergeld"})
@@ -228,8 +303,8 @@ class AIBackendUnitTests(unittest.TestCase):
             "backend.ai_service.endpoints.LOCAL_SYNTHESIS_STRATEGY",
             "extractive",
         ), patch(
-            "backend.ai_service.endpoints.retrieve_evidence",
-            return_value=fake_evidence,
+            "backend.ai_service.endpoints.retrieve_evidence_with_status",
+            return_value=(fake_evidence, []),
         ):
             response = client.post(
                 "/chat",
@@ -269,19 +344,19 @@ class AIBackendUnitTests(unittest.TestCase):
 
         def fake_retrieve(query):
             retrieval_queries.append(query)
-            return fake_evidence
+            return fake_evidence, []
 
         with patch("backend.ai_service.endpoints.provider.name", "mock"), patch(
             "backend.ai_service.endpoints.provider.is_configured",
             return_value=True,
         ), patch(
-            "backend.ai_service.endpoints.provider.generate_text",
+            "backend.ai_service.endpoints.provider.agenerate_text",
             side_effect=[
                 {"text": "buergergeld sanktion widerspruch", "usage": {"total_tokens": 4}},
                 {"text": "Beleggestuetzte Antwort", "usage": {"total_tokens": 8}},
             ],
         ), patch(
-            "backend.ai_service.endpoints.retrieve_evidence",
+            "backend.ai_service.endpoints.retrieve_evidence_with_status",
             side_effect=fake_retrieve,
         ):
             response = client.post(
@@ -1,9 +1,20 @@
+import asyncio
+import json
 import os
 import socket
+import threading
+import time
 import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from unittest.mock import patch
 
-from backend.ai_service.provider import AIProviderError, NullProvider, OllamaProvider, get_provider
+from backend.ai_service.provider import (
+    AIProviderError,
+    NullProvider,
+    OllamaProvider,
+    PooledHTTPProvider,
+    get_provider,
+)
 
 
 class AIProviderUnitTests(unittest.TestCase):
@@ -24,6 +35,10 @@ class AIProviderUnitTests(unittest.TestCase):
             provider = get_provider()
         self.assertEqual(provider.name, "none")
 
+    def test_pooled_provider_requires_the_wire_format_hooks(self):
+        with self.assertRaises(TypeError):
+            PooledHTTPProvider("http://localhost")
+
     def test_ollama_timeout_becomes_provider_error(self):
         provider = OllamaProvider()
 
@@ -34,5 +49,127 @@ class AIProviderUnitTests(unittest.TestCase):
         self.assertIn("timed out", str(exc.exception).lower())
 
 
+class _OllamaStub(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    delay = 0.0
+
+    def do_POST(self):
+        request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        time.sleep(self.delay)
+        if request.get("stream"):
+            lines = [{"message": {"content": "Ant"}, "done": False}, {"message": {"content": "wort"}, "done": False}]
+            lines.append({"message": {"content": ""}, "done": True, "prompt_eval_count": 3, "eval_count": 2})
+            body = "".join(json.dumps(line) + "\n" for line in lines).encode()
+        else:
+            body = json.dumps({"message": {"content": "Antwort"}, "prompt_eval_count": 3, "eval_count": 2}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class PooledProviderTests(unittest.TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _OllamaStub)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        base_url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        with patch.dict(os.environ, {"OLLAMA_BASE_URL": base_url, "AI_PROVIDER_READ_TIMEOUT_SECONDS": "0.5"}):
+            self.provider = OllamaProvider()
+
+    def tearDown(self):
+        _OllamaStub.delay = 0.0
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _generate(self, calls):
+        async def main():
+            try:
+                return [
+                    await self.provider.agenerate_text(model="qwen2.5:3b", system_prompt="s", user_prompt="u")
+                    for _ in range(calls)
+                ]
+            finally:
+                await self.provider.aclose()
+
+        return asyncio.run(main())
+
+    def test_async_completions_reuse_one_connection(self):
+        results = self._generate(3)
+
+        self.assertEqual(results[0]["text"], "Antwort")
+        self.assertEqual(results[0]["usage"]["total_tokens"], 5)
+        stats = self.provider.pool_stats()
+        self.assertEqual(stats["requests"], 3)
+        self.assertEqual(stats["connectionsOpened"], 1)
+        self.assertEqual(stats["connectionsReused"], 2)
+
+    def test_async_read_timeout_becomes_provider_error(self):
+        _OllamaStub.delay = 1.0
+
+        with self.assertRaises(AIProviderError) as exc:
+            self._generate(1)
+
+        self.assertIn("timed out", str(exc.exception).lower())
+
+    def test_stream_yields_deltas_then_usage_on_the_pooled_connection(self):
+        async def main():
+            try:
+                first = await self.provider.agenerate_text(model="qwen2.5:3b", system_prompt="s", user_prompt="u")
+                chunks = [
+                    chunk
+                    async for chunk in self.provider.astream_text(model="qwen2.5:3b", system_prompt="s", user_prompt="u")
+                ]
+                return first, chunks
+            finally:
+                await self.provider.aclose()
+
+        first, chunks = asyncio.run(main())
+
+        self.assertEqual("".join(chunk.get("delta", "") for chunk in chunks), first["text"])
+        self.assertEqual(chunks[-1], {"usage": {"prompt_tokens": 3, "completion_tokens": 2, "total_tokens": 5}})
+        self.assertEqual(self.provider.pool_stats()["connectionsOpened"], 1)
+
+    def test_client_of_a_finished_loop_is_closed_when_replaced(self):
+        async def generate():
+            await self.provider.agenerate_text(model="qwen2.5:3b", system_prompt="s", user_prompt="u")
+            return self.provider._client
+
+        stale = asyncio.run(generate())
+        try:
+            fresh = asyncio.run(generate())
+        finally:
+            asyncio.run(self.provider.aclose())
+
+        self.assertIsNot(fresh, stale)
+        self.assertTrue(stale.is_closed)
+        self.assertEqual(self.provider.pool_stats()["requests"], 2)
+
+    def test_sync_wrapper_returns_the_same_completion(self):
+        result = self.provider.generate_text(model="qwen2.5:3b", system_prompt="s", user_prompt="u")
+
+        self.assertEqual(result["text"], "Antwort")
+
+    def test_sync_and_async_paths_raise_the_same_errors(self):
+        with socket.socket() as closed:
+            closed.bind(("127.0.0.1", 0))
+            port = closed.getsockname()[1]
+        with patch.dict(os.environ, {"OLLAMA_BASE_URL": f"http://127.0.0.1:{port}"}):
+            provider = OllamaProvider()
+
+        with self.assertRaises(AIProviderError) as sync_exc:
+            provider.generate_text(model="qwen2.5:3b", system_prompt="s", user_prompt="u")
+        self.provider = provider
+        with self.assertRaises(AIProviderError) as async_exc:
+            self._generate(1)
+
+        self.assertEqual(str(sync_exc.exception), f"Ollama unreachable at http://127.0.0.1:{port}")
+        self.assertEqual(str(async_exc.exception), str(sync_exc.exception))
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,135 @@
+import json
+import unittest
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+
+from backend.ai_service import endpoints, telemetry
+from backend.ai_service.cache import ai_cache
+from backend.ai_service.gateway import app
+from backend.ai_service.provider import AIProviderError, OllamaProvider, OpenAIProvider
+from backend.ai_service.schemas import Evidence
+
+client = TestClient(app)
+EVIDENCE = [Evidence(source="https://example.org", content='{"title": "Wohngeld"}', confidence=0.9)]
+
+
+def _events(response):
+    events = []
+    for block in response.text.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+async def _stream(*args, **kwargs):
+    for delta in ["Wohngeld ", "beantragen ", "Sie beim Amt."]:
+        yield {"delta": delta}
+    yield {"usage": {"prompt_tokens": 10, "completion_tokens": 3, "total_tokens": 13}}
+
+
+async def _failing_stream(*args, **kwargs):
+    yield {"delta": "Wohn"}
+    raise AIProviderError("stream broke")
+
+
+class SynthesizeStreamTests(unittest.TestCase):
+    def setUp(self):
+        ai_cache.clear()
+        telemetry.reset_metrics()
+        self.patches = [
+            patch("backend.ai_service.gateway.is_turnstile_configured", return_value=False),
+            patch.object(endpoints, "LOCAL_SYNTHESIS_STRATEGY", "llm"),
+            patch.object(endpoints, "retrieve_evidence_with_status", return_value=(EVIDENCE, [])),
+            patch.object(endpoints.provider, "is_configured", return_value=True),
+        ]
+        for p in self.patches:
+            p.start()
+
+    def tearDown(self):
+        for p in self.patches:
+            p.stop()
+
+    def test_evidence_then_tokens_then_the_cached_answer(self):
+        with patch.object(endpoints.provider, "astream_text", side_effect=_stream):
+            response = client.post("/synthesize/stream", json={"query": "Wohngeld"})
+
+        self.assertEqual(response.headers["content-type"].split(";")[0], "text/event-stream")
+        events = _events(response)
+        self.assertEqual([name for name, _ in events], ["evidence", "token", "token", "token", "done"])
+        self.assertEqual(events[0][1]["evidence"][0]["source"], "https://example.org")
+        done = events[-1][1]
+        self.assertEqual(done["answer"], "Wohngeld beantragen Sie beim Amt.")
+        self.assertEqual(done["usage"]["total_tokens"], 13)
+
+        with patch.object(endpoints.provider, "agenerate_text") as generate:
+            repeated = client.post("/synthesize", json={"query": "Wohngeld"})
+        generate.assert_not_called()
+        self.assertEqual(repeated.json()["answer"], "Wohngeld beantragen Sie beim Amt.")
+
+        metrics = client.get("/metrics").json()
+        self.assertIn("synthesize/stream", metrics["timeToFirstByteMs"])
+        self.assertIn("synthesize", metrics["timeToFirstByteMs"])
+        self.assertEqual(metrics["observations"]["first_token_ms.synthesize/stream"]["count"], 1)
+
+    def test_cached_answer_is_streamed_in_one_token(self):
+        with patch.object(
+            endpoints.provider, "agenerate_text", return_value={"text": "Antwort", "usage": {}}
+        ):
+            client.post("/synthesize", json={"query": "Wohngeld"})
+
+        with patch.object(endpoints.provider, "astream_text") as stream:
+            events = _events(client.post("/synthesize/stream", json={"query": "Wohngeld"}))
+
+        stream.assert_not_called()
+        self.assertEqual([name for name, _ in events], ["evidence", "token", "done"])
+        self.assertEqual(events[1][1]["text"], "Antwort")
+
+    def test_provider_error_mid_stream_ends_with_a_fallback(self):
+        with patch.object(endpoints.provider, "astream_text", side_effect=_failing_stream):
+            events = _events(client.post("/synthesize/stream", json={"query": "Wohngeld"}))
+
+        done = events[-1][1]
+        self.assertTrue(done["fallback"])
+        self.assertEqual(done["explanation"], "stream broke")
+
+
+class ChatStreamTests(unittest.TestCase):
+    def test_chat_stream_reports_the_standalone_query_first(self):
+        with patch.object(endpoints, "LOCAL_SYNTHESIS_STRATEGY", "llm"), patch.object(
+            endpoints, "retrieve_evidence_with_status", return_value=(EVIDENCE, [])
+        ), patch.object(endpoints.provider, "is_configured", return_value=True), patch.object(
+            endpoints.provider, "astream_text", side_effect=_stream
+        ):
+            response = client.post("/chat/stream", json={"messages": [{"role": "user", "content": "Wohngeld?"}]})
+        events = _events(response)
+
+        self.assertEqual(events[0][0], "evidence")
+        self.assertEqual(events[0][1]["standalone_query"], "Wohngeld?")
+        self.assertEqual(events[-1][1]["answer"], "Wohngeld beantragen Sie beim Amt.")
+        self.assertEqual(events[-1][1]["standalone_query"], "Wohngeld?")
+
+
+class ProviderStreamParsingTests(unittest.TestCase):
+    def test_ollama_ndjson_lines(self):
+        provider = OllamaProvider()
+        self.assertEqual(provider._parse_stream_line('{"message": {"content": "Hal"}, "done": false}'), ("Hal", None))
+        _, usage = provider._parse_stream_line(
+            '{"message": {"content": ""}, "done": true, "prompt_eval_count": 4, "eval_count": 2}'
+        )
+        self.assertEqual(usage["total_tokens"], 6)
+        with self.assertRaises(AIProviderError):
+            provider._parse_stream_line('{"error": "model not found"}')
+
+    def test_openai_sse_lines(self):
+        provider = OpenAIProvider()
+        self.assertEqual(provider._parse_stream_line('data: {"choices": [{"delta": {"content": "Hal"}}]}'), ("Hal", None))
+        self.assertEqual(provider._parse_stream_line("data: [DONE]"), (None, None))
+        _, usage = provider._parse_stream_line(
+            'data: {"choices": [], "usage": {"prompt_tokens": 4, "completion_tokens": 2, "total_tokens": 6}}'
+        )
+        self.assertEqual(usage["total_tokens"], 6)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,144 @@
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+
+from backend.ai_service import vector_retrieval
+from backend.ai_service.circuit_breaker import CLOSED, HALF_OPEN, OPEN, BreakerCall, CircuitBreaker
+
+
+class CircuitBreakerTests(unittest.TestCase):
+    def test_opens_at_failure_rate_after_min_calls(self):
+        breaker = CircuitBreaker("test", window=10, min_calls=4, failure_rate=0.5, reset_seconds=60)
+        breaker.record_success()
+        breaker.record_failure("boom")
+        breaker.record_success()
+        self.assertEqual(breaker.state, CLOSED)
+
+        breaker.record_failure("boom")
+        self.assertEqual(breaker.state, OPEN)
+        self.assertFalse(breaker.allow())
+        self.assertEqual(breaker.status()["lastError"], "boom")
+
+    def test_half_open_lets_one_trial_through(self):
+        breaker = CircuitBreaker("test", min_calls=1, failure_rate=1.0, reset_seconds=0)
+        breaker.record_failure("down")
+        self.assertTrue(breaker.allow())
+        self.assertEqual(breaker.state, HALF_OPEN)
+        self.assertFalse(breaker.allow())
+
+        breaker.record_failure("still down")
+        self.assertEqual(breaker.state, OPEN)
+        self.assertTrue(breaker.allow())
+        breaker.record_success()
+        self.assertEqual(breaker.state, CLOSED)
+        self.assertTrue(breaker.allow())
+
+    def test_background_probe_moves_open_breaker_to_half_open(self):
+        healthy = threading.Event()
+        breaker = CircuitBreaker(
+            "test", min_calls=1, failure_rate=1.0, reset_seconds=0.01, probe=healthy.is_set
+        )
+        breaker.record_failure("down")
+        time.sleep(0.05)
+        self.assertFalse(breaker.allow())
+
+        healthy.set()
+        deadline = time.monotonic() + 2
+        while breaker.state == OPEN and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(breaker.state, HALF_OPEN)
+        self.assertTrue(breaker.allow())
+
+    def test_only_the_first_outcome_of_a_call_counts(self):
+        breaker = CircuitBreaker("test", min_calls=5, failure_rate=0.5, reset_seconds=60)
+        call = breaker.acquire()
+        breaker.record_failure("deadline missed", call)
+        breaker.record_success(call)
+
+        status = breaker.status()
+        self.assertEqual(status["recentCalls"], 1)
+        self.assertEqual(status["recentFailureRate"], 1.0)
+
+    def test_stale_success_does_not_close_a_half_open_breaker(self):
+        breaker = CircuitBreaker("test", min_calls=1, failure_rate=1.0, reset_seconds=0)
+        stale = breaker.acquire()
+        breaker.record_failure("down")
+        trial = breaker.acquire()
+        self.assertEqual(breaker.state, HALF_OPEN)
+
+        breaker.record_success(stale)
+        self.assertEqual(breaker.state, HALF_OPEN)
+        self.assertIsNone(breaker.acquire())
+        breaker.record_success(trial)
+        self.assertEqual(breaker.state, CLOSED)
+
+    def test_outcomes_are_not_kept_while_open(self):
+        breaker = CircuitBreaker("test", min_calls=1, failure_rate=1.0, reset_seconds=60)
+        breaker.record_failure("down")
+        breaker.record_failure("still down")
+        breaker.record_success()
+
+        self.assertEqual(breaker.state, OPEN)
+        self.assertEqual(breaker.status()["recentCalls"], 0)
+
+    def test_call_settled_before_admission_is_refused(self):
+        breaker = CircuitBreaker("test", min_calls=5, failure_rate=0.5, reset_seconds=60)
+        call = BreakerCall()
+        breaker.record_failure("deadline missed", call)
+
+        self.assertIsNone(breaker.acquire(call))
+        self.assertEqual(breaker.status()["recentCalls"], 1)
+
+
+class VectorLegBreakerTests(unittest.TestCase):
+    def test_open_breaker_skips_the_vector_backends(self):
+        breaker = CircuitBreaker("vector_leg", min_calls=2, failure_rate=1.0, reset_seconds=60)
+        indexer = MagicMock()
+        indexer.search.side_effect = ConnectionError("qdrant down")
+
+        with (
+            patch.object(vector_retrieval, "VECTOR_BREAKER", breaker),
+            patch.object(vector_retrieval, "_get_indexer", return_value=indexer),
+            patch.object(vector_retrieval, "_is_rag_enabled", return_value=True),
+        ):
+            for _ in range(2):
+                with self.assertRaises(vector_retrieval.VectorLegUnavailable):
+                    vector_retrieval.vector_search("wohngeld")
+            self.assertEqual(breaker.state, OPEN)
+            with self.assertRaisesRegex(vector_retrieval.VectorLegUnavailable, "breaker is open"):
+                vector_retrieval.vector_search_batch(["a", "b"])
+            self.assertEqual(vector_retrieval.vector_leg_status()["state"], OPEN)
+
+        self.assertEqual(indexer.search.call_count, 2)
+        indexer.search_batch.assert_not_called()
+
+    def test_failed_indexer_construction_is_retried(self):
+        with (
+            patch.object(vector_retrieval, "_indexer", None),
+            patch.object(vector_retrieval, "_indexer_failed_at", time.monotonic() - 120),
+            patch.object(vector_retrieval, "_breaker_reset_seconds", return_value=30.0),
+            patch("crawlers.rag.index_docs.create_indexer", return_value="indexer") as create,
+        ):
+            self.assertEqual(vector_retrieval._get_indexer(), "indexer")
+            self.assertIsNone(vector_retrieval._indexer_failed_at)
+
+        embedder = create.call_args.kwargs["embedder"]
+        self.assertEqual((embedder.timeout, embedder.attempts), (3.0, 1))
+
+    def test_query_embedder_fails_fast_without_retries(self):
+        from crawlers.rag.index_docs import OllamaEmbedder
+
+        with patch("crawlers.rag.index_docs.requests.post", side_effect=TimeoutError("read timed out")) as post, patch(
+            "crawlers.rag.index_docs.time.sleep"
+        ) as sleep:
+            with self.assertRaisesRegex(RuntimeError, "after 1 attempt"):
+                OllamaEmbedder(timeout=3.0, attempts=1).embed_batch(["wohngeld"])
+
+        post.assert_called_once()
+        self.assertEqual(post.call_args.kwargs["timeout"], 3.0)
+        sleep.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
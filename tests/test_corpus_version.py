@@ -0,0 +1,90 @@
+import unittest
+from unittest.mock import MagicMock, patch
+
+from backend.ai_service import endpoints, retrieval, telemetry
+from backend.ai_service.cache import TTLCache, cache_key
+from backend.ai_service.corpus_version import UNVERSIONED, CorpusVersion, version_token
+
+
+class CorpusVersionTests(unittest.TestCase):
+    def test_subscribers_run_only_when_the_version_moves(self):
+        versions = iter([("2026-10-01", 10), ("2026-10-01", 10), ("2026-10-02", 10)])
+        changes = []
+        tracker = CorpusVersion(lambda: next(versions), poll_seconds=3600)
+        tracker.subscribe(lambda previous, current: changes.append((previous, current)))
+
+        self.assertEqual(tracker.token, UNVERSIONED)
+        self.assertTrue(tracker.refresh())
+        self.assertFalse(tracker.refresh())
+        self.assertTrue(tracker.refresh())
+
+        first, second = version_token(("2026-10-01", 10)), version_token(("2026-10-02", 10))
+        self.assertEqual(changes, [(UNVERSIONED, first), (first, second)])
+        self.assertEqual(tracker.current(), second)
+
+    def test_failed_version_check_keeps_the_current_token(self):
+        tracker = CorpusVersion(lambda: ("2026-10-01", 1), poll_seconds=3600)
+        tracker.refresh()
+        token = tracker.token
+
+        tracker._load_version = lambda: (_ for _ in ()).throw(RuntimeError("db down"))
+        self.assertFalse(tracker.refresh())
+        self.assertEqual(tracker.token, token)
+
+    def test_psycopg3_notifies_wake_the_listener(self):
+        tracker = CorpusVersion(lambda: ("2026-10-01", 1), poll_seconds=5)
+        conn = MagicMock()
+        conn.notifies.side_effect = [iter([object()]), iter([])]
+
+        self.assertTrue(tracker._wait_for_notify(conn))
+        self.assertFalse(tracker._wait_for_notify(conn))
+        conn.notifies.assert_called_with(timeout=5, stop_after=1)
+
+    def test_psycopg2_notifies_are_drained(self):
+        tracker = CorpusVersion(lambda: ("2026-10-01", 1), poll_seconds=5)
+        conn = MagicMock()
+        conn.notifies = ["entries_changed"]
+
+        with patch("backend.ai_service.corpus_version.select.select", return_value=([conn], [], [])):
+            self.assertTrue(tracker._wait_for_notify(conn))
+        conn.poll.assert_called_once()
+        self.assertEqual(conn.notifies, [])
+
+    def test_listen_starts_for_psycopg3_and_is_reported_when_skipped(self):
+        tracker = CorpusVersion(lambda: ("2026-10-01", 1), poll_seconds=3600)
+        engine = MagicMock()
+        telemetry.reset_metrics()
+        with patch.object(retrieval, "CORPUS_VERSION", tracker), patch.object(retrieval, "engine", engine), patch.object(
+            tracker, "listen"
+        ) as listen, patch("builtins.print"):
+            engine.dialect.driver = "psycopg"
+            retrieval.watch_corpus_version()
+            listen.assert_called_once()
+
+            engine.dialect.driver = "pg8000"
+            retrieval.watch_corpus_version()
+            status = retrieval.corpus_version_status()
+
+        listen.assert_called_once()
+        self.assertFalse(status["listening"])
+        self.assertIn("pg8000", status["listenSkipped"])
+        self.assertEqual(telemetry.snapshot()["counters"]["retrieval.corpus_listen_skipped"], 1)
+
+    def test_version_change_purges_only_stale_retrieve_keys(self):
+        cache = TTLCache(max_entries=8)
+        cache.set(cache_key("retrieve", "old", "wohngeld"), {}, 60)
+        cache.set(cache_key("retrieve", "new", "wohngeld"), {}, 60)
+        cache.set(cache_key("rewrite", "model", "wohngeld"), {}, 60)
+        cache.set(cache_key("synthesize_query", "old", "model", "wohngeld"), {}, 60)
+
+        with patch.object(endpoints, "ai_cache", cache):
+            endpoints._purge_stale_retrievals("old", "new")
+
+        self.assertIsNone(cache.get(cache_key("retrieve", "old", "wohngeld")))
+        self.assertIsNotNone(cache.get(cache_key("retrieve", "new", "wohngeld")))
+        self.assertIsNotNone(cache.get(cache_key("rewrite", "model", "wohngeld")))
+        self.assertIsNone(cache.get(cache_key("synthesize_query", "old", "model", "wohngeld")))
+
+
+if __name__ == "__main__":
+    unittest.main()
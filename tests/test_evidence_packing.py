@@ -0,0 +1,85 @@
+import unittest
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+
+from backend.ai_service import endpoints
+from backend.ai_service.cache import ai_cache
+from backend.ai_service.evidence_packing import TOKEN_BUDGET, estimate_tokens, pack_evidence, truncate_sentences
+from backend.ai_service.gateway import app
+from backend.ai_service.schemas import Evidence
+
+LONG_TEXT = " ".join(f"Satz {n} erklärt eine Voraussetzung für den Antrag auf Wohngeld." for n in range(40))
+
+
+def _item(title, text, confidence=0.9):
+    return Evidence(
+        source="db",
+        payload={"title": title, "url": f"https://example.org/{title}", "content": {"de": text}},
+        confidence=confidence,
+    )
+
+
+class TruncateSentencesTests(unittest.TestCase):
+    def test_keeps_whole_sentences_within_the_budget(self):
+        excerpt = truncate_sentences(LONG_TEXT, 40)
+
+        self.assertLessEqual(estimate_tokens(excerpt), 40)
+        self.assertTrue(excerpt.endswith("Wohngeld."))
+
+    def test_cuts_a_single_long_sentence_at_a_word(self):
+        excerpt = truncate_sentences("Wohngeld " * 100, 10)
+
+        self.assertTrue(excerpt.endswith("Wohngeld…"))
+        self.assertLessEqual(estimate_tokens(excerpt), 10)
+
+
+class PackEvidenceTests(unittest.TestCase):
+    def test_fills_the_budget_in_confidence_order(self):
+        evidence = [_item(f"Eintrag{n}", f"{LONG_TEXT} Nummer {n} Thema{n}.", 0.6 + n / 100) for n in range(10)]
+
+        packed = pack_evidence(evidence, token_budget=300, block_tokens=80)
+
+        self.assertLessEqual(packed.tokens, 300)
+        self.assertLessEqual(estimate_tokens(packed.text), packed.tokens)
+        self.assertTrue(packed.text.startswith("[1] Eintrag9"))
+        self.assertEqual(packed.blocks + packed.over_budget, 10)
+        self.assertGreater(packed.over_budget, 0)
+
+    def test_drops_near_duplicates_and_low_confidence(self):
+        evidence = [
+            _item("Wohngeld", "Zuschuss zur Miete für Haushalte mit geringem Einkommen."),
+            _item("Wohngeld", "Zuschuss zur Miete für Haushalte mit geringem Einkommen!"),
+            _item("Kinderzuschlag", "Zusätzliche Leistung für Familien mit Kindern."),
+            _item("Elterngeld", "Ausgleich für Eltern nach der Geburt.", confidence=0.3),
+        ]
+
+        packed = pack_evidence(evidence)
+
+        self.assertEqual((packed.blocks, packed.duplicates), (2, 1))
+        self.assertIn("[2] Kinderzuschlag", packed.text)
+        self.assertNotIn("Elterngeld", packed.text)
+
+
+class PromptUsageTests(unittest.TestCase):
+    def test_synthesize_usage_reports_packed_prompt_size(self):
+        ai_cache.clear()
+        evidence = [_item("Wohngeld", LONG_TEXT), _item("Kinderzuschlag", LONG_TEXT.replace("Wohngeld", "Kind"))]
+        with patch("backend.ai_service.gateway.is_turnstile_configured", return_value=False), patch.object(
+            endpoints, "LOCAL_SYNTHESIS_STRATEGY", "llm"
+        ), patch.object(endpoints, "retrieve_evidence_with_status", return_value=(evidence, [])), patch.object(
+            endpoints.provider, "is_configured", return_value=True
+        ), patch.object(
+            endpoints.provider, "agenerate_text", return_value={"text": "Antwort", "usage": {"prompt_tokens": 321}}
+        ) as generate:
+            usage = TestClient(app).post("/synthesize", json={"query": "Wohngeld"}).json()["usage"]
+
+        user_prompt = generate.call_args.kwargs["user_prompt"]
+        self.assertEqual(usage["prompt_tokens"], 321)
+        self.assertEqual(usage["evidence_blocks"], 2)
+        self.assertLessEqual(usage["evidence_tokens"], TOKEN_BUDGET)
+        self.assertGreaterEqual(usage["prompt_tokens_estimated"], estimate_tokens(user_prompt))
+
+
+if __name__ == "__main__":
+    unittest.main()
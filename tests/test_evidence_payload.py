@@ -0,0 +1,90 @@
+import datetime
+import json
+import unittest
+from unittest.mock import patch
+
+from backend.ai_service import endpoints
+from backend.ai_service.cache import fingerprint_evidence
+from backend.ai_service.evidence_packing import pack_evidence
+from backend.ai_service import schemas
+from backend.ai_service.schemas import AnswerResponse, Evidence, dumps_payload
+
+ENTRY = {"title": "Wohngeld", "summary": {"de": "Zuschuss zur Miete für Haushalte"}, "url": "https://example.org"}
+
+
+class EvidencePayloadTests(unittest.TestCase):
+    def test_payload_is_encoded_once_and_round_trips_through_the_cache(self):
+        evidence = Evidence(source="db", payload=ENTRY, confidence=0.95)
+
+        with patch("backend.ai_service.schemas.dumps_payload", wraps=json.dumps) as dumps:
+            content = evidence.content
+            evidence.model_dump()
+            fingerprint_evidence([evidence])
+        self.assertEqual(dumps.call_count, 1)
+        self.assertEqual(json.loads(content), ENTRY)
+
+        restored = Evidence(**evidence.model_dump())
+        self.assertEqual(restored, evidence)
+        self.assertEqual(restored.payload, ENTRY)
+
+    def test_fingerprint_matches_for_payload_and_content_evidence(self):
+        from_payload = Evidence(source="db", payload=ENTRY, confidence=0.95)
+        from_content = Evidence(source="db", content=from_payload.content, confidence=0.95)
+
+        self.assertEqual(fingerprint_evidence([from_payload]), fingerprint_evidence([from_content]))
+        changed = Evidence(source="db", payload={**ENTRY, "title": "Wohngeld neu"}, confidence=0.95)
+        self.assertNotEqual(fingerprint_evidence([from_payload]), fingerprint_evidence([changed]))
+
+    @unittest.skipIf(schemas.orjson is None, "orjson is not installed")
+    def test_stdlib_fallback_writes_the_same_bytes_as_orjson(self):
+        payload = {
+            **ENTRY,
+            "firstSeen": datetime.date(2026, 1, 1),
+            "lastSeen": datetime.datetime(2026, 1, 1, 8, 30, 5, 120000, tzinfo=datetime.timezone.utc),
+            "checkedAt": datetime.datetime(2026, 1, 1),
+            "score": 0.75,
+            "tags": ["Miete", None, True, 3],
+        }
+
+        with_orjson = dumps_payload(payload)
+        with patch.object(schemas, "orjson", None):
+            with_stdlib = dumps_payload(payload)
+
+        self.assertEqual(with_stdlib.encode("utf-8"), with_orjson.encode("utf-8"))
+        self.assertIn('"checkedAt":"2026-01-01T00:00:00"', with_stdlib)
+
+    def test_plain_text_content_has_no_payload(self):
+        evidence = Evidence(source="db", content="No evidence found", confidence=0.0)
+
+        self.assertIsNone(evidence.payload)
+        self.assertEqual(evidence.model_dump()["content"], "No evidence found")
+
+    def test_response_serializes_content_as_a_json_string(self):
+        response = AnswerResponse(
+            answer="a",
+            explanation="",
+            sources=[],
+            provider="none",
+            model="m",
+            latency_ms=1,
+            evidence=[Evidence(source="db", payload=ENTRY, confidence=0.95)],
+        )
+
+        wire = json.loads(response.model_dump_json())
+        self.assertEqual(json.loads(wire["evidence"][0]["content"]), ENTRY)
+
+    def test_endpoint_helpers_read_the_payload_without_parsing(self):
+        evidence = [Evidence(source="db", payload=ENTRY, confidence=0.95)]
+
+        with patch("backend.ai_service.schemas.json.loads") as loads:
+            sufficient, (answer, sources, _) = endpoints._evidence_state(evidence)
+            block = pack_evidence(evidence).text
+        loads.assert_not_called()
+        self.assertTrue(sufficient)
+        self.assertIn("Wohngeld", answer)
+        self.assertEqual(sources, ["https://example.org"])
+        self.assertIn("[1] Wohngeld", block)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+import unittest
+from unittest.mock import patch
+
+from backend.ai_service import retrieval
+from backend.ai_service.query_analysis import QueryAnalyzer
+from backend.ai_service.topic_matcher import TopicMatcher
+
+
+TOPICS = [
+    {"id": "wohngeld", "name": "Wohngeld", "keywords": ["Wohngeld", "Miete"]},
+    {"id": "buergergeld", "name": "Bürgergeld", "keywords": ["Bürgergeld", "jobcenter", "jobcenter"]},
+    {"id": "arbeit", "name": "Arbeit", "keywords": ["jobcenter"]},
+]
+
+
+class QueryAnalysisTests(unittest.TestCase):
+    def test_analysis_is_memoized_on_the_normalized_query(self):
+        analyzer = QueryAnalyzer(TopicMatcher(TOPICS, {}))
+
+        first = analyzer.analyze("Ich habe meinen  JOB verloren")
+        second = analyzer.analyze("ich habe meinen job verloren ")
+
+        self.assertIs(first, second)
+        self.assertEqual(first.terms[:4], ("job", "arbeitslosigkeit", "arbeitslos", "arbeitsagentur"))
+        self.assertIn("arbeitsagentur", first.synonyms)
+        self.assertNotIn("job", first.synonyms)
+        self.assertIn("unemployment", first.intents)
+
+    def test_lru_is_bounded(self):
+        analyzer = QueryAnalyzer(TopicMatcher(TOPICS, {}), max_entries=2)
+        first = analyzer.analyze("wohngeld")
+        analyzer.analyze("miete")
+        analyzer.analyze("kinderzuschlag")
+
+        self.assertIsNot(analyzer.analyze("wohngeld"), first)
+
+    def test_topic_profiles_rank_by_keyword_hits_then_id(self):
+        analysis = QueryAnalyzer(TopicMatcher(TOPICS, {})).analyze("Bürgergeld vom Jobcenter oder Wohngeld?")
+
+        self.assertEqual([topic["id"] for topic in analysis.topic_profiles], ["buergergeld", "arbeit", "wohngeld"])
+        self.assertIn("buergergeld", analysis.tokens)
+
+    def test_search_terms_fall_back_to_the_query(self):
+        analysis = QueryAnalyzer(TopicMatcher(TOPICS, {})).analyze("Was nun?")
+
+        self.assertEqual(analysis.terms, ())
+        self.assertEqual(analysis.search_terms, ["was nun?"])
+
+    def test_reranker_reuses_the_analysis_topic_context(self):
+        entries = [{"id": "1", "title": "Eintrag", "url": "https://www.arbeitsagentur.de/x", "_term_score": 1}]
+        analysis = retrieval.analyze_query("Buergergeld beantragen")
+
+        with patch.object(retrieval, "_topic_query_context") as context_spy:
+            retrieval._rerank_entries(entries, "Buergergeld beantragen", analysis.search_terms, analysis)
+
+        context_spy.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
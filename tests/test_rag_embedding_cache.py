@@ -0,0 +1,71 @@
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+from crawlers.rag.embedding_cache import QueryEmbeddingCache
+from crawlers.rag.index_docs import RagIndexer
+
+
+class FakeEmbedder:
+    model = "fake-embed"
+
+    def __init__(self):
+        self.calls = []
+
+    def embed_batch(self, texts):
+        self.calls.append(list(texts))
+        return [[float(len(text)), 0.5] for text in texts]
+
+
+def _indexer(cache):
+    with patch("crawlers.rag.index_docs.QdrantClient"):
+        indexer = RagIndexer(embedder=FakeEmbedder(), query_cache=cache)
+    indexer.qdrant = MagicMock()
+    indexer.qdrant.query_points.return_value.points = []
+    return indexer
+
+
+class QueryEmbeddingCacheTests(unittest.TestCase):
+    def test_warm_queries_skip_the_embedder(self):
+        cache = QueryEmbeddingCache(max_entries=8)
+        indexer = _indexer(cache)
+
+        indexer.search("Wohngeld beantragen")
+        indexer.search("  Wohngeld   beantragen ")
+
+        self.assertEqual(indexer.embedder.calls, [["Wohngeld beantragen"]])
+        self.assertEqual(cache.stats()["hits"], 1)
+        self.assertEqual(cache.stats()["misses"], 1)
+
+    def test_batch_embeds_only_the_misses_in_one_call(self):
+        cache = QueryEmbeddingCache(max_entries=8)
+        indexer = _indexer(cache)
+        indexer.embed_queries(["Wohngeld"])
+
+        vectors = indexer.embed_queries(["Kinderzuschlag", "Wohngeld", "Elterngeld"])
+
+        self.assertEqual(indexer.embedder.calls[-1], ["Kinderzuschlag", "Elterngeld"])
+        self.assertEqual(vectors[1], [8.0, 0.5])
+
+    def test_keys_include_the_model_and_lru_is_bounded(self):
+        cache = QueryEmbeddingCache(max_entries=2)
+        cache.set("a", "wohngeld", [1.0])
+        cache.set("b", "wohngeld", [2.0])
+        cache.set("b", "miete", [3.0])
+
+        self.assertIsNone(cache.get("a", "wohngeld"))
+        self.assertEqual(cache.get("b", "wohngeld"), [2.0])
+
+    def test_persisted_vectors_survive_a_restart(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "embeddings.sqlite3"
+            QueryEmbeddingCache(path=path).set("fake-embed", "Wohngeld", [0.1, -0.25, 1e-9])
+
+            restarted = QueryEmbeddingCache(path=path)
+            self.assertEqual(restarted.get("fake-embed", "Wohngeld"), [0.1, -0.25, 1e-9])
+            self.assertEqual(restarted.stats()["diskHits"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,107 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+from crawlers.rag.local_index import META_FILE, LocalRagIndexer, LocalVectorIndex
+from crawlers.rag.schemas import RagChunk
+
+VOCABULARY = ["wohngeld", "miete", "buergergeld", "jobcenter", "kinderzuschlag", "familie"]
+
+
+class FakeEmbedder:
+    model = "fake-embed"
+
+    def embed_batch(self, texts):
+        return [[float(text.lower().count(word)) + 0.01 for word in VOCABULARY] for text in texts]
+
+
+def _chunk(chunk_id, text, source_id="src", layer="official_guidance", trust="tier_2_official", topics=()):
+    return RagChunk(
+        chunk_id=chunk_id,
+        document_id=f"{source_id}-doc",
+        source_id=source_id,
+        title=chunk_id,
+        url=f"https://example.org/{chunk_id}",
+        source_name=source_id,
+        source_trust_level=trust,
+        document_type="merkblatt",
+        knowledge_layer=layer,
+        topics=list(topics),
+        text=text,
+    )
+
+
+class LocalRagIndexerTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.indexer = LocalRagIndexer(directory=self.tmp.name, embedder=FakeEmbedder())
+        self.indexer.index_chunks([
+            _chunk("wohngeld", "Wohngeld hilft bei der Miete", layer="law", trust="tier_1_law", topics=["wohnen"]),
+            _chunk("buergergeld", "Buergergeld beim Jobcenter beantragen", topics=["arbeit"]),
+            _chunk("kiz", "Kinderzuschlag fuer Familie", source_id="fam", topics=["familie"]),
+        ])
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_search_ranks_by_cosine_similarity(self):
+        results = self.indexer.search("Jobcenter: Buergergeld statt Wohngeld", limit=2)
+
+        self.assertEqual([r["chunk_id"] for r in results], ["buergergeld", "wohngeld"])
+        results = self.indexer.search("Wohngeld Miete", limit=1)
+        self.assertAlmostEqual(results[0]["raw_score"], 1.0, places=4)
+        self.assertEqual(results[0]["knowledge_layer"], "law")
+
+    def test_filters_match_the_qdrant_filter(self):
+        by_layer = self.indexer.search("Wohngeld", knowledge_layers=["official_guidance"])
+        by_topic = self.indexer.search("Wohngeld", topics=["familie", "arbeit"])
+        by_trust = self.indexer.search("Familie", min_trust_level="tier_1_law")
+
+        self.assertEqual({r["chunk_id"] for r in by_layer}, {"buergergeld", "kiz"})
+        self.assertEqual({r["chunk_id"] for r in by_topic}, {"buergergeld", "kiz"})
+        self.assertEqual([r["chunk_id"] for r in by_trust], ["wohngeld"])
+        self.assertEqual(self.indexer.search("Wohngeld", topics=["unbekannt"]), [])
+
+    def test_batch_matches_single_searches(self):
+        queries = ["Jobcenter", "Kinderzuschlag Familie"]
+        self.assertEqual(
+            self.indexer.search_batch(queries, limit=3),
+            [self.indexer.search(query, limit=3) for query in queries],
+        )
+
+    def test_reindexing_replaces_rows_and_delete_source_removes_them(self):
+        self.indexer.index_chunks([_chunk("wohngeld", "Kinderzuschlag", layer="law")])
+        self.indexer.delete_source("fam")
+
+        meta = json.loads((Path(self.tmp.name) / META_FILE).read_text())
+        self.assertEqual(meta["count"], 2)
+        results = self.indexer.search("Kinderzuschlag", limit=1)
+        self.assertEqual(results[0]["chunk_id"], "wohngeld")
+        self.assertEqual(results[0]["text"], "Kinderzuschlag")
+
+    def test_uncommitted_bytes_are_ignored_and_dropped_on_append(self):
+        directory = Path(self.tmp.name)
+        with open(directory / "vectors.f32", "ab") as handle:
+            handle.write(b"\x00" * 7)
+        with open(directory / "payloads.jsonl", "ab") as handle:
+            handle.write(b'{"partial": ')
+
+        index = LocalVectorIndex(directory)
+        self.assertEqual(index.count, 3)
+        index.upsert([42], np.ones((1, len(VOCABULARY))), [{"chunk_id": "new"}])
+
+        reopened = LocalVectorIndex(directory)
+        self.assertEqual(reopened.count, 4)
+        self.assertEqual(reopened.payloads[-1], {"chunk_id": "new"})
+
+    def test_empty_index_returns_no_results(self):
+        with tempfile.TemporaryDirectory() as empty:
+            indexer = LocalRagIndexer(directory=empty, embedder=FakeEmbedder())
+            self.assertEqual(indexer.search("Wohngeld"), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
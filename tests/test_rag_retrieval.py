@@ -2,16 +2,23 @@
 Unit tests for hybrid RAG retrieval (backend/ai_service/vector_retrieval.py).
 """
 
+import asyncio
 import json
+import time
 import unittest
 from unittest.mock import MagicMock, patch
 
+from backend.ai_service import retrieval
+from backend.ai_service.circuit_breaker import OPEN, CircuitBreaker
+from backend.ai_service.rerank_features import chunk_token_features, overlap_tokens
+
 from backend.ai_service.vector_retrieval import (
     _rrf_fuse,
     _rrf_score,
-    _token_overlap,
-    hybrid_retrieve,
+    fuse_evidence,
+    VectorLegUnavailable,
     rerank_vector_results,
+    vector_search,
 )
 from backend.ai_service.schemas import Evidence
 
@@ -80,29 +87,6 @@ class RrfFuseTests(unittest.TestCase):
         self.assertEqual(items[shared_url]["_origin"], "hybrid")
 
 
-# ---------------------------------------------------------------------------
-# Token overlap
-# ---------------------------------------------------------------------------
-
-class TokenOverlapTests(unittest.TestCase):
-    def test_exact_match(self):
-        score = _token_overlap("Bürgergeld Antrag", "Bürgergeld Antrag stellen")
-        self.assertEqual(score, 1.0)
-
-    def test_no_match(self):
-        score = _token_overlap("Bürgergeld Antrag", "Steuererklärung Formular")
-        self.assertEqual(score, 0.0)
-
-    def test_partial_match(self):
-        score = _token_overlap("Bürgergeld Antrag Voraussetzungen", "Bürgergeld Frist Antrag")
-        self.assertGreater(score, 0.0)
-        self.assertLess(score, 1.0)
-
-    def test_empty_query(self):
-        score = _token_overlap("", "Bürgergeld Antrag")
-        self.assertEqual(score, 0.0)
-
-
 # ---------------------------------------------------------------------------
 # Reranker
 # ---------------------------------------------------------------------------
@@ -138,37 +122,53 @@ class RerankerTests(unittest.TestCase):
         ranked = rerank_vector_results("query", chunks)
         self.assertIn("final_score", ranked[0])
 
+    def test_stored_tokens_are_used_instead_of_the_text(self):
+        stored = self._make_chunk("tier_2_official", "official_guidance", text="x" * 200)
+        stored["rerank_tokens"] = chunk_token_features("Test", "Bürgergeld beantragen " + "x" * 200)
+        plain = {**self._make_chunk("tier_2_official", "official_guidance"), "chunk_id": "plain"}
 
-# ---------------------------------------------------------------------------
-# hybrid_retrieve
-# ---------------------------------------------------------------------------
+        ranked = rerank_vector_results("Bürgergeld beantragen", [plain, stored])
 
-class HybridRetrieveTests(unittest.TestCase):
-    def _make_keyword_entry(self, entry_id: str) -> dict:
-        return {
-            "id": entry_id,
-            "url": f"https://example.com/{entry_id}",
-            "title": "Keyword Entry",
-            "summary": {"de": "Ein Eintrag aus der Datenbank."},
-        }
+        self.assertIs(ranked[0]["rerank_tokens"], stored["rerank_tokens"])
+        self.assertAlmostEqual(ranked[0]["final_score"] - ranked[1]["final_score"], 0.15)
+
+    def test_scores_match_per_candidate_formula(self):
+        chunks = [
+            {**self._make_chunk("tier_1_law", "law", text="Bürgergeld Antrag kurz"), "title": "Bürgergeld"},
+            {**self._make_chunk("tier_3_ngo", "ngo_guidance", text="Antrag " + "y" * 120), "raw_score": 0.9},
+            {**self._make_chunk("tier_2_official", "official_guidance"), "source_weight": 1.3},
+        ]
+        query = "Bürgergeld Antrag stellen"
+
+        ranked = rerank_vector_results(query, chunks)
+
+        def overlap(candidate):
+            return len(overlap_tokens(query) & overlap_tokens(candidate)) / len(overlap_tokens(query))
+
+        def expected(rec):
+            trust_layer = {"tier_1_law": 1.8 * 1.6, "tier_3_ngo": 1.0 * 0.9, "tier_2_official": 1.5 * 1.4}
+            sw = rec["source_weight"] or trust_layer[rec["source_trust_level"]] / 2.0
+            n = len(rec["text"])
+            cf = 0.72 if n < 60 else 0.88 if n < 140 else 1.0
+            return (
+                rec["raw_score"] * sw * cf
+                + overlap(rec["title"]) * 0.35
+                + overlap(rec["text"]) * 0.15
+            )
+
+        self.assertEqual(
+            [r["chunk_id"] for r in ranked],
+            [r["chunk_id"] for r in sorted(chunks, key=expected, reverse=True)],
+        )
+        for rec in ranked:
+            self.assertAlmostEqual(rec["final_score"], expected(rec))
 
-    def test_fallback_keyword_only_when_rag_disabled(self):
-        entries = [self._make_keyword_entry(f"entry-{i}") for i in range(4)]
-        with patch("backend.ai_service.vector_retrieval._is_rag_enabled", return_value=False):
-            results = hybrid_retrieve("Bürgergeld", entries)
-        self.assertIsInstance(results, list)
-        self.assertGreater(len(results), 0)
-        for ev in results:
-            self.assertIsInstance(ev, Evidence)
 
-    def test_confidence_in_range(self):
-        entries = [self._make_keyword_entry("entry-1")]
-        with patch("backend.ai_service.vector_retrieval._is_rag_enabled", return_value=False):
-            results = hybrid_retrieve("Bürgergeld", entries)
-        for ev in results:
-            self.assertGreaterEqual(ev.confidence, 0.0)
-            self.assertLessEqual(ev.confidence, 1.0)
+# ---------------------------------------------------------------------------
+# Evidence conversion
+# ---------------------------------------------------------------------------
 
+class FuseEvidenceTests(unittest.TestCase):
     def test_rag_chunk_evidence_has_provenance(self):
         """When Qdrant returns chunks, evidence payload must include provenance."""
         fake_chunk = {
@@ -196,7 +196,7 @@ class HybridRetrieveTests(unittest.TestCase):
             patch("backend.ai_service.vector_retrieval._is_rag_enabled", return_value=True),
             patch("backend.ai_service.vector_retrieval._get_indexer", return_value=mock_indexer),
         ):
-            results = hybrid_retrieve("Bürgergeld beantragen", [])
+            results = fuse_evidence([], vector_search("Bürgergeld beantragen"))
 
         self.assertGreater(len(results), 0)
         rag_results = [ev for ev in results if ev.source == "rag"]
@@ -210,12 +210,104 @@ class HybridRetrieveTests(unittest.TestCase):
         self.assertEqual(provenance["source_trust_level"], "tier_2_official")
         self.assertEqual(provenance["knowledge_layer"], "official_guidance")
 
-    def test_returns_list_of_evidence(self):
-        with patch("backend.ai_service.vector_retrieval._is_rag_enabled", return_value=False):
-            results = hybrid_retrieve("query", [])
-        self.assertIsInstance(results, list)
-        # Empty input + RAG disabled → single "no evidence" item or empty
-        # (the function appends a placeholder)
+
+# ---------------------------------------------------------------------------
+# Parallel legs with deadlines (retrieval.retrieve_evidence_with_status)
+# ---------------------------------------------------------------------------
+
+KEYWORD_ENTRY = {"id": "kw-1", "title": "Bürgergeld", "url": "https://example.com/kw-1", "domain": "benefits"}
+VECTOR_CHUNK = {"chunk_id": "c1", "url": "https://example.com/c1", "text": "Bürgergeld", "_score": 0.9}
+
+
+class ParallelLegTests(unittest.TestCase):
+    def _run(self, keyword_delay, vector_delay, vector_error=None):
+        async def keyword_leg(query, domain=None):
+            await asyncio.sleep(keyword_delay)
+            return [dict(KEYWORD_ENTRY)]
+
+        def vector_leg(query):
+            time.sleep(vector_delay)
+            if vector_error is not None:
+                raise vector_error
+            return [dict(VECTOR_CHUNK)]
+
+        with (
+            patch.object(retrieval, "_validated_keyword_leg", side_effect=keyword_leg),
+            patch("backend.ai_service.vector_retrieval.vector_search", side_effect=vector_leg),
+            patch.object(retrieval, "KEYWORD_LEG_TIMEOUT_MS", 150),
+            patch.object(retrieval, "VECTOR_LEG_TIMEOUT_MS", 150),
+        ):
+            return asyncio.run(self._timed())
+
+    async def _timed(self):
+        # Timed inside the loop: asyncio.run also waits for the abandoned worker thread.
+        start = time.perf_counter()
+        evidence, degraded = await retrieval.retrieve_evidence_with_status("Bürgergeld")
+        return evidence, degraded, time.perf_counter() - start
+
+    def test_legs_overlap_instead_of_adding_up(self):
+        evidence, degraded, elapsed = self._run(0.08, 0.08)
+
+        self.assertEqual(degraded, [])
+        self.assertLess(elapsed, 0.15)
+        self.assertEqual({ev.source for ev in evidence}, {"db", "rag"})
+
+    def test_slow_vector_leg_is_dropped_and_marked_degraded(self):
+        evidence, degraded, elapsed = self._run(0.0, 0.5)
+
+        self.assertEqual(degraded, ["vector"])
+        self.assertLess(elapsed, 0.4)
+        self.assertEqual([ev.source for ev in evidence], ["db"])
+
+    def test_missed_vector_deadline_counts_as_a_breaker_failure(self):
+        breaker = CircuitBreaker("vector_leg", min_calls=1, failure_rate=1.0, reset_seconds=60)
+        with patch("backend.ai_service.vector_retrieval.VECTOR_BREAKER", breaker):
+            _, degraded, _ = self._run(0.0, 0.5)
+
+        self.assertEqual(degraded, ["vector"])
+        self.assertEqual(breaker.state, OPEN)
+        self.assertEqual(breaker.status()["lastError"], "vector leg missed its deadline")
+
+    def test_late_vector_outcome_after_a_missed_deadline_is_ignored(self):
+        breaker = CircuitBreaker("vector_leg", min_calls=5, failure_rate=0.5, reset_seconds=60)
+        indexer = MagicMock()
+
+        def slow_search(query, limit):
+            time.sleep(0.5)
+            return [dict(VECTOR_CHUNK)]
+
+        indexer.search.side_effect = slow_search
+        with (
+            patch("backend.ai_service.vector_retrieval.VECTOR_BREAKER", breaker),
+            patch("backend.ai_service.vector_retrieval._get_indexer", return_value=indexer),
+            patch("backend.ai_service.vector_retrieval._is_rag_enabled", return_value=True),
+            patch.object(retrieval, "_validated_keyword_leg", side_effect=self._keyword_leg),
+            patch.object(retrieval, "VECTOR_LEG_TIMEOUT_MS", 150),
+        ):
+            # asyncio.run returns only after the abandoned worker thread finished.
+            _, degraded = asyncio.run(retrieval.retrieve_evidence_with_status("Bürgergeld"))
+
+        self.assertEqual(degraded, ["vector"])
+        indexer.search.assert_called_once()
+        status = breaker.status()
+        self.assertEqual(status["recentCalls"], 1)
+        self.assertEqual(status["recentFailureRate"], 1.0)
+
+    @staticmethod
+    async def _keyword_leg(query, domain=None):
+        return [dict(KEYWORD_ENTRY)]
+
+    def test_slow_keyword_leg_is_dropped_and_marked_degraded(self):
+        evidence, degraded, _ = self._run(0.5, 0.0)
+
+        self.assertEqual(degraded, ["keyword"])
+        self.assertEqual([ev.source for ev in evidence], ["rag"])
+
+    def test_unavailable_vector_leg_is_marked_degraded(self):
+        evidence, degraded, _ = self._run(0.0, 0.0, VectorLegUnavailable("vector leg circuit breaker is open"))
+
+        self.assertEqual(degraded, ["vector"])
+        self.assertEqual([ev.source for ev in evidence], ["db"])
 
 
 if __name__ == "__main__":
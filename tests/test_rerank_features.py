@@ -0,0 +1,79 @@
+import datetime
+import unittest
+
+from backend.ai_service import retrieval
+from backend.ai_service.rerank_features import (
+    CHUNK_TOKENS_VERSION,
+    FEATURES_VERSION,
+    chunk_token_features,
+    compute_rerank_features,
+    usable_chunk_tokens,
+    usable_features,
+)
+
+
+class RerankFeatureTests(unittest.TestCase):
+    def test_features_capture_keywords_hints_host_and_quality(self):
+        features = compute_rerank_features(
+            {
+                "title": {"de": "Kurzarbeitergeld", "en": "Short-time work allowance"},
+                "summary": {"de": "Infos der Arbeitsagentur"},
+                "content": {"de": "Wer Bürgergeld bezieht ..."},
+                "url": "https://www.arbeitsagentur.de/kurzarbeit",
+                "topics": ["employment", "employment"],
+                "qualityScores": {"ais": "0.8", "iqs": None},
+                "domain": "benefits",
+            }
+        )
+
+        self.assertEqual(features["version"], FEATURES_VERSION)
+        self.assertEqual(features["title"], "kurzarbeitergeld")
+        self.assertEqual(features["keywords"], ["buergergeld", "jobcenter"])
+        self.assertEqual(features["hints"], ["kurzarbeit", "kurzarbeitergeld"])
+        self.assertEqual(features["topics"], ["employment"])
+        self.assertEqual(features["host"], "arbeitsagentur.de")
+        self.assertEqual(features["quality"], [0.8, 0.0])
+
+    def test_chunk_tokens_drop_stop_words_and_short_tokens(self):
+        record = chunk_token_features("Der Antrag", "  Wie ist der Antrag auf Bürgergeld zu stellen?  ")
+
+        self.assertEqual(record["version"], CHUNK_TOKENS_VERSION)
+        self.assertEqual(record["title"], ["antrag"])
+        self.assertEqual(record["text"], ["antrag", "bürgergeld", "stellen?", "wie"])
+        self.assertEqual(record["chars"], 45)
+        self.assertIsNone(usable_chunk_tokens({**record, "version": CHUNK_TOKENS_VERSION + 1}))
+
+    def test_stored_records_from_other_versions_are_ignored(self):
+        self.assertIsNone(usable_features({"version": FEATURES_VERSION + 1}))
+        self.assertIsNone(usable_features(None))
+
+    def test_normalize_uses_stored_record_and_only_converts_date_columns(self):
+        stored = compute_rerank_features({"title": "Bürgergeld", "domain": "benefits"})
+        entry = retrieval._normalize_db_entry(
+            {
+                "id": "a",
+                "title_de": "Bürgergeld",
+                "domain": "benefits",
+                "valid_from": datetime.date(2026, 1, 1),
+                "last_seen": datetime.datetime(2026, 2, 1, 12, 30),
+                "provenance": {"crawledAt": "2026-02-01"},
+                "rerank_features": stored,
+            }
+        )
+
+        self.assertIs(entry["_features"], stored)
+        self.assertEqual(entry["validFrom"], "2026-01-01")
+        self.assertEqual(entry["lastSeen"], "2026-02-01T12:30:00")
+
+    def test_rerank_reads_feature_record_not_content(self):
+        plain = {"id": "plain", "title": "Hilfe", "summary": {}, "content": {}, "domain": "aid", "_term_score": 1}
+        flagged = dict(plain, id="flagged")
+        flagged["_features"] = dict(compute_rerank_features(flagged), keywords=["buergergeld"])
+
+        ranked = retrieval._rerank_entries([plain, flagged], "Ich habe meinen Job verloren", ["job"])
+
+        self.assertEqual(ranked[0]["id"], "flagged")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,263 @@
+import asyncio
+import time
+import unittest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from sqlalchemy.exc import OperationalError, ProgrammingError
+
+from backend.ai_service import db, retrieval, telemetry
+
+
+def _row(**overrides):
+    row = {column: None for column in retrieval.ENTRY_COLUMNS}
+    row.update(
+        {
+            "id": "11111111-1111-4111-8111-111111111111",
+            "domain": "benefits",
+            "title_de": "Bürgergeld beantragen",
+            "summary_de": "So stellen Sie den Antrag beim Jobcenter.",
+            "url": "https://www.arbeitsagentur.de/buergergeld",
+            "topics": ["employment"],
+            "tags": [],
+            "target_groups": ["unemployed"],
+            "status": "active",
+            "term_score": 2,
+        }
+    )
+    row.update(overrides)
+    return row
+
+
+class KeywordSearchQueryTests(unittest.TestCase):
+    def setUp(self):
+        retrieval._UNAVAILABLE_QUERY_SHAPES.clear()
+        telemetry.reset_metrics()
+
+    def test_fulltext_query_uses_search_vectors_instead_of_ilike(self):
+        sql, params = retrieval._build_fulltext_query(["buergergeld", "antrag"], "benefits")
+
+        self.assertNotIn("ILIKE", sql)
+        self.assertIn("search_vector_de @@ to_tsquery('german', :tq0)", sql)
+        self.assertIn("search_vector_en @@ to_tsquery('english', :tq1)", sql)
+        self.assertIn(":q0 <% title_de", sql)
+        self.assertNotIn("<% content_de", sql)
+        self.assertIn("ts_rank_cd(", sql)
+        self.assertIn("AND domain = :domain", sql)
+        self.assertEqual(params["tq0"], "buergergeld:*")
+        self.assertEqual(params["q1"], "antrag")
+        self.assertEqual(params["domain"], "benefits")
+
+    def test_tsquery_text_is_prefix_query_and_drops_punctuation(self):
+        self.assertEqual(retrieval._tsquery_text("covid-19"), "covid:* & 19:*")
+        self.assertEqual(retrieval._tsquery_text("Bürgergeld?"), "bürgergeld:*")
+        self.assertIsNone(retrieval._tsquery_text("?!"))
+
+    def test_fulltext_query_keeps_trigram_match_for_untokenizable_terms(self):
+        sql, params = retrieval._build_fulltext_query(["?!"])
+
+        self.assertNotIn("tq0", params)
+        self.assertIn(":q0 <% summary_de", sql)
+        self.assertIn("(0) AS search_rank", sql)
+
+    def test_query_entries_falls_back_to_ilike_when_search_vectors_are_missing(self):
+        session = MagicMock()
+        result = MagicMock()
+        result.mappings.return_value.all.return_value = [_row()]
+        hydrated = MagicMock()
+        hydrated.mappings.return_value.all.return_value = [_row(content_de="Volltext")]
+        session.execute.side_effect = [
+            ProgrammingError("SELECT", {}, Exception("column search_vector_de does not exist")),
+            result,
+            hydrated,
+        ]
+
+        with patch.object(retrieval, "SessionLocal", return_value=session), patch.object(
+            retrieval, "KEYWORD_SEARCH_MODE", "fulltext"
+        ):
+            entries = retrieval.query_entries("Bürgergeld beantragen")
+
+        self.assertEqual(session.execute.call_count, 3)
+        session.rollback.assert_called_once()
+        fallback_sql = str(session.execute.call_args_list[1].args[0])
+        self.assertIn("ILIKE", fallback_sql)
+        self.assertEqual(len(entries), 1)
+        self.assertEqual(entries[0]["title"], "Bürgergeld beantragen")
+        self.assertEqual(entries[0]["summary"]["de"], "So stellen Sie den Antrag beim Jobcenter.")
+        self.assertEqual(entries[0]["content"]["de"], "Volltext")
+        self.assertNotIn("_term_score", entries[0])
+        self.assertNotIn("_features", entries[0])
+        session.close.assert_called_once()
+
+    def test_missing_migration_shape_is_skipped_logged_once_and_counted(self):
+        sessions = []
+
+        def execute(sql, params):
+            if "search_vector_de" in str(sql):
+                raise ProgrammingError("SELECT", {}, Exception("column search_vector_de does not exist"))
+            result = MagicMock()
+            result.mappings.return_value.all.return_value = []
+            return result
+
+        def session_factory():
+            session = MagicMock()
+            session.execute.side_effect = execute
+            sessions.append(session)
+            return session
+
+        with patch.object(retrieval, "SessionLocal", side_effect=session_factory), patch.object(
+            retrieval, "KEYWORD_SEARCH_MODE", "fulltext"
+        ), patch("builtins.print") as printed:
+            retrieval.query_entries("Bürgergeld beantragen")
+            retrieval.query_entries("Wohngeld beantragen")
+
+        fallback_logs = [call for call in printed.call_args_list if "unavailable, falling back" in call.args[0]]
+        self.assertEqual(len(fallback_logs), 1)
+        self.assertEqual(sessions[1].execute.call_count, 1)
+        self.assertIn("ILIKE", str(sessions[1].execute.call_args.args[0]))
+        counters = telemetry.snapshot()["counters"]
+        self.assertEqual(counters["retrieval.keyword_query_fallbacks"], 1)
+        self.assertEqual(counters["retrieval.keyword_query_shapes_skipped"], 1)
+
+    def test_rejected_shape_is_retried_after_the_retry_window(self):
+        session = MagicMock()
+        session.execute.side_effect = [
+            ProgrammingError("SELECT", {}, Exception("column search_vector_de does not exist")),
+            MagicMock(),
+        ]
+        with patch.object(retrieval, "KEYWORD_SEARCH_MODE", "fulltext"), patch("builtins.print"):
+            retrieval._fetch_keyword_rows(session, ["wohngeld"])
+            later = time.monotonic() + retrieval.QUERY_SHAPE_RETRY_SECONDS + 1
+            with patch.object(retrieval.time, "monotonic", return_value=later):
+                name = list(retrieval._keyword_query_attempts(["wohngeld"]))[0][0]
+
+        self.assertEqual(name, "_build_fulltext_query(ingest_columns=True)")
+
+    def test_operational_error_falls_back_without_marking_the_shape(self):
+        session = MagicMock()
+        session.execute.side_effect = [
+            OperationalError("SELECT", {}, Exception("canceling statement due to statement timeout")),
+            MagicMock(),
+        ]
+        with patch.object(retrieval, "KEYWORD_SEARCH_MODE", "fulltext"), patch("builtins.print"):
+            retrieval._fetch_keyword_rows(session, ["wohngeld"])
+
+        session.rollback.assert_called_once()
+        self.assertEqual(retrieval._UNAVAILABLE_QUERY_SHAPES, {})
+        self.assertEqual(telemetry.snapshot()["counters"]["retrieval.keyword_query_fallbacks"], 1)
+
+    def test_aquery_entries_runs_sync_path_in_thread_without_asyncpg(self):
+        with patch.object(retrieval, "get_async_engine", return_value=None), patch.object(
+            retrieval, "query_entries", return_value=[{"id": "x"}]
+        ) as sync_query:
+            entries = asyncio.run(retrieval.aquery_entries("Bürgergeld", "benefits"))
+
+        sync_query.assert_called_once_with("Bürgergeld", "benefits")
+        self.assertEqual(entries, [{"id": "x"}])
+
+    def test_aquery_entries_hydrates_projected_rows_on_asyncpg(self):
+        candidates = MagicMock()
+        candidates.mappings.return_value.all.return_value = [_row()]
+        hydrated = MagicMock()
+        hydrated.mappings.return_value.all.return_value = [_row(content_de="Volltext")]
+        conn = MagicMock()
+        conn.execute = AsyncMock(side_effect=[candidates, hydrated])
+        engine = MagicMock()
+        engine.connect.return_value.__aenter__ = AsyncMock(return_value=conn)
+        engine.connect.return_value.__aexit__ = AsyncMock(return_value=False)
+
+        with patch.object(retrieval, "get_async_engine", return_value=engine), patch.object(
+            retrieval, "_snapshot_entries", return_value=None
+        ):
+            entries = asyncio.run(retrieval.aquery_entries("Bürgergeld beantragen"))
+
+        self.assertEqual(conn.execute.await_count, 2)
+        hydrate_call = conn.execute.await_args_list[1]
+        self.assertIn("id = ANY(CAST(:ids AS uuid[]))", str(hydrate_call.args[0]))
+        self.assertEqual(hydrate_call.args[1], {"ids": ["11111111-1111-4111-8111-111111111111"]})
+        self.assertEqual(len(entries), 1)
+        self.assertEqual(entries[0]["content"]["de"], "Volltext")
+
+    def test_async_database_url_uses_asyncpg_with_statement_cache(self):
+        url = db._async_database_url("postgresql://user:pw@127.0.0.1:5432/systemfehler")
+
+        self.assertEqual(url.drivername, "postgresql+asyncpg")
+        self.assertEqual(url.database, "systemfehler")
+        self.assertEqual(url.query["prepared_statement_cache_size"], str(db.DB_STATEMENT_CACHE_SIZE))
+
+    def test_candidate_query_projects_ranking_columns_and_hydrates_top_k(self):
+        sql, _ = retrieval._build_fulltext_query(["buergergeld"])
+        select_list = sql.split("FROM entries")[0]
+
+        self.assertIn("rerank_features", select_list)
+        self.assertIn("THEN content_de END AS content_de", select_list)
+        self.assertNotIn("translations", select_list)
+        self.assertNotIn("content_easy_de", select_list)
+        self.assertIn("id = ANY(CAST(:ids AS uuid[]))", retrieval.HYDRATE_SQL)
+
+        ranked = [
+            {"id": "b", "_schema_checked": True, "_features": {}},
+            {"id": "a", "_schema_checked": False},
+            {"id": "gone"},
+        ]
+        with patch.object(retrieval, "compute_rerank_features") as featurize:
+            hydrated = retrieval._hydrate_ranked(ranked, [_row(id="a"), _row(id="b", content_de="Volltext")])
+
+        featurize.assert_not_called()
+
+        self.assertEqual([entry["id"] for entry in hydrated], ["b", "a"])
+        self.assertEqual(hydrated[0]["content"]["de"], "Volltext")
+        self.assertTrue(hydrated[0]["_schema_checked"])
+        self.assertNotIn("_features", hydrated[0])
+
+    def test_batch_query_unions_prefixed_per_query_statements(self):
+        attempts = list(retrieval._batch_keyword_query_attempts([["wohngeld"], ["kinderzuschlag", "antrag"]], "benefits"))
+        name, sql, params, projected = attempts[0]
+        single_sql, _ = retrieval._build_fulltext_query(["wohngeld"], "benefits", prefix="b0_", positioned=True)
+
+        self.assertTrue(projected)
+        self.assertEqual(name, "_build_fulltext_query(ingest_columns=True)")
+        self.assertEqual(sql.count("UNION ALL"), 1)
+        self.assertIn(single_sql, sql)
+        self.assertTrue(sql.rstrip().endswith("ORDER BY qidx, position"))
+        self.assertEqual(params["b0_q0"], "wohngeld")
+        self.assertEqual(params["b1_tq1"], "antrag:*")
+        self.assertEqual(len(attempts), len(list(retrieval._keyword_query_attempts(["wohngeld"]))))
+
+    def test_batch_position_follows_the_single_query_order(self):
+        for builder in (retrieval._build_fulltext_query, retrieval._build_ilike_query):
+            for ingest_columns in (True, False):
+                single_sql, _ = builder(["wohngeld", "antrag"], "benefits", ingest_columns=ingest_columns)
+                positioned_sql, _ = builder(
+                    ["wohngeld", "antrag"], "benefits", ingest_columns=ingest_columns, positioned=True
+                )
+                order = single_sql.split("ORDER BY", 1)[1].split("LIMIT")[0].strip()
+                window = positioned_sql.split("row_number() OVER (ORDER BY", 1)[1].split(") AS position")[0].strip()
+
+                self.assertEqual(window, order)
+                self.assertTrue(order.endswith("id"))
+                self.assertEqual(positioned_sql.split("FROM entries", 1)[1], single_sql.split("FROM entries", 1)[1])
+                self.assertNotIn("OVER ()", positioned_sql)
+
+    def test_query_entries_batch_splits_rows_and_hydrates_once(self):
+        session = MagicMock()
+        candidates = MagicMock()
+        candidates.mappings.return_value.all.return_value = [
+            _row(id="a", qidx=0, position=1),
+            _row(id="b", qidx=1, position=1),
+            _row(id="a", qidx=1, position=2, term_score=1),
+        ]
+        hydrate = MagicMock()
+        hydrate.mappings.return_value.all.return_value = [_row(id="a"), _row(id="b")]
+        session.execute.side_effect = [candidates, hydrate]
+
+        with patch.object(retrieval, "SessionLocal", return_value=session):
+            results = retrieval.query_entries_batch(["Bürgergeld", "Bürgergeld Antrag"])
+
+        self.assertEqual([[entry["id"] for entry in ranked] for ranked in results], [["a"], ["b", "a"]])
+        self.assertEqual(session.execute.call_count, 2)
+        self.assertEqual(sorted(session.execute.call_args_list[1].args[1]["ids"]), ["a", "b"])
+        self.assertNotIn("qidx", results[0][0])
+
+
+if __name__ == "__main__":
+    unittest.main()
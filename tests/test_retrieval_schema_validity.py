@@ -0,0 +1,100 @@
+import asyncio
+import datetime
+import unittest
+from unittest.mock import MagicMock, patch
+
+from sqlalchemy.exc import ProgrammingError
+
+from backend.ai_service import retrieval, telemetry
+from crawlers.shared.validator import SchemaValidator, schema_fingerprint
+
+
+VALID_ENTRY = {
+    "id": "11111111-1111-4111-8111-111111111111",
+    "title": "Bürgergeld beantragen",
+    "summary": {"de": "So stellen Sie den Antrag beim Jobcenter."},
+    "url": "https://www.arbeitsagentur.de/buergergeld",
+    "status": "active",
+    "provenance": {"source": "arbeitsagentur.de", "crawledAt": "2026-01-01T00:00:00Z"},
+}
+
+
+class SchemaValidityTests(unittest.TestCase):
+    def setUp(self):
+        telemetry.reset_metrics()
+        retrieval._UNAVAILABLE_QUERY_SHAPES.clear()
+
+    def test_fingerprint_matches_import_side_and_ignores_key_order(self):
+        schema = retrieval.load_core_schema()
+        reordered = dict(reversed(list(schema.items())))
+
+        self.assertEqual(schema_fingerprint(reordered), retrieval.core_schema_fingerprint())
+        self.assertEqual(SchemaValidator("data/_schemas").core_schema_fingerprint, retrieval.core_schema_fingerprint())
+
+    def test_import_flag_matches_the_online_verdict(self):
+        from crawlers import cli
+
+        validator = SchemaValidator("data/_schemas")
+        crawled = dict(VALID_ENTRY, firstSeen="2026-01-01T08:00:00Z", lastSeen="2026-01-02T08:00:00Z")
+        for entry in (VALID_ENTRY, crawled):
+            row = cli._entry_row(entry, "benefits")
+            # What the sidecar reads back: TIMESTAMP columns arrive as datetimes.
+            stored = {column: row[column] for column in retrieval.ENTRY_COLUMNS}
+            if entry.get("firstSeen"):
+                stored["first_seen"] = datetime.datetime(2026, 1, 1, 8, 0)
+                stored["last_seen"] = datetime.datetime(2026, 1, 2, 8, 0)
+            online = retrieval._normalize_db_entry(stored)
+            online.pop("_features")
+
+            self.assertEqual(cli._is_core_valid_row(validator, row), retrieval.validate_entry(online))
+        # A missing firstSeen is read back as null, which the core schema rejects.
+        self.assertTrue(validator.is_core_valid(VALID_ENTRY))
+        self.assertFalse(cli._is_core_valid_row(validator, cli._entry_row(VALID_ENTRY, "benefits")))
+
+    def test_keyword_queries_filter_on_precomputed_validity(self):
+        sql, params = retrieval._build_fulltext_query(["buergergeld"], "benefits")
+        self.assertIn("schema_valid IS NOT FALSE", sql)
+        self.assertIn("schema_valid, schema_fingerprint", sql)
+        self.assertEqual(params["schema_fingerprint"], retrieval.core_schema_fingerprint())
+
+        sql, params = retrieval._build_ilike_query(["buergergeld"], ingest_columns=False)
+        self.assertNotIn("schema_valid", sql)
+        self.assertNotIn("schema_fingerprint", params)
+
+    def test_falls_back_to_unflagged_query_when_columns_are_missing(self):
+        session = MagicMock()
+        result = MagicMock()
+        result.mappings.return_value.all.return_value = []
+        missing = ProgrammingError("SELECT", {}, Exception("column schema_valid does not exist"))
+        session.execute.side_effect = [missing, missing, result]
+
+        with patch.object(retrieval, "KEYWORD_SEARCH_MODE", "fulltext"):
+            retrieval._fetch_keyword_rows(session, ["buergergeld"])
+
+        last_sql = str(session.execute.call_args_list[-1].args[0])
+        self.assertIn("search_vector_de", last_sql)
+        self.assertNotIn("schema_valid", last_sql)
+        self.assertEqual(session.rollback.call_count, 2)
+
+    def test_retrieve_evidence_skips_checked_rows_and_counts_invalid_ones(self):
+        checked = dict(VALID_ENTRY, _schema_checked=True)
+        unchecked_valid = dict(VALID_ENTRY, _schema_checked=False)
+        unchecked_invalid = dict(VALID_ENTRY, status="unknown", _schema_checked=False)
+
+        with patch.object(
+            retrieval, "aquery_entries", return_value=[checked, unchecked_valid, unchecked_invalid]
+        ), patch(
+            "backend.ai_service.vector_retrieval.vector_search", side_effect=RuntimeError("no qdrant")
+        ), patch.object(retrieval, "_core_schema_validator", wraps=retrieval._core_schema_validator) as compiled:
+            evidence, _ = asyncio.run(retrieval.retrieve_evidence_with_status("Bürgergeld beantragen"))
+
+        self.assertEqual(len(evidence), 2)
+        self.assertNotIn("_schema_checked", evidence[0].content)
+        self.assertEqual(compiled.call_count, 2)
+        counters = telemetry.snapshot()["counters"]
+        self.assertEqual(counters["retrieval.entries_validated_online"], 2)
+        self.assertEqual(counters["retrieval.entries_schema_invalid"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
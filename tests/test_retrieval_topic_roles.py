@@ -2,6 +2,7 @@ import unittest
 from unittest.mock import patch
 
 from backend.ai_service import retrieval
+from backend.ai_service.topic_matcher import KeywordAutomaton, TopicMatcher
 
 
 class RetrievalTopicRoleTests(unittest.TestCase):
@@ -69,6 +70,44 @@ class RetrievalTopicRoleTests(unittest.TestCase):
 
         self.assertGreaterEqual(boost, 5.0)
 
+    def test_keyword_automaton_reports_overlapping_keywords(self):
+        automaton = KeywordAutomaton(["buergergeld", "geld", "elterngeld", "kind"])
+
+        found = automaton.find("wie viel elterngeld und buergergeld bekommt mein kind?")
+
+        self.assertEqual(found, {"buergergeld", "geld", "elterngeld", "kind"})
+        self.assertEqual(automaton.find("wohnung"), set())
+
+    def test_topic_matcher_host_index_matches_subdomains_only(self):
+        registry = [
+            {
+                "id": "buergergeld",
+                "keywords": ["buergergeld"],
+                "sources": [{"sourceId": "arbeitsagentur", "role": "official_rule_source"}],
+            }
+        ]
+        matcher = TopicMatcher(registry, {"arbeitsagentur": "arbeitsagentur.de"})
+        context = matcher.query_context("Buergergeld", ["buergergeld"], set())
+
+        self.assertEqual(matcher.boost("web.arbeitsagentur.de", "", context), 4.0)
+        self.assertEqual(matcher.boost("arbeitsagentur.de", "", context), 4.0)
+        self.assertEqual(matcher.boost("fake-arbeitsagentur.de", "", context), 0.0)
+        self.assertEqual(
+            matcher.boost("arbeitsagentur.de", "", matcher.query_context("Wohngeld", ["wohngeld"], set())),
+            0.0,
+        )
+
+    def test_rerank_builds_topic_context_once_per_query(self):
+        entries = [
+            {"id": str(index), "title": f"Eintrag {index}", "url": "https://www.arbeitsagentur.de/x", "_term_score": 1}
+            for index in range(5)
+        ]
+
+        with patch.object(retrieval, "_topic_query_context", wraps=retrieval._topic_query_context) as context_spy:
+            retrieval._rerank_entries(entries, "Buergergeld beantragen", ["buergergeld", "beantragen"])
+
+        self.assertEqual(context_spy.call_count, 1)
+
 
 if __name__ == "__main__":
     unittest.main()
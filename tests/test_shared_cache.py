@@ -0,0 +1,121 @@
+import sqlite3
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from backend.ai_service.cache import ResponseCache, cache_key
+from backend.ai_service.shared_cache import SharedCacheStore, SQLiteCacheStore, get_shared_store
+
+
+class DictStore(SharedCacheStore):
+    name = "dict"
+
+    def __init__(self):
+        self.rows = {}
+
+    def get(self, key):
+        row = self.rows.get(key)
+        return row if row is not None and row[1] > time.time() else None
+
+    def set(self, key, value, expires_at, fresh_until=None):
+        self.rows[key] = (value, expires_at, expires_at if fresh_until is None else fresh_until)
+
+
+class SQLiteCacheStoreTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp.name) / "l2.sqlite3"
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_entries_are_visible_to_another_connection(self):
+        writer = SQLiteCacheStore(self.path)
+        writer.set("synthesize::m::q::fp", {"answer": "Wohngeld"}, time.time() + 60)
+        self.assertTrue(writer.flush(timeout=5))
+
+        value, expires_at, fresh_until = SQLiteCacheStore(self.path).get("synthesize::m::q::fp")
+
+        self.assertEqual(value, {"answer": "Wohngeld"})
+        self.assertGreater(expires_at, time.time())
+        self.assertEqual(fresh_until, expires_at)
+
+    def test_expired_rows_are_not_served_and_are_swept(self):
+        store = SQLiteCacheStore(self.path, max_rows=2)
+        store.set("old", {"v": 0}, time.time() - 1)
+        for i in range(3):
+            store.set(f"k{i}", {"v": i}, time.time() + 60 + i)
+        store.flush(timeout=5)
+
+        self.assertIsNone(store.get("old"))
+        self.assertEqual(store.sweep(), 2)
+        self.assertIsNone(store.get("k0"))
+        self.assertIsNotNone(store.get("k2"))
+
+    def test_set_and_get_do_not_wait_for_another_writer(self):
+        store = SQLiteCacheStore(self.path, read_timeout=0.05)
+        other_worker = sqlite3.connect(str(self.path))
+        other_worker.execute("BEGIN IMMEDIATE")
+        try:
+            start = time.perf_counter()
+            store.set("k", {"v": 1}, time.time() + 60)
+            self.assertIsNone(store.get("k"))
+            self.assertLess(time.perf_counter() - start, 0.5)
+            self.assertFalse(store.flush(timeout=0.1))
+        finally:
+            other_worker.rollback()
+            other_worker.close()
+
+        self.assertTrue(store.flush(timeout=5))
+        self.assertEqual(store.get("k")[0], {"v": 1})
+        self.assertEqual(store.stats()["pendingWrites"], 0)
+
+    def test_full_write_queue_drops_writes_instead_of_blocking(self):
+        store = SQLiteCacheStore(self.path, queue_size=1)
+        other_worker = sqlite3.connect(str(self.path))
+        other_worker.execute("BEGIN IMMEDIATE")
+        try:
+            for i in range(5):
+                store.set(f"k{i}", {"v": i}, time.time() + 60)
+        finally:
+            other_worker.rollback()
+            other_worker.close()
+
+        store.flush(timeout=5)
+        self.assertGreater(store.stats()["droppedWrites"], 0)
+
+    def test_factory_selects_store_from_env(self):
+        with patch.dict("os.environ", {"AI_CACHE_L2": "none"}):
+            self.assertIsNone(get_shared_store())
+        with patch.dict("os.environ", {"AI_CACHE_L2": "sqlite", "AI_CACHE_L2_PATH": str(self.path)}):
+            self.assertIsInstance(get_shared_store(), SQLiteCacheStore)
+        with patch.dict("os.environ", {"AI_CACHE_L2": "backend.ai_service.shared_cache:SharedCacheStore"}):
+            self.assertIs(type(get_shared_store()), SharedCacheStore)
+        with patch.dict("os.environ", {"AI_CACHE_L2": "no.such.module:Store"}):
+            self.assertIsNone(get_shared_store())
+
+
+class ResponseCacheL2Tests(unittest.TestCase):
+    def test_l1_miss_reads_through_and_keeps_the_remaining_ttl(self):
+        store = DictStore()
+        key = cache_key("synthesize", "m", "q", "fp")
+        ResponseCache(budgets={"synthesize": 10000}, l2=store).set(key, {"answer": "a"}, 60)
+
+        other_worker = ResponseCache(budgets={"synthesize": 10000}, l2=store)
+        self.assertEqual(other_worker.get(key), {"answer": "a"})
+        del store.rows[key]
+        self.assertEqual(other_worker.get(key), {"answer": "a"})
+
+        with patch("backend.ai_service.cache.time.time", return_value=time.time() + 120):
+            self.assertIsNone(other_worker.get(key))
+
+    def test_without_l2_misses_stay_misses(self):
+        cache = ResponseCache(budgets={})
+        self.assertIsNone(cache.get(cache_key("rewrite", "m", "q")))
+        self.assertIsNone(cache.l2_stats())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,104 @@
+import asyncio
+import unittest
+from unittest.mock import patch
+
+from backend.ai_service import endpoints, telemetry
+from backend.ai_service.cache import ai_cache
+from backend.ai_service.schemas import Evidence, QueryRequest
+from backend.ai_service.singleflight import SingleFlight
+
+
+class SingleFlightTests(unittest.TestCase):
+    def setUp(self):
+        telemetry.reset_metrics()
+
+    def test_identical_calls_share_one_computation(self):
+        flight = SingleFlight()
+        calls = []
+
+        async def compute():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return {"answer": "Wohngeld"}
+
+        async def main():
+            return await asyncio.gather(*(flight.run("synthesize::m::q::fp", compute) for _ in range(5)))
+
+        results = asyncio.run(main())
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [{"answer": "Wohngeld"}] * 5)
+        self.assertEqual(flight.in_flight(), 0)
+        counters = telemetry.snapshot()["counters"]
+        self.assertEqual(counters["singleflight.synthesize.leaders"], 1)
+        self.assertEqual(counters["singleflight.synthesize.coalesced"], 4)
+
+    def test_errors_reach_every_waiter_and_the_next_call_recomputes(self):
+        flight = SingleFlight()
+        calls = []
+
+        async def failing():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            raise RuntimeError("provider down")
+
+        async def main():
+            first = await asyncio.gather(*(flight.run("k", failing) for _ in range(3)), return_exceptions=True)
+            second = await asyncio.gather(flight.run("k", failing), return_exceptions=True)
+            return first + second
+
+        results = asyncio.run(main())
+
+        self.assertEqual(len(calls), 2)
+        self.assertTrue(all(isinstance(result, RuntimeError) for result in results))
+
+    def test_cancelled_leader_does_not_cancel_followers(self):
+        flight = SingleFlight()
+
+        async def compute():
+            await asyncio.sleep(0.02)
+            return "done"
+
+        async def main():
+            leader = asyncio.ensure_future(flight.run("k", compute))
+            await asyncio.sleep(0)
+            follower = asyncio.ensure_future(flight.run("k", compute))
+            await asyncio.sleep(0)
+            leader.cancel()
+            return await follower
+
+        self.assertEqual(asyncio.run(main()), "done")
+
+
+class SynthesizeCoalescingTests(unittest.TestCase):
+    def setUp(self):
+        ai_cache.clear()
+
+    def test_concurrent_identical_questions_call_the_provider_once(self):
+        evidence = [Evidence(source="https://example.org", content='{"title": "Wohngeld"}', confidence=0.9)]
+        retrievals = []
+
+        async def fake_retrieve(query, domain=None):
+            retrievals.append(query)
+            await asyncio.sleep(0.01)
+            return evidence, []
+
+        async def main():
+            return await asyncio.gather(
+                *(endpoints.synthesize_answer(QueryRequest(query=q)) for q in ["Wohngeld", "wohngeld ", "WOHNGELD"])
+            )
+
+        with patch.object(endpoints, "LOCAL_SYNTHESIS_STRATEGY", "llm"), patch.object(
+            endpoints, "retrieve_evidence_with_status", side_effect=fake_retrieve
+        ), patch.object(endpoints.provider, "is_configured", return_value=True), patch.object(
+            endpoints.provider, "agenerate_text", return_value={"text": "Antwort", "usage": {}}
+        ) as generate:
+            responses = asyncio.run(main())
+
+        self.assertEqual(len(retrievals), 1)
+        self.assertEqual(generate.call_count, 1)
+        self.assertEqual({response.answer for response in responses}, {"Antwort"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,107 @@
+import unittest
+
+from backend.ai_service import retrieval
+from backend.ai_service.snapshot_index import SnapshotIndex, SnapshotStore, fold
+
+
+def _row(entry_id, title, domain="benefits", tier="tier_1_official", ais=0.5, **overrides):
+    row = {column: None for column in retrieval.ENTRY_COLUMNS}
+    row.update(
+        {
+            "id": entry_id,
+            "domain": domain,
+            "title_de": title,
+            "url": f"https://example.org/{entry_id}",
+            "status": "active",
+            "provenance": {"sourceTier": tier},
+            "quality_scores": {"ais": ais},
+        }
+    )
+    row.update(overrides)
+    return row
+
+
+def _index(rows, version=1):
+    return SnapshotIndex(rows, version, retrieval.TEXT_COLUMNS, retrieval._normalize_db_entry)
+
+
+class SnapshotIndexTests(unittest.TestCase):
+    def setUp(self):
+        self.rows = [
+            _row("a", "Bürgergeld beantragen", summary_de="Antrag beim Jobcenter"),
+            _row("b", "Arbeitslosengeld", tier="tier_3_press", summary_de="Arbeitslos melden"),
+            _row("c", "Kinderzuschlag", domain="tools", summary_de="Familien mit kleinem Einkommen"),
+            _row("d", "COVID-19 Soforthilfe", ais=0.9),
+        ]
+
+    def test_matches_substrings_and_folded_umlauts_like_ilike(self):
+        index = _index(self.rows)
+
+        self.assertEqual([entry["id"] for entry in index.search(["buergergeld"])], ["a"])
+        self.assertEqual([entry["id"] for entry in index.search(["arbeitslos"])], ["b"])
+        self.assertEqual([entry["id"] for entry in index.search(["covid-19"])], ["d"])
+        self.assertEqual(index.search(["covid-20"]), [])
+        self.assertEqual(fold("Straße Ärger"), "strasse aerger")
+
+    def test_orders_by_term_count_then_sql_quality_ordering(self):
+        index = _index(self.rows)
+
+        results = index.search(["antrag", "arbeitslos", "jobcenter"])
+        self.assertEqual([entry["id"] for entry in results], ["a", "b"])
+        self.assertEqual(results[0]["_term_score"], 2)
+
+        results = index.search(["geld"])
+        self.assertEqual([entry["id"] for entry in results], ["a", "b"])
+
+    def test_filters_domain_and_rows_invalid_for_current_schema(self):
+        rows = self.rows + [
+            _row("e", "Kinderzuschlag alt", domain="tools", schema_valid=False, schema_fingerprint="current"),
+            _row("f", "Kinderzuschlag neu", domain="tools", schema_valid=False, schema_fingerprint="older"),
+            _row("g", "Kinderzuschlag ok", domain="tools", schema_valid=True, schema_fingerprint="current"),
+        ]
+        index = _index(rows)
+
+        results = index.search(["kinderzuschlag"], domain="tools", schema_fingerprint="current")
+        self.assertEqual(sorted(entry["id"] for entry in results), ["c", "f", "g"])
+        checked = {entry["id"]: entry["_schema_checked"] for entry in results}
+        self.assertEqual(checked, {"c": False, "f": False, "g": True})
+        self.assertEqual(index.search(["kinderzuschlag"], domain="benefits"), [])
+
+    def test_search_returns_copies_of_normalized_entries(self):
+        index = _index(self.rows)
+
+        first = index.search(["kinderzuschlag"])[0]
+        first.pop("_term_score")
+        first["title"] = "changed"
+
+        self.assertEqual(index.search(["kinderzuschlag"])[0]["title"], "Kinderzuschlag")
+
+
+class SnapshotStoreTests(unittest.TestCase):
+    def test_rebuilds_only_when_version_changes(self):
+        versions = iter([1, 1, 2])
+        builds = []
+
+        def build(version):
+            builds.append(version)
+            return _index([_row("a", "Wohngeld")], version)
+
+        store = SnapshotStore(lambda: next(versions), build, poll_seconds=3600)
+
+        self.assertTrue(store.refresh())
+        self.assertFalse(store.refresh())
+        self.assertTrue(store.refresh())
+        self.assertEqual(builds, [1, 2])
+        self.assertEqual(store.index.version, 2)
+
+    def test_keeps_previous_snapshot_when_reload_fails(self):
+        store = SnapshotStore(lambda: 1, lambda version: _index([_row("a", "Wohngeld")], version), 3600)
+        store.refresh()
+
+        store._load_version = lambda: (_ for _ in ()).throw(RuntimeError("db down"))
+        self.assertFalse(store.refresh())
+        self.assertEqual(len(store.index), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,242 @@
+import asyncio
+import time
+import unittest
+from unittest.mock import patch
+
+from backend.ai_service import endpoints
+from backend.ai_service.cache import (
+    CACHE_TTL_DEGRADED,
+    ResponseCache,
+    TTLCache,
+    ai_cache,
+    cache_key,
+    fingerprint_evidence,
+    normalize_query,
+)
+from backend.ai_service.provider import AIProviderError
+from backend.ai_service.schemas import AnswerResponse, Evidence, QueryRequest
+from backend.ai_service.semantic_cache import SemanticAnswerIndex
+
+EVIDENCE = [Evidence(source="https://example.org", content='{"title": "Wohngeld"}', confidence=0.9)]
+
+
+def _answer(text, fallback=False):
+    return AnswerResponse(
+        answer=text,
+        explanation="",
+        sources=[],
+        provider="openai",
+        model="m",
+        latency_ms=1,
+        fallback=fallback,
+        evidence=EVIDENCE,
+    )
+
+
+class SoftTTLTests(unittest.TestCase):
+    def test_entries_turn_stale_after_the_soft_ttl_and_expire_after_the_hard_ttl(self):
+        cache = TTLCache()
+        cache.set("k", {"v": 1}, ttl_seconds=100, soft_ttl_seconds=10)
+        now = time.time()
+
+        self.assertGreater(cache.lookup("k")[2], now)
+        with patch("backend.ai_service.cache.time.time", return_value=now + 50):
+            value, _, fresh_until = cache.lookup("k")
+            self.assertEqual(value, {"v": 1})
+            self.assertLess(fresh_until, now + 50)
+        with patch("backend.ai_service.cache.time.time", return_value=now + 150):
+            self.assertIsNone(cache.lookup("k"))
+        self.assertEqual(cache.stats()["stale"], 1)
+
+    def test_response_cache_reports_freshness(self):
+        cache = ResponseCache(budgets={"synthesize": 10000})
+        cache.set("synthesize::a", {"v": 1}, 100, 10)
+        cache.set("synthesize::b", {"v": 2}, 100)
+
+        self.assertEqual(cache.lookup("synthesize::a"), ({"v": 1}, True))
+        with patch("backend.ai_service.cache.time.time", return_value=time.time() + 50):
+            self.assertEqual(cache.lookup("synthesize::a"), ({"v": 1}, False))
+            self.assertEqual(cache.lookup("synthesize::b"), ({"v": 2}, True))
+
+
+class _SynthesizeTestCase(unittest.TestCase):
+    def setUp(self):
+        ai_cache.clear()
+        self.model = endpoints.model_router.route("synthesize", explicit_escalation=False)
+        self.key = cache_key("synthesize", self.model, normalize_query("Wohngeld"), fingerprint_evidence(EVIDENCE))
+        self.patches = [
+            patch.object(endpoints, "LOCAL_SYNTHESIS_STRATEGY", "llm"),
+            patch.object(endpoints, "retrieve_evidence_with_status", return_value=(EVIDENCE, [])),
+            patch.object(endpoints.provider, "is_configured", return_value=True),
+        ]
+        for p in self.patches:
+            p.start()
+
+    def tearDown(self):
+        for p in self.patches:
+            p.stop()
+
+
+class StaleWhileRevalidateTests(_SynthesizeTestCase):
+    def _ask_and_drain(self):
+        async def main():
+            response = await endpoints.synthesize_answer(QueryRequest(query="Wohngeld"))
+            while endpoints._background_refreshes:
+                await asyncio.gather(*endpoints._background_refreshes, return_exceptions=True)
+            return response
+
+        return asyncio.run(main())
+
+    def test_stale_answer_is_served_and_refreshed_in_the_background(self):
+        ai_cache.set(self.key, _answer("alt").model_dump(), 100, 0)
+
+        with patch.object(
+            endpoints.provider, "agenerate_text", return_value={"text": "neu", "usage": {}}
+        ) as generate:
+            response = self._ask_and_drain()
+
+        self.assertEqual(response.answer, "alt")
+        self.assertEqual(generate.call_count, 1)
+        value, fresh = ai_cache.lookup(self.key)
+        self.assertEqual(value["answer"], "neu")
+        self.assertTrue(fresh)
+
+    def test_failed_refresh_keeps_serving_the_stale_answer(self):
+        ai_cache.set(self.key, _answer("alt").model_dump(), 100, 0)
+
+        with patch.object(endpoints.provider, "agenerate_text", side_effect=AIProviderError("down")):
+            response = self._ask_and_drain()
+
+        self.assertEqual(response.answer, "alt")
+        value, fresh = ai_cache.lookup(self.key)
+        self.assertEqual(value["answer"], "alt")
+        self.assertFalse(fresh)
+
+    def test_fresh_answer_does_not_trigger_a_refresh(self):
+        ai_cache.set(self.key, _answer("alt").model_dump(), 100, 50)
+
+        with patch.object(endpoints.provider, "agenerate_text") as generate:
+            response = self._ask_and_drain()
+
+        self.assertEqual(response.answer, "alt")
+        generate.assert_not_called()
+
+
+class SemanticAnswerIndexTests(unittest.TestCase):
+    def test_similar_query_with_the_same_evidence_matches(self):
+        index = SemanticAnswerIndex(threshold=0.9)
+        index.remember("m", "fp", [1.0, 0.0, 0.1], "synthesize::m::job verloren::fp")
+
+        key, similarity = index.match("m", "fp", [0.9, 0.05, 0.1])
+
+        self.assertEqual(key, "synthesize::m::job verloren::fp")
+        self.assertGreater(similarity, 0.9)
+        self.assertIsNone(index.match("m", "other-fp", [0.9, 0.05, 0.1]))
+        self.assertIsNone(index.match("other-model", "fp", [0.9, 0.05, 0.1]))
+        self.assertIsNone(index.match("m", "fp", [0.0, 1.0, 0.0]))
+        self.assertEqual(index.stats()["hits"], 1)
+
+    def test_oldest_groups_are_dropped(self):
+        index = SemanticAnswerIndex(max_groups=2)
+        for fp in ("a", "b", "c"):
+            index.remember("m", fp, [1.0, 0.0], f"synthesize::m::q::{fp}")
+
+        self.assertIsNone(index.match("m", "a", [1.0, 0.0]))
+        self.assertIsNotNone(index.match("m", "c", [1.0, 0.0]))
+
+
+class SemanticSynthesizeTests(_SynthesizeTestCase):
+    def setUp(self):
+        super().setUp()
+        vectors = {"Wohngeld": [1.0, 0.0, 0.1], "wohngeld beantragen wie": [0.95, 0.05, 0.1], "Kita": [0.0, 1.0, 0.0]}
+        for p in [
+            patch.object(endpoints, "semantic_answers", SemanticAnswerIndex(threshold=0.9)),
+            patch.object(endpoints, "cached_query_embedding", side_effect=vectors.get),
+        ]:
+            p.start()
+            self.patches.append(p)
+
+    def _ask(self, query):
+        return asyncio.run(endpoints.synthesize_answer(QueryRequest(query=query)))
+
+    def test_near_duplicate_question_reuses_the_answer(self):
+        with patch.object(
+            endpoints.provider, "agenerate_text", return_value={"text": "Antwort", "usage": {}}
+        ) as generate:
+            first = self._ask("Wohngeld")
+            second = self._ask("wohngeld beantragen wie")
+            third = self._ask("Kita")
+
+        self.assertEqual(first.answer, "Antwort")
+        self.assertEqual(second.answer, "Antwort")
+        self.assertEqual(third.answer, "Antwort")
+        self.assertEqual(generate.call_count, 2)
+        self.assertEqual(endpoints.semantic_answers.stats()["hits"], 1)
+
+    def test_different_evidence_is_never_shared(self):
+        other = [Evidence(source="https://example.org/kita", content='{"title": "Kita"}', confidence=0.9)]
+        with patch.object(
+            endpoints.provider, "agenerate_text", return_value={"text": "Antwort", "usage": {}}
+        ) as generate:
+            self._ask("Wohngeld")
+            with patch.object(endpoints, "retrieve_evidence_with_status", return_value=(other, [])):
+                self._ask("wohngeld beantragen wie")
+
+        self.assertEqual(generate.call_count, 2)
+
+
+class QueryLevelLookupTests(_SynthesizeTestCase):
+    def _ask(self, query):
+        return asyncio.run(endpoints.synthesize_answer(QueryRequest(query=query)))
+
+    def test_repeated_question_is_answered_without_retrieval(self):
+        with patch.object(
+            endpoints.provider, "agenerate_text", return_value={"text": "Antwort", "usage": {}}
+        ) as generate:
+            self._ask("Wohngeld")
+            with patch.object(endpoints, "retrieve_evidence_with_status") as retrieve:
+                response = self._ask("  wohngeld ")
+
+        retrieve.assert_not_called()
+        generate.assert_called_once()
+        self.assertEqual(response.answer, "Antwort")
+        self.assertEqual(response.evidence, EVIDENCE)
+
+    def test_new_corpus_version_retrieves_again(self):
+        with patch.object(endpoints.provider, "agenerate_text", return_value={"text": "Antwort", "usage": {}}):
+            self._ask("Wohngeld")
+            with patch.object(endpoints, "corpus_version", return_value="next"), patch.object(
+                endpoints, "retrieve_evidence_with_status", return_value=(EVIDENCE, [])
+            ) as retrieve:
+                response = self._ask("Wohngeld")
+
+        retrieve.assert_called_once()
+        self.assertEqual(response.answer, "Antwort")
+
+    def test_changed_evidence_is_caught_by_the_fingerprint_key(self):
+        other = [Evidence(source="https://example.org/neu", content='{"title": "Wohngeld neu"}', confidence=0.9)]
+        completions = [{"text": "alt", "usage": {}}, {"text": "neu", "usage": {}}]
+        with patch.object(endpoints.provider, "agenerate_text", side_effect=completions):
+            self._ask("Wohngeld")
+            with patch.object(endpoints, "corpus_version", return_value="next"), patch.object(
+                endpoints, "retrieve_evidence_with_status", return_value=(other, [])
+            ):
+                response = self._ask("Wohngeld")
+
+        self.assertEqual(response.answer, "neu")
+
+    def test_answer_over_degraded_evidence_expires_with_the_degraded_ttl(self):
+        completions = [{"text": "ohne Vektoren", "usage": {}}, {"text": "vollständig", "usage": {}}]
+        with patch.object(endpoints.provider, "agenerate_text", side_effect=completions):
+            with patch.object(endpoints, "retrieve_evidence_with_status", return_value=(EVIDENCE, ["vector"])):
+                self._ask("Wohngeld")
+            later = time.time() + CACHE_TTL_DEGRADED + 1
+            with patch("backend.ai_service.cache.time.time", return_value=later):
+                self.assertIsNone(ai_cache.lookup(self.key))
+                response = self._ask("Wohngeld")
+
+        self.assertEqual(response.answer, "vollständig")
+
+
+if __name__ == "__main__":
+    unittest.main()